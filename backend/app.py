@@ -1,4 +1,5 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from pydantic import BaseModel
@@ -7,14 +8,31 @@ import os
 from integrations.twilio import create_call
 from integrations.gemini import generate_content
 from integrations.telegram import send_telegram_message
-from routers import appointments, elderly_profiles, health_workers, users, medicines, notification_logs, reminders, reminder_instances, family_elderly_relationship
+from routers import appointments, elderly_profiles, health_workers, users, medicines, notification_logs, reminders, reminder_instances, family_elderly_relationship, exports, analytics, auth
 from database import Base, engine
 from services.cron_service import init_scheduler, shutdown_scheduler
+from services.reminder_rollups import ReminderRollupService
+from services.request_metrics import RequestMetricsMiddleware
+from services.query_metrics import QueryMetricsMiddleware, install as install_query_metrics
+from services.metrics import registry, PROMETHEUS_CONTENT_TYPE
+from services.structured_logging import RequestContextMiddleware, configure_logging
+import logging
 import os
 
 load_dotenv()
 
-app = FastAPI()
+# Logs en JSON escritos desde un thread aparte (el request o el job solo encola)
+configure_logging()
+logger = logging.getLogger(__name__)
+
+# orjson serializa las respuestas (más rápido que json de la stdlib)
+app = FastAPI(default_response_class=ORJSONResponse)
+
+# Mantener reminder_daily_rollups al día en cada cambio de estado de una instancia
+ReminderRollupService.install()
+
+# Contar y cronometrar las queries SQL por request / tick del scheduler (y detectar N+1)
+install_query_metrics()
 
 # Configure CORS
 app.add_middleware(
@@ -29,20 +47,28 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # El frontend lee estos headers en respuestas cross-origin (paginación por cursor y revalidación)
+    expose_headers=["ETag", "X-Next-Cursor", "X-Request-ID"],
 )
 
+# Latencia, tamaño de respuesta y requests en curso por ruta (expuestos en /metrics)
+app.add_middleware(RequestMetricsMiddleware)
+app.add_middleware(QueryMetricsMiddleware)
+# request_id para correlacionar los logs de cada request (el más externo, así lo ven los demás)
+app.add_middleware(RequestContextMiddleware)
+
 # Inicializar el scheduler de cron al arrancar la aplicación
 @app.on_event("startup")
 async def startup_event():
     # Obtener intervalo del .env o usar 60 segundos por defecto
     interval_seconds = int(os.getenv('REMINDER_CRON_INTERVAL_SECONDS', '60'))
     init_scheduler(interval_seconds=interval_seconds)
-    print(f"✅ Scheduler de recordatorios iniciado (intervalo: {interval_seconds} segundos)")
+    logger.info(f"Scheduler de recordatorios iniciado (intervalo: {interval_seconds} segundos)")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     shutdown_scheduler()
-    print("✅ Scheduler de recordatorios detenido")
+    logger.info("Scheduler de recordatorios detenido")
 
 class GeminiRequest(BaseModel):
     text: str
@@ -58,6 +84,11 @@ class WhatsAppRequest(BaseModel):
 async def health_check():
     return {"status": "healthy!"}
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Métricas del proceso en formato de texto de Prometheus"""
+    return Response(content=registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
 @app.post("/calls/create")
 async def create_phone_call(to: str = None, message: str = None):
     """Endpoint para crear una llamada telefónica usando Twilio"""
@@ -66,7 +97,6 @@ async def create_phone_call(to: str = None, message: str = None):
         to_number = to or os.getenv('DEFAULT_PHONE_NUMBER', '+56979745451')
         call_message = message or "Hola, este es un recordatorio de prueba."
         
-        print('endpoint create call')
         call_sid = create_call(to_number, call_message)
         return {"status": "success", "message": "Llamada iniciada correctamente", "call_sid": call_sid}
     except Exception as e:
@@ -108,4 +138,7 @@ app.include_router(medicines.router)
 app.include_router(notification_logs.router)
 app.include_router(reminders.router)
 app.include_router(reminder_instances.router)
-app.include_router(family_elderly_relationship.router)
\ No newline at end of file
+app.include_router(family_elderly_relationship.router)
+app.include_router(exports.router)
+app.include_router(analytics.router)
+app.include_router(auth.router)
\ No newline at end of file
@@ -0,0 +1,42 @@
+"""Listados *_with_medicine del dashboard (camino con DTOs y proyección directa)"""
+from datetime import datetime
+from services.reminders import ReminderService
+from services.reminder_instances import ReminderInstanceService
+from benchmarks.harness import Benchmark
+
+_now = datetime.now()
+
+BENCHMARKS = [
+    Benchmark(
+        "reminders.get_all_with_medicine[100]",
+        run=lambda db, _: ReminderService.get_all_with_medicine(db, limit=100)
+    ),
+    Benchmark(
+        "reminders.get_all_with_medicine_rows[100]",
+        run=lambda db, _: ReminderService.get_all_with_medicine_rows(db, limit=100)
+    ),
+    Benchmark(
+        "instances.get_all_with_medicine[100]",
+        run=lambda db, _: ReminderInstanceService.get_all_with_medicine(db, limit=100)
+    ),
+    Benchmark(
+        "instances.get_today_with_medicine",
+        run=lambda db, _: ReminderInstanceService.get_today_with_medicine(db)
+    ),
+    Benchmark(
+        "instances.get_today_with_medicine_rows",
+        run=lambda db, _: ReminderInstanceService.get_today_with_medicine_rows(db)
+    ),
+    Benchmark(
+        "instances.get_by_month_with_medicine",
+        run=lambda db, _: ReminderInstanceService.get_by_month_with_medicine(db, _now.year, _now.month)
+    ),
+    Benchmark(
+        "instances.get_by_month_with_medicine_rows",
+        run=lambda db, _: ReminderInstanceService.get_by_month_with_medicine_rows(db, _now.year, _now.month)
+    ),
+    Benchmark(
+        "instances.get_by_reminder_id_with_medicine",
+        run=lambda db, _: ReminderInstanceService.get_by_reminder_id_with_medicine(db, 1)
+    ),
+]
@@ -0,0 +1,71 @@
+"""Scheduler de WhatsApp y regeneración de instancias futuras"""
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from models import Reminder, ReminderInstance, NotificationLog, MessageCorrelation
+from services.reminder_scheduler import ReminderSchedulerService
+from services.reminders import ReminderService
+from benchmarks.harness import Benchmark
+import asyncio
+import itertools
+import services.reminder_scheduler as reminder_scheduler
+
+_message_ids = itertools.count(1)
+
+
+async def _offline_whatsapp(to, body_text, buttons, phone_number_id=None):
+    return {"messages": [{"id": f"wamid.offline.{next(_message_ids)}"}]}
+
+
+def _offline_gemini(prompt):
+    return {"candidates": [{"content": {"parts": [{"text": "Hola, es hora de tomar tu medicamento."}]}}]}
+
+
+def use_offline_providers() -> None:
+    """Responder Kapso y Gemini en proceso: se mide el trabajo propio (queries, CPU), no la red"""
+    reminder_scheduler.send_whatsapp_message = _offline_whatsapp
+    reminder_scheduler.generate_content = _offline_gemini
+
+
+def _max_instance_id(db: Session) -> int:
+    return db.query(func.max(ReminderInstance.id)).scalar() or 0
+
+
+def _delete_instances_after(db: Session, instance_id: int) -> None:
+    """Deshacer una corrida del scheduler: borrar lo que creó (sin depender de ON DELETE CASCADE)"""
+    db.rollback()
+    for model in (NotificationLog, MessageCorrelation):
+        db.query(model).filter(model.reminder_instance_id > instance_id).delete(synchronize_session=False)
+    # Las instancias por ORM (no con un DELETE masivo), como en los servicios: así el listener
+    # descuenta cada una de reminder_daily_rollups
+    for instance in db.query(ReminderInstance).filter(ReminderInstance.id > instance_id).all():
+        db.delete(instance)
+    db.commit()
+
+
+def _regenerate_bulk(db: Session, reminders) -> None:
+    ReminderService.regenerate_future_instances_bulk(db, reminders)
+    db.flush()
+
+
+BENCHMARKS = [
+    Benchmark(
+        "scheduler.get_reminders_to_process",
+        run=lambda db, _: ReminderSchedulerService.get_reminders_to_process(db)
+    ),
+    Benchmark(
+        "scheduler.process_pending_reminders",
+        run=lambda db, _: asyncio.run(ReminderSchedulerService.process_pending_reminders(db)),
+        setup=_max_instance_id,
+        teardown=_delete_instances_after
+    ),
+    Benchmark(
+        "reminders.regenerate_future_instances",
+        run=lambda db, reminder: _regenerate_bulk(db, [reminder]),
+        setup=lambda db: db.get(Reminder, 1)
+    ),
+    Benchmark(
+        "reminders.regenerate_future_instances_bulk[100]",
+        run=_regenerate_bulk,
+        setup=lambda db: db.query(Reminder).order_by(Reminder.id).limit(100).all()
+    ),
+]
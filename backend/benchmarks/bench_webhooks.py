@@ -0,0 +1,71 @@
+"""Inbox de webhooks de Kapso: encolar y aplicar un lote de respuestas"""
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List
+from models import WebhookEvent, ReminderInstance
+from services.webhook_events import WebhookEventService
+from benchmarks.harness import Benchmark
+import itertools
+import random
+
+BATCH_SIZE = 50
+
+_event_ids = itertools.count(1)
+_rng = random.Random(7)
+
+
+def _reply_bodies(db: Session, count: int = BATCH_SIZE) -> List[Dict[str, Any]]:
+    """Respuestas de botón a mensajes ya enviados (sembrados con su correlación)"""
+    message_ids = [
+        message_id for (message_id,) in
+        db.query(ReminderInstance.message_id).filter(ReminderInstance.message_id.isnot(None)).limit(count * 20).all()
+    ]
+    return [
+        {
+            "message": {
+                "id": f"bench.in.{next(_event_ids)}",
+                "from": "56900000000",
+                "context": {"id": message_id},
+                "interactive": {"type": "button_reply", "button_reply": {"id": _rng.choice(["taken", "btn_no"]), "title": "Ok"}}
+            }
+        }
+        for message_id in _rng.sample(message_ids, min(count, len(message_ids)))
+    ]
+
+
+def _enqueue(db: Session, bodies: List[Dict[str, Any]]) -> List[str]:
+    keys = []
+    for body in bodies:
+        key = WebhookEventService.whatsapp_event_key(body)
+        WebhookEventService.enqueue(db, "whatsapp", key, body)
+        keys.append(key)
+    return keys
+
+
+def _enqueued_batch(db: Session) -> List[str]:
+    return _enqueue(db, _reply_bodies(db))
+
+
+def _delete_events(db: Session, keys: List[str]) -> None:
+    db.rollback()
+    db.query(WebhookEvent).filter(WebhookEvent.event_key.in_(keys)).delete(synchronize_session=False)
+    db.commit()
+
+
+def _process(db: Session, keys: List[str]) -> None:
+    WebhookEventService.process_batch(db, batch_size=len(keys))
+
+
+BENCHMARKS = [
+    Benchmark(
+        f"webhooks.enqueue[{BATCH_SIZE}]",
+        run=lambda db, bodies: _enqueue(db, bodies),
+        setup=_reply_bodies,
+        teardown=lambda db, bodies: _delete_events(db, [WebhookEventService.whatsapp_event_key(body) for body in bodies])
+    ),
+    Benchmark(
+        f"webhooks.process_batch[{BATCH_SIZE}]",
+        run=_process,
+        setup=_enqueued_batch,
+        teardown=_delete_events
+    ),
+]
@@ -0,0 +1,121 @@
+"""
+Datos sintéticos para los benchmarks. La escala es la cantidad de reminder_instances; el resto
+se deriva de ella (un adulto mayor cada 100 instancias, dos recordatorios por adulto mayor).
+"""
+from datetime import datetime, timedelta
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+from typing import Dict, List
+from models import User, ElderlyProfile, Medicine, Reminder, ReminderInstance, NotificationLog, MessageCorrelation
+from enums import ReminderInstanceStatus
+from services.adherence import AdherenceService
+import random
+
+CHUNK_SIZE = 5000
+# Uno de cada DUE_EVERY recordatorios no tiene instancias futuras: son los que el scheduler debe procesar
+DUE_EVERY = 10
+PAST_STATUSES = (
+    ReminderInstanceStatus.SUCCESS.value,
+    ReminderInstanceStatus.SUCCESS.value,
+    ReminderInstanceStatus.REJECTED.value,
+    ReminderInstanceStatus.FAILURE.value,
+    ReminderInstanceStatus.WAITING.value,
+)
+
+
+def _insert(db: Session, model, rows: List[Dict]) -> None:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+
+def seed(db: Session, scale: int, seed_value: int = 42) -> Dict[str, int]:
+    """Sembrar una BD vacía; retorna cuántas filas se crearon por tabla"""
+    rng = random.Random(seed_value)
+    now = datetime.now().replace(second=0, microsecond=0)
+    elderly = max(10, scale // 100)
+    elderly_ids = list(range(1, elderly + 1))
+
+    _insert(db, User, [
+        {"id": elderly_id, "email": f"bench-{elderly_id}@bench.local", "password": "x",
+         "full_name": f"Persona {elderly_id}", "phone": f"+5690{elderly_id:07d}", "role": "elderly"}
+        for elderly_id in elderly_ids
+    ])
+    _insert(db, ElderlyProfile, [
+        {"id": elderly_id, "emergency_contact": f"+5691{elderly_id:07d}"} for elderly_id in elderly_ids
+    ])
+    _insert(db, Medicine, [
+        {"id": elderly_id, "name": rng.choice(["Paracetamol", "Losartán", "Metformina"]),
+         "total_tablets": 60, "tablets_left": 30, "tablets_per_dose": 1}
+        for elderly_id in elderly_ids
+    ])
+
+    reminders = []
+    for elderly_id in elderly_ids:
+        for _ in range(2):
+            reminders.append({
+                "id": len(reminders) + 1,
+                "reminder_type": "medicine",
+                "periodicity": rng.choice([480, 720, 1440]),
+                "start_date": now - timedelta(days=30),
+                "medicine": elderly_id,
+                "elderly_profile_id": elderly_id,
+                "is_active": True
+            })
+    _insert(db, Reminder, reminders)
+
+    # Instancias repartidas en ±15 días; las pasadas ya resueltas y con su notification_log
+    instances = []
+    logs = []
+    correlations = []
+    for instance_id in range(1, scale + 1):
+        reminder = reminders[rng.randrange(len(reminders))]
+        offset = rng.uniform(-15 * 1440, 15 * 1440)
+        if reminder["id"] % DUE_EVERY == 0:
+            offset = -abs(offset) - reminder["periodicity"]
+        scheduled = now + timedelta(minutes=int(offset))
+        past = scheduled <= now
+        status = rng.choice(PAST_STATUSES) if past else ReminderInstanceStatus.PENDING.value
+        instances.append({
+            "id": instance_id,
+            "reminder_id": reminder["id"],
+            "scheduled_datetime": scheduled,
+            "status": status,
+            "taken_at": scheduled + timedelta(minutes=rng.randint(1, 90)) if status == ReminderInstanceStatus.SUCCESS.value else None,
+            "message_id": f"wamid.bench.{instance_id}" if past else None
+        })
+        if past:
+            logs.append({
+                "reminder_instance_id": instance_id,
+                "notification_type": rng.choice(["whatsapp", "call"]),
+                "recepient_phone": "+56900000000",
+                "status": "sent",
+                "sent_at": scheduled + timedelta(seconds=rng.randint(1, 120))
+            })
+            correlations.append({
+                "channel": "whatsapp",
+                "provider_message_id": f"wamid.bench.{instance_id}",
+                "reminder_instance_id": instance_id
+            })
+    _insert(db, ReminderInstance, instances)
+    _insert(db, NotificationLog, logs)
+    _insert(db, MessageCorrelation, correlations)
+    _reset_sequences(db)
+    db.commit()
+    # Los INSERT masivos no pasan por el listener de rollups: reconstruirlos como el backfill
+    days = [instance["scheduled_datetime"].date() for instance in instances]
+    rollups = AdherenceService.refresh_rollups(db, min(days), max(days) + timedelta(days=1)) if days else 0
+    return {
+        "elderly_profiles": elderly,
+        "reminders": len(reminders),
+        "reminder_instances": len(instances),
+        "notification_logs": len(logs),
+        "reminder_daily_rollups": rollups
+    }
+
+
+def _reset_sequences(db: Session) -> None:
+    """En Postgres, avanzar las secuencias de los ids que se insertaron explícitamente"""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    for table in ("users", "reminders", "reminder_instances"):
+        db.execute(text(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))"))
@@ -0,0 +1,108 @@
+"""
+Runner mínimo al estilo de pytest-benchmark: rondas de calentamiento, min/mediana/p95,
+queries SQL por ronda (services/query_metrics.py) y comparación contra un baseline JSON.
+"""
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+from services.query_metrics import query_scope
+from services.tracing import percentile
+import json
+import statistics
+import time
+
+
+class Benchmark(NamedTuple):
+    """
+    `run(db, state)` es lo que se mide. `setup(db)` prepara el estado de cada ronda y
+    `teardown(db, state)` deshace lo que `run` escribió, fuera de la medición.
+    """
+    name: str
+    run: Callable[[Session, Any], Any]
+    setup: Optional[Callable[[Session], Any]] = None
+    teardown: Optional[Callable[[Session, Any], None]] = None
+
+
+class BenchResult(NamedTuple):
+    name: str
+    scale: int
+    rounds: int
+    min_ms: float
+    median_ms: float
+    p95_ms: float
+    queries: int
+    n_plus_one: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.scale}"
+
+
+def run_benchmark(db: Session, benchmark: Benchmark, scale: int, rounds: int = 5, warmup: int = 1) -> BenchResult:
+    times: List[float] = []
+    queries: List[int] = []
+    n_plus_one: List[int] = []
+    for round_number in range(warmup + rounds):
+        state = benchmark.setup(db) if benchmark.setup else None
+        with query_scope(f"bench:{benchmark.name}") as stats:
+            start = time.perf_counter()
+            benchmark.run(db, state)
+            elapsed = time.perf_counter() - start
+        if benchmark.teardown:
+            benchmark.teardown(db, state)
+        else:
+            db.rollback()
+        if round_number >= warmup:
+            times.append(elapsed)
+            queries.append(stats.count)
+            n_plus_one.append(len(stats.n_plus_one()))
+
+    return BenchResult(
+        name=benchmark.name,
+        scale=scale,
+        rounds=rounds,
+        min_ms=min(times) * 1000,
+        median_ms=statistics.median(times) * 1000,
+        p95_ms=percentile(times, 0.95) * 1000,
+        # Las queries por ronda deberían ser constantes; la mediana ignora rondas con trabajo extra
+        queries=int(statistics.median(queries)),
+        n_plus_one=max(n_plus_one)
+    )
+
+
+def print_header() -> None:
+    print(f"{'benchmark':<50} {'escala':>7} {'min ms':>10} {'mediana ms':>11} {'p95 ms':>10} {'queries':>8} {'N+1':>4}")
+
+
+def print_result(result: BenchResult, baseline: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+    line = (
+        f"{result.name:<50} {result.scale:>7} {result.min_ms:>10.2f} {result.median_ms:>11.2f} "
+        f"{result.p95_ms:>10.2f} {result.queries:>8} {result.n_plus_one:>4}"
+    )
+    previous = (baseline or {}).get(result.key)
+    if previous:
+        line += f"   (baseline {previous['median_ms']:.2f} ms, {previous['queries']} queries)"
+    print(line)
+
+
+def save(results: List[BenchResult], path: str) -> None:
+    with open(path, "w") as file:
+        json.dump({result.key: result._asdict() for result in results}, file, indent=2)
+
+
+def load(path: str) -> Dict[str, Dict[str, Any]]:
+    with open(path) as file:
+        return json.load(file)
+
+
+def regressions(results: List[BenchResult], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """Benchmarks más lentos que el baseline por más de `tolerance`, o con más queries"""
+    found = []
+    for result in results:
+        previous = baseline.get(result.key)
+        if not previous:
+            continue
+        if result.queries > previous["queries"]:
+            found.append(f"{result.key}: {previous['queries']} -> {result.queries} queries")
+        if result.median_ms > previous["median_ms"] * (1 + tolerance):
+            found.append(f"{result.key}: mediana {previous['median_ms']:.2f} -> {result.median_ms:.2f} ms")
+    return found
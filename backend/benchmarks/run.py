@@ -0,0 +1,114 @@
+"""
+Suite de benchmarks del scheduler, los listados *_with_medicine y los webhooks a varias
+escalas (cantidad de reminder_instances), con tiempo y queries SQL por ronda. Sirve para
+detectar regresiones: guarda un baseline con --json y compáralo con --compare.
+
+Por defecto cada escala usa una BD SQLite temporal. Con --database-url puede apuntar a un
+Postgres local cuyo nombre contenga "bench": las tablas se borran y se recrean.
+Kapso y Gemini se responden en proceso salvo que se pase --providers (servidor falso
+de scripts/fake_providers.py).
+Las queries SQL de cada escenario tienen presupuesto en tests/test_benchmarks.py (pytest -m benchmark).
+
+Uso (desde backend/):
+    python -m benchmarks.run --scales 1000,10000 --json baseline.json
+    python -m benchmarks.run --scales 1000,10000 --compare baseline.json --tolerance 0.2
+    python -m benchmarks.run --only scheduler --rounds 10
+    python -m benchmarks.run --database-url postgresql://localhost/elderly_bench --scales 100000
+"""
+from urllib.parse import urlparse
+import argparse
+import logging
+import os
+import sys
+import tempfile
+
+DEFAULT_SCALES = "1000,10000,100000"
+LOCAL_HOSTS = (None, "", "localhost", "127.0.0.1")
+
+
+def _check_database_url(url: str) -> None:
+    """Solo BDs locales y dedicadas: la suite borra y recrea todas las tablas"""
+    parsed = urlparse(url)
+    if parsed.scheme.startswith("sqlite"):
+        return
+    if parsed.hostname not in LOCAL_HOSTS or "bench" not in parsed.path:
+        raise SystemExit(f"--database-url debe ser una BD local cuyo nombre contenga 'bench': {url}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del scheduler, listados y webhooks")
+    parser.add_argument("--scales", default=DEFAULT_SCALES, help="Cantidades de reminder_instances, separadas por coma")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--only", help="Correr solo los benchmarks cuyo nombre contenga este texto")
+    parser.add_argument("--database-url", help="BD local dedicada (por defecto, SQLite temporal por escala)")
+    parser.add_argument("--json", help="Guardar los resultados en este archivo")
+    parser.add_argument("--compare", help="Baseline JSON contra el cual comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Fracción de aumento de la mediana tolerada")
+    parser.add_argument("--providers", help="URL del servidor falso de proveedores, p. ej. http://127.0.0.1:9000")
+    args = parser.parse_args()
+
+    if args.database_url:
+        _check_database_url(args.database_url)
+    # database.py exige POSTGRES_URL al importarse; la suite usa su propio engine
+    os.environ.setdefault("POSTGRES_URL", args.database_url or "sqlite://")
+    if args.providers:
+        os.environ["KAPSO_BASE_URL"] = f"{args.providers.rstrip('/')}/kapso"
+        os.environ["GEMINI_BASE_URL"] = f"{args.providers.rstrip('/')}/gemini"
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from database import Base
+    from services.query_metrics import install as install_query_metrics
+    from services.reminder_rollups import ReminderRollupService
+    from benchmarks import bench_listings, bench_scheduler, bench_webhooks, dataset, harness
+
+    install_query_metrics()
+    # Como en app.py: cada cambio de estado de una instancia también actualiza reminder_daily_rollups
+    ReminderRollupService.install()
+    # Las advertencias de N+1 ya quedan en la columna N+1 de la tabla
+    logging.getLogger("services.query_metrics").setLevel(logging.ERROR)
+    if not args.providers:
+        bench_scheduler.use_offline_providers()
+
+    benchmarks = bench_scheduler.BENCHMARKS + bench_listings.BENCHMARKS + bench_webhooks.BENCHMARKS
+    if args.only:
+        benchmarks = [benchmark for benchmark in benchmarks if args.only in benchmark.name]
+    baseline = harness.load(args.compare) if args.compare else None
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in [int(value) for value in args.scales.split(",")]:
+            url = args.database_url or f"sqlite:///{directory}/bench_{scale}.db"
+            engine = create_engine(url)
+            Base.metadata.drop_all(engine)
+            Base.metadata.create_all(engine)
+
+            db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+            try:
+                counts = dataset.seed(db, scale)
+                print(f"\nEscala {scale}: " + ", ".join(f"{table}={count}" for table, count in counts.items()))
+                harness.print_header()
+                for benchmark in benchmarks:
+                    result = harness.run_benchmark(db, benchmark, scale, rounds=args.rounds, warmup=args.warmup)
+                    harness.print_result(result, baseline)
+                    results.append(result)
+            finally:
+                db.close()
+                engine.dispose()
+
+    if args.json:
+        harness.save(results, args.json)
+        print(f"\nResultados guardados en {args.json}")
+    if baseline:
+        found = harness.regressions(results, baseline, args.tolerance)
+        if found:
+            print("\nRegresiones:", file=sys.stderr)
+            for line in found:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print("\nSin regresiones respecto del baseline")
+
+
+if __name__ == "__main__":
+    main()
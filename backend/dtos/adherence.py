@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+
+class AdherenceCounts(BaseModel):
+    """Conteo de instancias por estado y métricas de adherencia"""
+    success: int = 0
+    rejected: int = 0
+    failure: int = 0
+    waiting: int = 0
+    pending: int = 0
+    total: int = 0
+    adherence_rate: Optional[float] = None  # success / (success + rejected + failure)
+    avg_latency_minutes: Optional[float] = None  # Promedio de taken_at - scheduled_datetime
+    on_time_rate: Optional[float] = None  # Tomas dentro de ADHERENCE_ON_TIME_MINUTES / tomas con taken_at
+
+
+class MedicineAdherence(AdherenceCounts):
+    medicine_id: Optional[int] = None
+    medicine_name: Optional[str] = None
+
+
+class DailyAdherence(AdherenceCounts):
+    day: date
+
+
+class AdherenceSummaryResponse(BaseModel):
+    elderly_profile_id: int
+    start_date: date
+    end_date: date
+    totals: AdherenceCounts
+    current_streak: int  # Días seguidos (hasta el último día con tomas resueltas) sin dosis rechazadas ni fallidas
+    longest_streak: int
+    by_medicine: List[MedicineAdherence]
+    by_day: List[DailyAdherence]
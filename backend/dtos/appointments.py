@@ -27,6 +27,10 @@ class AppointmentUpdate(BaseModel):
     health_worker_id: Optional[int] = None
 
 
+class AppointmentBulkUpdate(AppointmentUpdate):
+    id: int  # Elemento a actualizar en una operación masiva
+
+
 class AppointmentResponse(BaseModel):
     id: int
     scheduled_datetime: datetime
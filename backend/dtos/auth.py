@@ -0,0 +1,21 @@
+from pydantic import BaseModel, EmailStr
+from dtos.users import UserResponse
+
+
+class LoginRequest(BaseModel):
+    email: EmailStr
+    password: str
+
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+    expires_in: int  # Segundos hasta que expira el token
+    user: UserResponse
+
+
+class Principal(BaseModel):
+    """Identidad del request autenticado, leída del JWT sin ir a la base"""
+    id: int
+    email: str
+    role: str
@@ -0,0 +1,17 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class BulkItemError(BaseModel):
+    """Error de un elemento de una operación masiva"""
+    index: int  # Posición del elemento en la lista enviada
+    id: Optional[int] = None  # ID del elemento, si se conoce
+    error: str
+
+
+class BulkResult(BaseModel, Generic[T]):
+    """Resultado de una operación masiva: los elementos que fallan no abortan al resto"""
+    items: List[T]  # Elementos creados / actualizados, en el orden de la lista enviada
+    errors: List[BulkItemError]
@@ -1,6 +1,11 @@
 from pydantic import BaseModel
 from datetime import datetime, date
-from typing import Optional
+from typing import List, Optional
+from dtos.medicines import MedicineResponse
+from dtos.reminders import ReminderWithMedicineResponse
+from dtos.reminder_instances import ReminderInstanceWithMedicineResponse
+from dtos.appointments import AppointmentResponse
+from dtos.family_elderly_relationship import FamilyElderlyRelationshipResponse
 
 
 class ElderlyProfileCreate(BaseModel):
@@ -39,3 +44,13 @@ class ElderlyProfileResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class ElderlyCareOverviewResponse(BaseModel):
+    """Todo lo que muestra la página de un adulto mayor, en una sola respuesta"""
+    profile: ElderlyProfileResponse
+    medicines: List[MedicineResponse]
+    reminders: List[ReminderWithMedicineResponse]
+    today_instances: List[ReminderInstanceWithMedicineResponse]
+    appointments: List[AppointmentResponse]
+    family_relationships: List[FamilyElderlyRelationshipResponse]
@@ -0,0 +1,41 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+
+class ReminderHistoryExportRow(BaseModel):
+    """Fila del export del historial de recordatorios (instancia + reminder + medicina)"""
+    instance_id: int
+    reminder_id: int
+    elderly_profile_id: Optional[int]
+    reminder_type: str
+    medicine_id: Optional[int]
+    medicine_name: Optional[str]
+    dosage: Optional[str]
+    scheduled_datetime: datetime
+    status: Optional[str]
+    taken_at: Optional[datetime]
+    retry_count: Optional[int]
+    family_notified: Optional[bool]
+    notes: Optional[str]
+
+    class Config:
+        from_attributes = True
+
+
+class NotificationLogExportRow(BaseModel):
+    """Fila del export de logs de notificaciones"""
+    id: int
+    reminder_instance_id: int
+    elderly_profile_id: Optional[int]
+    scheduled_datetime: Optional[datetime]
+    notification_type: str
+    recepient_phone: str
+    status: str
+    sent_at: Optional[datetime]
+    delivered_at: Optional[datetime]
+    response: Optional[str]
+    error_message: Optional[str]
+
+    class Config:
+        from_attributes = True
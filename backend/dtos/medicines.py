@@ -22,6 +22,10 @@ class MedicineUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+class MedicineBulkUpdate(MedicineUpdate):
+    id: int  # Elemento a actualizar en una operación masiva
+
+
 class MedicineResponse(BaseModel):
     id: int
     name: str
@@ -36,3 +40,37 @@ class MedicineResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+
+class MedicineStockLedgerResponse(BaseModel):
+    id: int
+    medicine_id: int
+    delta: int
+    balance_after: int
+    reason: str
+    reminder_instance_id: Optional[int]
+    created_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
+class MedicineStockBalanceResponse(BaseModel):
+    medicine_id: int
+    name: str
+    tablets_left: Optional[int]
+    tablets_per_dose: int
+    doses_per_day: float
+    days_left: Optional[float]
+    last_movement_at: Optional[datetime]
+
+
+class MedicineStockForecastResponse(BaseModel):
+    medicine_id: int  # Igual al elderly_profile_id
+    name: str
+    tablets_left: Optional[int]
+    tablets_per_dose: int
+    doses_per_day: float
+    days_left: Optional[float]
+    runout_date: Optional[datetime]
+    computed_at: datetime
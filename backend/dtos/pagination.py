@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """Respuesta paginada por cursor (keyset)"""
+    items: List[T]
+    next_cursor: Optional[str] = None  # None cuando no hay más páginas
+    limit: int
@@ -26,6 +26,10 @@ class ReminderUpdate(BaseModel):
     is_active: Optional[bool] = None
 
 
+class ReminderBulkUpdate(ReminderUpdate):
+    id: int  # Elemento a actualizar en una operación masiva
+
+
 class ReminderResponse(BaseModel):
     id: int
     reminder_type: str
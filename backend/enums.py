@@ -7,3 +7,15 @@ class ReminderInstanceStatus(str, Enum):
     FAILURE = "failure"
     SUCCESS = "success"
     REJECTED = "rejected"
+
+
+class WebhookEventStatus(str, Enum):
+    PENDING = "pending"
+    PROCESSED = "processed"
+    IGNORED = "ignored"
+    FAILED = "failed"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
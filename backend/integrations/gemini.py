@@ -1,5 +1,4 @@
 import os
-import httpx
 
 
 def generate_content(text: str, model: str = "gemini-2.5-flash-lite"):
@@ -18,7 +17,9 @@ def generate_content(text: str, model: str = "gemini-2.5-flash-lite"):
     if not api_key:
         raise ValueError("GEMINI_API_KEY no está configurada en las variables de entorno")
     
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+    # GEMINI_BASE_URL permite apuntar a un servidor falso (scripts/fake_providers.py) en pruebas de carga
+    base_url = os.getenv('GEMINI_BASE_URL', 'https://generativelanguage.googleapis.com')
+    url = f"{base_url}/v1beta/models/{model}:generateContent"
 
     headers = {
         'Content-Type': 'application/json',
@@ -37,6 +38,9 @@ def generate_content(text: str, model: str = "gemini-2.5-flash-lite"):
         ]
     }
     
+    # httpx se importa al primer uso para no sumarlo al arranque de la app
+    import httpx
+
     with httpx.Client() as client:
         response = client.post(url, headers=headers, json=payload)
         response.raise_for_status()
@@ -1,4 +1,3 @@
-import httpx
 import os
 from typing import List, Dict
 
@@ -17,7 +16,7 @@ async def send_whatsapp_message(
     if not phone_id:
         raise ValueError("KAPSO_PHONE_NUMBER_ID no está configurada")
     
-    base_url = 'https://api.kapso.ai/meta/whatsapp'
+    base_url = os.getenv('KAPSO_BASE_URL', 'https://api.kapso.ai/meta/whatsapp')
     url = f"{base_url}/v21.0/{phone_id}/messages"
     
     headers = {
@@ -51,6 +50,9 @@ async def send_whatsapp_message(
         }
     }
     
+    # httpx se importa al primer uso para no sumarlo al arranque de la app
+    import httpx
+
     async with httpx.AsyncClient() as client:
         response = await client.post(url, headers=headers, json=payload)
         response.raise_for_status()
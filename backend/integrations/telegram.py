@@ -1,4 +1,3 @@
-import httpx
 import os
 
 
@@ -20,7 +19,8 @@ async def send_telegram_message(
     if not bot_token:
         raise ValueError("TELEGRAM_BOT_TOKEN no está configurada en las variables de entorno")
     
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+    base_url = os.getenv('TELEGRAM_BASE_URL', 'https://api.telegram.org')
+    url = f"{base_url}/bot{bot_token}/sendMessage"
     
     # Botones hardcodeados: Compatibles con WhatsApp
     # "taken" y "skip" para medicamentos (compatible con WhatsApp)
@@ -35,6 +35,9 @@ async def send_telegram_message(
         }
     }
     
+    # httpx se importa al primer uso para no sumarlo al arranque de la app
+    import httpx
+
     async with httpx.AsyncClient() as client:
         response = await client.post(url, json=payload)
         
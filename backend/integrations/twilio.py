@@ -1,10 +1,12 @@
 import os
-from twilio.rest import Client
 from typing import Optional
 from sqlalchemy.orm import Session
 from datetime import datetime
 from models import ReminderInstance, NotificationLog
 from enums import ReminderInstanceStatus
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 def create_call(
@@ -27,15 +29,21 @@ def create_call(
     Returns:
         call_sid: ID de la llamada creada
     """
-    print('create call')
-    print('reminder_instance_id en create_call', reminder_instance_id)
+    logger.debug("Creando llamada de Twilio", extra={"reminder_instance_id": reminder_instance_id})
     account_sid = os.getenv('TWILIO_ACCOUNT_SID')
     auth_token = os.getenv('TWILIO_AUTH_TOKEN')
     
     if not account_sid or not auth_token:
         raise ValueError("TWILIO_ACCOUNT_SID y TWILIO_AUTH_TOKEN deben estar configurados en las variables de entorno")
     
+    # El SDK de Twilio tarda en importarse: se carga con la primera llamada, no al arrancar la app
+    from twilio.rest import Client
+
     client = Client(account_sid, auth_token)
+    # TWILIO_BASE_URL permite apuntar a un servidor falso (scripts/fake_providers.py) en pruebas de carga
+    base_url = os.getenv('TWILIO_BASE_URL')
+    if base_url:
+        client.api.base_url = base_url
     
     # Usar el número de origen de .env si no se proporciona uno
     if not from_number:
@@ -63,7 +71,7 @@ def create_call(
                 </Say>
               </Gather>
            </Response>"""
-    print('twiml en create_call', twiml)
+    logger.debug("TwiML de la llamada: %s", twiml)
     call = client.calls.create(
         from_=from_number,
         to=to,
@@ -0,0 +1,24 @@
+-- Correlación O(1) entre message_id de proveedores (Kapso / Telegram) y reminder_instances.
+-- Ejecutar una vez contra la base de datos (Neon) antes de desplegar.
+
+CREATE TABLE IF NOT EXISTS message_correlations (
+    id SERIAL PRIMARY KEY,
+    channel VARCHAR(20) NOT NULL,
+    provider_message_id VARCHAR(255) NOT NULL,
+    reminder_instance_id INTEGER NOT NULL REFERENCES reminder_instances(id) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_message_correlations_channel_message UNIQUE (channel, provider_message_id)
+);
+
+-- Fallback para mensajes enviados antes de existir message_correlations
+CREATE INDEX IF NOT EXISTS ix_reminder_instances_message_id ON reminder_instances (message_id);
+
+-- Usado por el join al último notification_log de una instancia
+CREATE INDEX IF NOT EXISTS ix_notification_logs_reminder_instance_id ON notification_logs (reminder_instance_id);
+
+-- Backfill con los message_id ya guardados
+INSERT INTO message_correlations (channel, provider_message_id, reminder_instance_id)
+SELECT 'whatsapp', message_id, id
+FROM reminder_instances
+WHERE message_id IS NOT NULL AND message_id <> 'None'
+ON CONFLICT (channel, provider_message_id) DO NOTHING;
@@ -0,0 +1,17 @@
+-- Inbox durable para webhooks de Kapso y Telegram.
+-- El webhook solo inserta aquí; el consumidor de cron_service aplica los cambios en lotes.
+
+CREATE TABLE IF NOT EXISTS webhook_events (
+    id SERIAL PRIMARY KEY,
+    provider VARCHAR(20) NOT NULL,
+    event_key VARCHAR(255) NOT NULL,
+    payload TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error_message TEXT,
+    received_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    processed_at TIMESTAMP,
+    CONSTRAINT uq_webhook_events_provider_event_key UNIQUE (provider, event_key)
+);
+
+CREATE INDEX IF NOT EXISTS ix_webhook_events_status_id ON webhook_events (status, id);
@@ -0,0 +1,42 @@
+-- Ledger append-only de movimientos de stock y vista de saldo / días restantes.
+
+CREATE TABLE IF NOT EXISTS medicine_stock_ledger (
+    id SERIAL PRIMARY KEY,
+    medicine_id INTEGER NOT NULL REFERENCES medicines(id) ON DELETE CASCADE,
+    delta INTEGER NOT NULL,
+    balance_after INTEGER NOT NULL,
+    reason VARCHAR(50) NOT NULL,
+    reminder_instance_id INTEGER REFERENCES reminder_instances(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_medicine_stock_ledger_medicine_id_id ON medicine_stock_ledger (medicine_id, id);
+
+-- Saldo inicial para los medicamentos existentes
+INSERT INTO medicine_stock_ledger (medicine_id, delta, balance_after, reason)
+SELECT m.id, m.tablets_left, m.tablets_left, 'initial'
+FROM medicines m
+WHERE m.tablets_left IS NOT NULL
+  AND NOT EXISTS (SELECT 1 FROM medicine_stock_ledger l WHERE l.medicine_id = m.id);
+
+-- medicines.tablets_left es el saldo corriente (se mantiene junto al ledger en cada movimiento),
+-- así que la vista no necesita recorrer el historial: solo suma el consumo diario de los reminders activos.
+CREATE OR REPLACE VIEW medicine_stock_balance AS
+SELECT
+    m.id AS medicine_id,
+    m.name,
+    m.tablets_left,
+    COALESCE(m.tablets_per_dose, 1) AS tablets_per_dose,
+    COALESCE(SUM(1440.0 / r.periodicity), 0) AS doses_per_day,
+    CASE
+        WHEN COALESCE(SUM(1440.0 / r.periodicity), 0) > 0 AND m.tablets_left IS NOT NULL
+        THEN m.tablets_left / (SUM(1440.0 / r.periodicity) * COALESCE(m.tablets_per_dose, 1))
+    END AS days_left,
+    (SELECT MAX(l.created_at) FROM medicine_stock_ledger l WHERE l.medicine_id = m.id) AS last_movement_at
+FROM medicines m
+LEFT JOIN reminders r
+    ON r.medicine = m.id
+    AND r.is_active
+    AND r.periodicity > 0
+    AND (r.end_date IS NULL OR r.end_date >= CURRENT_DATE)
+GROUP BY m.id, m.name, m.tablets_left, m.tablets_per_dose;
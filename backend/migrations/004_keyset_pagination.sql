@@ -0,0 +1,4 @@
+-- Índice para la paginación por cursor de /reminder-instances/page (scheduled_datetime, id).
+-- users, reminders y notification_logs se paginan por su primary key.
+
+CREATE INDEX IF NOT EXISTS ix_reminder_instances_scheduled_datetime_id ON reminder_instances (scheduled_datetime, id);
@@ -0,0 +1,7 @@
+-- Índices para paginar por cursor los listados filtrados que antes devolvían la tabla completa:
+-- /reminder-instances/pending/all, /reminder-instances/status/{status},
+-- /reminder-instances/reminder/{id} y /notification-logs/status/{status}.
+
+CREATE INDEX IF NOT EXISTS ix_reminder_instances_status_scheduled_datetime_id ON reminder_instances (status, scheduled_datetime, id);
+CREATE INDEX IF NOT EXISTS ix_reminder_instances_reminder_id_scheduled_datetime_id ON reminder_instances (reminder_id, scheduled_datetime, id);
+CREATE INDEX IF NOT EXISTS ix_notification_logs_status_id ON notification_logs (status, id);
@@ -0,0 +1,19 @@
+-- Resumen diario de resultados de recordatorios para las métricas de adherencia.
+-- Los días cerrados se recalculan desde reminder_instances con el job de rollups.
+
+CREATE TABLE IF NOT EXISTS reminder_daily_rollups (
+    id SERIAL PRIMARY KEY,
+    reminder_id INTEGER NOT NULL REFERENCES reminders(id) ON DELETE CASCADE,
+    elderly_profile_id INTEGER,
+    medicine_id INTEGER,
+    day DATE NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    latency_count INTEGER NOT NULL DEFAULT 0,
+    latency_seconds_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    on_time_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_reminder_daily_rollups_reminder_day_status UNIQUE (reminder_id, day, status)
+);
+
+CREATE INDEX IF NOT EXISTS ix_reminder_daily_rollups_elderly_profile_id_day ON reminder_daily_rollups (elderly_profile_id, day);
@@ -0,0 +1,32 @@
+-- Los rollups diarios ahora se mantienen en cada flush (ReminderRollupService), también para el día en curso.
+-- Backfill inicial de todo el historial; para re-ejecutarlo por tramos usar:
+--   python -m scripts.backfill_reminder_rollups
+-- El adulto mayor se resuelve como en services/elderly_resolution.py: elderly_profile_id, si no el de
+-- la cita y si no la medicina (medicines.id es FK a elderly_profiles.id).
+-- El margen "a tiempo" (30 * 60 segundos) debe coincidir con ADHERENCE_ON_TIME_MINUTES (por defecto 30);
+-- con otro valor, re-ejecutar el backfill con el script.
+
+DELETE FROM reminder_daily_rollups;
+
+INSERT INTO reminder_daily_rollups (
+    reminder_id, elderly_profile_id, medicine_id, day, status,
+    count, latency_count, latency_seconds_sum, on_time_count
+)
+SELECT
+    ri.reminder_id,
+    CASE WHEN r.elderly_profile_id IS NOT NULL THEN r.elderly_profile_id
+         WHEN r.appointment_id IS NOT NULL THEN a.elderly_id
+         ELSE r.medicine END,
+    r.medicine,
+    date_trunc('day', ri.scheduled_datetime)::date,
+    COALESCE(ri.status, 'pending'),
+    COUNT(*),
+    SUM(CASE WHEN ri.status = 'success' AND ri.taken_at IS NOT NULL THEN 1 ELSE 0 END),
+    SUM(CASE WHEN ri.status = 'success' AND ri.taken_at IS NOT NULL
+             THEN EXTRACT(EPOCH FROM ri.taken_at) - EXTRACT(EPOCH FROM ri.scheduled_datetime) ELSE 0 END),
+    SUM(CASE WHEN ri.status = 'success' AND ri.taken_at IS NOT NULL
+              AND EXTRACT(EPOCH FROM ri.taken_at) - EXTRACT(EPOCH FROM ri.scheduled_datetime) <= 30 * 60 THEN 1 ELSE 0 END)
+FROM reminder_instances ri
+JOIN reminders r ON r.id = ri.reminder_id
+LEFT JOIN appointments a ON a.id = r.appointment_id
+GROUP BY ri.reminder_id, r.elderly_profile_id, r.appointment_id, a.elderly_id, r.medicine, date_trunc('day', ri.scheduled_datetime), COALESCE(ri.status, 'pending');
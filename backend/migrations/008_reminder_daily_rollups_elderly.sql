@@ -0,0 +1,17 @@
+-- Los rollups de reminders de medicina o de cita sin elderly_profile_id propio quedaban con
+-- elderly_profile_id NULL. Re-asignar el adulto mayor resuelto como en services/elderly_resolution.py:
+-- elderly_profile_id, si no el de la cita y si no la medicina (medicines.id es FK a elderly_profiles.id).
+
+UPDATE reminder_daily_rollups rr
+SET elderly_profile_id = resolved.elderly_id
+FROM (
+    SELECT
+        r.id AS reminder_id,
+        CASE WHEN r.elderly_profile_id IS NOT NULL THEN r.elderly_profile_id
+             WHEN r.appointment_id IS NOT NULL THEN a.elderly_id
+             ELSE r.medicine END AS elderly_id
+    FROM reminders r
+    LEFT JOIN appointments a ON a.id = r.appointment_id
+) resolved
+WHERE resolved.reminder_id = rr.reminder_id
+  AND rr.elderly_profile_id IS DISTINCT FROM resolved.elderly_id;
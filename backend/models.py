@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, Numeric, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, Date, ForeignKey, Numeric, Boolean, Float, UniqueConstraint, Index
 from sqlalchemy.sql import func
 from database import Base
-from enums import ReminderInstanceStatus
+from enums import ReminderInstanceStatus, WebhookEventStatus
 
 
 class User(Base):
@@ -59,8 +59,29 @@ class Medicine(Base):
     updated_at = Column(DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=True)
 
 
+class MedicineStockLedger(Base):
+    __tablename__ = "medicine_stock_ledger"
+    __table_args__ = (
+        Index("ix_medicine_stock_ledger_medicine_id_id", "medicine_id", "id"),
+    )
+
+    # Append-only: cada movimiento de stock guarda el saldo resultante, así no hay que re-sumar el historial
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    medicine_id = Column(Integer, ForeignKey("medicines.id", ondelete="CASCADE"), nullable=False)
+    delta = Column(Integer, nullable=False)  # Negativo para dosis tomadas, positivo para recargas
+    balance_after = Column(Integer, nullable=False)
+    reason = Column(String(50), nullable=False)  # "initial", "dose_taken", "adjustment"
+    reminder_instance_id = Column(Integer, ForeignKey("reminder_instances.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=True)
+
+
 class ReminderInstance(Base):
     __tablename__ = "reminder_instances"
+    __table_args__ = (
+        Index("ix_reminder_instances_scheduled_datetime_id", "scheduled_datetime", "id"),
+        Index("ix_reminder_instances_status_scheduled_datetime_id", "status", "scheduled_datetime", "id"),
+        Index("ix_reminder_instances_reminder_id_scheduled_datetime_id", "reminder_id", "scheduled_datetime", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     reminder_id = Column(Integer, ForeignKey("reminders.id", ondelete="CASCADE"), nullable=False)
@@ -72,16 +93,19 @@ class ReminderInstance(Base):
     family_notified = Column(Boolean, default=False, nullable=True)
     family_notified_at = Column(DateTime, nullable=True)
     notes = Column(Text, nullable=True)
-    message_id = Column(String(255), nullable=True)
+    message_id = Column(String(255), nullable=True, index=True)
     created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=True)
     updated_at = Column(DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=True)
 
 
 class NotificationLog(Base):
     __tablename__ = "notification_logs"
+    __table_args__ = (
+        Index("ix_notification_logs_status_id", "status", "id"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
-    reminder_instance_id = Column(Integer, ForeignKey("reminder_instances.id", ondelete="CASCADE"), nullable=False)
+    reminder_instance_id = Column(Integer, ForeignKey("reminder_instances.id", ondelete="CASCADE"), nullable=False, index=True)
     notification_type = Column(String(50), nullable=False)
     recepient_phone = Column(String, nullable=False)  # Nota: typo en la BD original
     status = Column(String(50), nullable=False)
@@ -91,6 +115,58 @@ class NotificationLog(Base):
     error_message = Column(Text, nullable=True)
 
 
+class MessageCorrelation(Base):
+    __tablename__ = "message_correlations"
+    __table_args__ = (
+        UniqueConstraint("channel", "provider_message_id", name="uq_message_correlations_channel_message"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    channel = Column(String(20), nullable=False)  # "whatsapp" o "telegram"
+    provider_message_id = Column(String(255), nullable=False)  # wamid de Kapso o "chat_id:message_id" de Telegram
+    reminder_instance_id = Column(Integer, ForeignKey("reminder_instances.id", ondelete="CASCADE"), nullable=False)
+    created_at = Column(DateTime, server_default=func.current_timestamp(), nullable=True)
+
+
+class ReminderDailyRollup(Base):
+    __tablename__ = "reminder_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("reminder_id", "day", "status", name="uq_reminder_daily_rollups_reminder_day_status"),
+        Index("ix_reminder_daily_rollups_elderly_profile_id_day", "elderly_profile_id", "day"),
+    )
+
+    # Resumen diario de instancias por reminder y estado, para no re-escanear reminder_instances
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    reminder_id = Column(Integer, ForeignKey("reminders.id", ondelete="CASCADE"), nullable=False)
+    elderly_profile_id = Column(Integer, nullable=True)  # Adulto mayor resuelto (services/elderly_resolution.py), para filtrar sin join
+    medicine_id = Column(Integer, nullable=True)  # Copiado de reminders.medicine
+    day = Column(Date, nullable=False)
+    status = Column(String(20), nullable=False)
+    count = Column(Integer, nullable=False, default=0)
+    latency_count = Column(Integer, nullable=False, default=0)  # Tomas con taken_at
+    latency_seconds_sum = Column(Float, nullable=False, default=0)  # Suma de taken_at - scheduled_datetime
+    on_time_count = Column(Integer, nullable=False, default=0)  # Tomas dentro de ADHERENCE_ON_TIME_MINUTES
+    updated_at = Column(DateTime, server_default=func.current_timestamp(), onupdate=func.current_timestamp(), nullable=True)
+
+
+class WebhookEvent(Base):
+    __tablename__ = "webhook_events"
+    __table_args__ = (
+        UniqueConstraint("provider", "event_key", name="uq_webhook_events_provider_event_key"),
+        Index("ix_webhook_events_status_id", "status", "id"),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    provider = Column(String(20), nullable=False)  # "whatsapp" o "telegram"
+    event_key = Column(String(255), nullable=False)  # Llave de idempotencia: id del mensaje de Kapso o update_id de Telegram
+    payload = Column(Text, nullable=False)  # Body crudo del webhook (JSON)
+    status = Column(String(20), default=WebhookEventStatus.PENDING.value, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    error_message = Column(Text, nullable=True)
+    received_at = Column(DateTime, server_default=func.current_timestamp(), nullable=True)
+    processed_at = Column(DateTime, nullable=True)
+
+
 class Reminder(Base):
     __tablename__ = "reminders"
 
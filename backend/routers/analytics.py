@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from datetime import date, timedelta
+from typing import Optional
+from database import get_db
+from services.adherence import AdherenceService
+from dtos.adherence import AdherenceSummaryResponse
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("/elderly/{elderly_profile_id}/adherence", response_model=AdherenceSummaryResponse)
+async def get_elderly_adherence(
+    elderly_profile_id: int,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """Adherencia de un adulto mayor por medicamento y por día (por defecto, los últimos 30 días)"""
+    end_date = end_date or date.today()
+    start_date = start_date or end_date - timedelta(days=29)
+    try:
+        return AdherenceService.get_summary(db, elderly_profile_id, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
@@ -1,20 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List
 from database import get_db
+from services.conditional import entity_not_modified, collection_not_modified
 from services.appointments import AppointmentService
+from services.response_cache import response_cache, appointments_tag
 from dtos.appointments import AppointmentCreate, AppointmentUpdate, AppointmentResponse
+from dtos.bulk import BulkResult
 
 router = APIRouter(prefix="/appointments", tags=["appointments"])
 
 
 @router.get("/", response_model=List[AppointmentResponse])
 async def get_appointments(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
-    """Obtener todas las citas con paginación"""
+    """Obtener todas las citas con paginación (soporta If-None-Match / If-Modified-Since)"""
+    not_modified = collection_not_modified(request, response, db, AppointmentService.query_all(db, skip=skip, limit=limit))
+    if not_modified:
+        return not_modified
     appointments = AppointmentService.get_all(db, skip=skip, limit=limit)
     return appointments
 
@@ -22,6 +30,8 @@ async def get_appointments(
 @router.get("/{appointment_id}", response_model=AppointmentResponse)
 async def get_appointment(
     appointment_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Obtener una cita por su ID"""
@@ -31,6 +41,9 @@ async def get_appointment(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Cita con ID {appointment_id} no encontrada"
         )
+    not_modified = entity_not_modified(request, response, "appointments", appointment)
+    if not_modified:
+        return not_modified
     return appointment
 
 
@@ -55,6 +68,38 @@ async def create_appointment(
         )
 
 
+@router.post("/bulk", response_model=BulkResult[AppointmentResponse])
+async def bulk_create_appointments(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """Crear varios citas en una sola transacción; los elementos que fallan se reportan en `errors` por índice"""
+    try:
+        created, errors = AppointmentService.bulk_create(db, items)
+        return BulkResult[AppointmentResponse](items=created, errors=errors)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.patch("/bulk", response_model=BulkResult[AppointmentResponse])
+async def bulk_update_appointments(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """Actualizar varios citas (cada elemento lleva su `id`) en una sola transacción; los que fallan se reportan en `errors`"""
+    try:
+        updated, errors = AppointmentService.bulk_update(db, items)
+        return BulkResult[AppointmentResponse](items=updated, errors=errors)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.put("/{appointment_id}", response_model=AppointmentResponse)
 async def update_appointment(
     appointment_id: int,
@@ -117,19 +162,31 @@ async def delete_appointment(
 @router.get("/elderly/{elderly_id}", response_model=List[AppointmentResponse])
 async def get_appointments_by_elderly(
     elderly_id: int,
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    """Obtener todas las citas de un adulto mayor"""
-    appointments = AppointmentService.get_by_elderly_id(db, elderly_id)
-    return appointments
+    """Obtener todas las citas de un adulto mayor (cacheado con ETag)"""
+    return response_cache.respond(
+        request,
+        List[AppointmentResponse],
+        tags=[appointments_tag(elderly_id)],
+        build=lambda: AppointmentService.get_by_elderly_id(db, elderly_id)
+    )
 
 
 @router.get("/health-worker/{health_worker_id}", response_model=List[AppointmentResponse])
 async def get_appointments_by_health_worker(
     health_worker_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
-    """Obtener todas las citas de un trabajador de salud"""
+    """Obtener todas las citas de un trabajador de salud (soporta If-None-Match / If-Modified-Since)"""
+    not_modified = collection_not_modified(
+        request, response, db, AppointmentService.query_by_health_worker_id(db, health_worker_id)
+    )
+    if not_modified:
+        return not_modified
     appointments = AppointmentService.get_by_health_worker_id(db, health_worker_id)
     return appointments
 
@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from database import get_db
+from services.auth import AuthService, get_current_user
+from dtos.auth import LoginRequest, TokenResponse
+from dtos.users import UserResponse
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+
+@router.post("/login", response_model=TokenResponse)
+async def login(
+    credentials: LoginRequest,
+    db: Session = Depends(get_db)
+):
+    """Iniciar sesión con email y contraseña; retorna un JWT para el header Authorization: Bearer"""
+    token = await AuthService.login(db, credentials.email, credentials.password)
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email o contraseña incorrectos",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return token
+
+
+@router.get("/me", response_model=UserResponse)
+async def get_me(user: UserResponse = Depends(get_current_user)):
+    """Obtener el usuario autenticado (sin query a la base mientras esté en el cache)"""
+    return user
@@ -1,20 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
+from services.conditional import entity_not_modified, collection_not_modified
 from services.elderly_profiles import ElderlyProfileService
-from dtos.elderly_profiles import ElderlyProfileCreate, ElderlyProfileUpdate, ElderlyProfileResponse
+from services.care_overview import CareOverviewService
+from dtos.elderly_profiles import ElderlyProfileCreate, ElderlyProfileUpdate, ElderlyProfileResponse, ElderlyCareOverviewResponse
 
 router = APIRouter(prefix="/elderly-profiles", tags=["elderly-profiles"])
 
 
 @router.get("/", response_model=List[ElderlyProfileResponse])
 async def get_elderly_profiles(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
-    """Obtener todos los perfiles de adultos mayores con paginación"""
+    """Obtener todos los perfiles de adultos mayores con paginación (soporta If-None-Match / If-Modified-Since)"""
+    not_modified = collection_not_modified(request, response, db, ElderlyProfileService.query_all(db, skip=skip, limit=limit))
+    if not_modified:
+        return not_modified
     profiles = ElderlyProfileService.get_all(db, skip=skip, limit=limit)
     return profiles
 
@@ -22,6 +29,8 @@ async def get_elderly_profiles(
 @router.get("/{profile_id}", response_model=ElderlyProfileResponse)
 async def get_elderly_profile(
     profile_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Obtener un perfil por su ID"""
@@ -31,9 +40,27 @@ async def get_elderly_profile(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Perfil con ID {profile_id} no encontrado"
         )
+    not_modified = entity_not_modified(request, response, "elderly_profiles", profile)
+    if not_modified:
+        return not_modified
     return profile
 
 
+@router.get("/{profile_id}/overview", response_model=ElderlyCareOverviewResponse)
+async def get_elderly_care_overview(
+    profile_id: int,
+    db: Session = Depends(get_db)
+):
+    """Obtener perfil, medicamentos, recordatorios, instancias de hoy, citas y familiares en una sola llamada"""
+    overview = CareOverviewService.get_overview(db, profile_id)
+    if not overview:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Perfil con ID {profile_id} no encontrado"
+        )
+    return overview
+
+
 @router.post("/", response_model=ElderlyProfileResponse, status_code=status.HTTP_201_CREATED)
 async def create_elderly_profile(
     profile_data: ElderlyProfileCreate,
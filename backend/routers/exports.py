@@ -0,0 +1,73 @@
+from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Callable, Optional, Type
+from services.exports import ExportService
+from services.streaming import stream_ndjson, stream_csv
+from dtos.exports import ReminderHistoryExportRow, NotificationLogExportRow
+from enums import ExportFormat
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+
+def _export_response(
+    build_query: Callable[[Any], Any],
+    row_model: Type[BaseModel],
+    export_format: ExportFormat,
+    filename: str
+) -> StreamingResponse:
+    """Respuesta streaming en NDJSON o CSV; las filas se leen con yield_per en una sesión propia"""
+    if export_format == ExportFormat.CSV:
+        body = stream_csv(build_query, row_model.model_validate, list(row_model.model_fields))
+        media_type = "text/csv"
+    else:
+        body = stream_ndjson(build_query, row_model.model_validate)
+        media_type = "application/x-ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'}
+    )
+
+
+def _validate_range(start_date: Optional[datetime], end_date: Optional[datetime]) -> None:
+    if start_date and end_date and start_date >= end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date debe ser anterior a end_date"
+        )
+
+
+@router.get("/reminder-history")
+async def export_reminder_history(
+    format: ExportFormat = ExportFormat.NDJSON,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    elderly_profile_id: Optional[int] = None
+):
+    """Exportar el historial de recordatorios (instancias con su medicina) filtrado por fechas y adulto mayor"""
+    _validate_range(start_date, end_date)
+    return _export_response(
+        lambda db: ExportService.query_reminder_history(db, start_date, end_date, elderly_profile_id),
+        ReminderHistoryExportRow,
+        format,
+        "reminder_history"
+    )
+
+
+@router.get("/notification-logs")
+async def export_notification_logs(
+    format: ExportFormat = ExportFormat.NDJSON,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    elderly_profile_id: Optional[int] = None
+):
+    """Exportar los logs de notificaciones filtrados por fecha de envío y adulto mayor"""
+    _validate_range(start_date, end_date)
+    return _export_response(
+        lambda db: ExportService.query_notification_logs(db, start_date, end_date, elderly_profile_id),
+        NotificationLogExportRow,
+        format,
+        "notification_logs"
+    )
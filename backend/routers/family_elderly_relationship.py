@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Request
 from sqlalchemy.orm import Session
 from typing import List
 from database import get_db
 from services.family_elderly_relationship import FamilyElderlyRelationshipService
+from services.response_cache import response_cache, family_relationships_tag
 from dtos.family_elderly_relationship import FamilyElderlyRelationshipCreate, FamilyElderlyRelationshipUpdate, FamilyElderlyRelationshipResponse
 
 router = APIRouter(prefix="/family-elderly-relationships", tags=["family-elderly-relationships"])
@@ -37,11 +38,16 @@ async def get_family_elderly_relationship(
 @router.get("/elderly/{elderly_id}", response_model=List[FamilyElderlyRelationshipResponse])
 async def get_relationships_by_elderly(
     elderly_id: int,
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    """Obtener todas las relaciones de un adulto mayor"""
-    relationships = FamilyElderlyRelationshipService.get_by_elderly_id(db, elderly_id)
-    return relationships
+    """Obtener todas las relaciones de un adulto mayor (cacheado con ETag)"""
+    return response_cache.respond(
+        request,
+        List[FamilyElderlyRelationshipResponse],
+        tags=[family_relationships_tag(elderly_id)],
+        build=lambda: FamilyElderlyRelationshipService.get_by_elderly_id(db, elderly_id)
+    )
 
 
 @router.get("/family-member/{family_member_id}", response_model=List[FamilyElderlyRelationshipResponse])
@@ -1,27 +1,48 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, status, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List
 from database import get_db
+from services.conditional import entity_not_modified, collection_not_modified
 from services.medicines import MedicineService
-from dtos.medicines import MedicineCreate, MedicineUpdate, MedicineResponse
+from services.pagination import MAX_PAGE_SIZE
+from services.stock_forecast import StockForecastService
+from services.response_cache import response_cache, medicines_tag
+from dtos.medicines import MedicineCreate, MedicineUpdate, MedicineResponse, MedicineStockBalanceResponse, MedicineStockLedgerResponse, MedicineStockForecastResponse
+from dtos.bulk import BulkResult
 
 router = APIRouter(prefix="/medicines", tags=["medicines"])
 
 
 @router.get("/", response_model=List[MedicineResponse])
 async def get_medicines(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
-    """Obtener todos los medicamentos con paginación"""
+    """Obtener todos los medicamentos con paginación (soporta If-None-Match / If-Modified-Since)"""
+    not_modified = collection_not_modified(request, response, db, MedicineService.query_all(db, skip=skip, limit=limit))
+    if not_modified:
+        return not_modified
     medicines = MedicineService.get_all(db, skip=skip, limit=limit)
     return medicines
 
 
+@router.get("/low-stock", response_model=List[MedicineStockForecastResponse])
+async def get_low_stock_medicines(
+    days: float = 7,
+    db: Session = Depends(get_db)
+):
+    """Obtener los medicamentos que se quedan sin stock dentro de `days` días (desde el cache de pronósticos)"""
+    return StockForecastService.get_low_stock(db, days=days)
+
+
 @router.get("/{medicine_id}", response_model=MedicineResponse)
 async def get_medicine(
     medicine_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Obtener un medicamento por su ID"""
@@ -31,17 +52,65 @@ async def get_medicine(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Medicamento con ID {medicine_id} no encontrado"
         )
+    not_modified = entity_not_modified(request, response, "medicines", medicine)
+    if not_modified:
+        return not_modified
     return medicine
 
 
+@router.get("/{medicine_id}/stock", response_model=MedicineStockBalanceResponse)
+async def get_medicine_stock(
+    medicine_id: int,
+    db: Session = Depends(get_db)
+):
+    """Obtener el saldo de stock y los días restantes de un medicamento"""
+    balance = MedicineService.get_stock_balance(db, medicine_id)
+    if not balance:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Medicamento con ID {medicine_id} no encontrado"
+        )
+    return balance
+
+
+@router.get("/{medicine_id}/forecast", response_model=MedicineStockForecastResponse)
+async def get_medicine_forecast(
+    medicine_id: int,
+    db: Session = Depends(get_db)
+):
+    """Obtener la fecha estimada en que un medicamento se queda sin stock"""
+    forecast = StockForecastService.get_forecast(db, medicine_id)
+    if not forecast:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Medicamento con ID {medicine_id} no encontrado"
+        )
+    return forecast
+
+
+@router.get("/{medicine_id}/stock-ledger", response_model=List[MedicineStockLedgerResponse])
+async def get_medicine_stock_ledger(
+    medicine_id: int,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Obtener los movimientos de stock más recientes de un medicamento"""
+    return MedicineService.get_stock_ledger(db, medicine_id, limit=limit)
+
+
 @router.get("/elderly/{elderly_id}", response_model=List[MedicineResponse])
 async def get_medicines_by_elderly(
     elderly_id: int,
+    request: Request,
     db: Session = Depends(get_db)
 ):
-    """Obtener todos los medicamentos de un adulto mayor"""
-    medicines = MedicineService.get_by_elderly_id(db, elderly_id)
-    return medicines
+    """Obtener todos los medicamentos de un adulto mayor (cacheado con ETag)"""
+    return response_cache.respond(
+        request,
+        List[MedicineResponse],
+        tags=[medicines_tag(elderly_id)],
+        build=lambda: MedicineService.get_by_elderly_id(db, elderly_id)
+    )
 
 
 @router.post("/", response_model=MedicineResponse, status_code=status.HTTP_201_CREATED)
@@ -65,6 +134,38 @@ async def create_medicine(
         )
 
 
+@router.post("/bulk", response_model=BulkResult[MedicineResponse])
+async def bulk_create_medicines(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """Crear varios medicamentos en una sola transacción; los elementos que fallan se reportan en `errors` por índice"""
+    try:
+        created, errors = MedicineService.bulk_create(db, items)
+        return BulkResult[MedicineResponse](items=created, errors=errors)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.patch("/bulk", response_model=BulkResult[MedicineResponse])
+async def bulk_update_medicines(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """Actualizar varios medicamentos (cada elemento lleva su `id`) en una sola transacción; los que fallan se reportan en `errors`"""
+    try:
+        updated, errors = MedicineService.bulk_update(db, items)
+        return BulkResult[MedicineResponse](items=updated, errors=errors)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.put("/{medicine_id}", response_model=MedicineResponse)
 async def update_medicine(
     medicine_id: int,
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import get_db
 from services.notification_logs import NotificationLogService
 from dtos.notification_logs import NotificationLogCreate, NotificationLogUpdate, NotificationLogResponse
+from dtos.pagination import Page
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.streaming import stream_ndjson
 
 router = APIRouter(prefix="/notification-logs", tags=["notification-logs"])
 
@@ -19,6 +23,23 @@ async def get_notification_logs(
     return logs
 
 
+@router.get("/page", response_model=Page[NotificationLogResponse])
+async def get_notification_logs_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Obtener logs de notificaciones paginados por cursor. Usar next_cursor de la respuesta para pedir la página siguiente."""
+    try:
+        items, next_cursor = NotificationLogService.get_page(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Page[NotificationLogResponse](items=items, next_cursor=next_cursor, limit=limit)
+
+
 @router.get("/{log_id}", response_model=NotificationLogResponse)
 async def get_notification_log(
     log_id: int,
@@ -47,11 +68,28 @@ async def get_notification_logs_by_reminder_instance(
 @router.get("/status/{status}", response_model=List[NotificationLogResponse])
 async def get_notification_logs_by_status(
     status: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Obtener todos los logs de notificaciones por estado"""
-    logs = NotificationLogService.get_by_status(db, status)
-    return logs
+    """Obtener los logs de notificaciones por estado (paginado: el cursor de la siguiente página viene en X-Next-Cursor; con stream=true se devuelve todo como NDJSON)"""
+    if stream:
+        return StreamingResponse(
+            stream_ndjson(lambda s: NotificationLogService.query_by_status(s, status), NotificationLogResponse.model_validate),
+            media_type="application/x-ndjson"
+        )
+    try:
+        items, next_cursor = NotificationLogService.get_by_status(db, status, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,  # el path param `status` oculta fastapi.status
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.post("/", response_model=NotificationLogResponse, status_code=status.HTTP_201_CREATED)
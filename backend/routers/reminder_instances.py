@@ -1,9 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from datetime import date, timedelta
 from database import get_db
 from services.reminder_instances import ReminderInstanceService
+from enums import ReminderInstanceStatus
 from dtos.reminder_instances import ReminderInstanceCreate, ReminderInstanceUpdate, ReminderInstanceResponse, ReminderInstanceWithMedicineResponse
+from dtos.pagination import Page
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.streaming import stream_ndjson
+from services.json_projection import rows_response
+from services.adherence import AdherenceService
+from dtos.adherence import DailyAdherence
 
 router = APIRouter(prefix="/reminder-instances", tags=["reminder-instances"])
 
@@ -19,6 +28,23 @@ async def get_reminder_instances(
     return instances
 
 
+@router.get("/page", response_model=Page[ReminderInstanceResponse])
+async def get_reminder_instances_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Obtener instancias de recordatorios paginadas por cursor (scheduled_datetime, id). Usar next_cursor de la respuesta para pedir la página siguiente."""
+    try:
+        items, next_cursor = ReminderInstanceService.get_page(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Page[ReminderInstanceResponse](items=items, next_cursor=next_cursor, limit=limit)
+
+
 @router.get("/with-medicine", response_model=List[ReminderInstanceWithMedicineResponse])
 async def get_reminder_instances_with_medicine(
     skip: int = 0,
@@ -26,8 +52,7 @@ async def get_reminder_instances_with_medicine(
     db: Session = Depends(get_db)
 ):
     """Obtener todas las instancias con datos de reminder y medicina (optimizado con join)"""
-    instances = ReminderInstanceService.get_all_with_medicine(db, skip=skip, limit=limit)
-    return instances
+    return rows_response(ReminderInstanceService.get_all_with_medicine_rows(db, skip=skip, limit=limit))
 
 
 @router.get("/today/with-medicine", response_model=List[ReminderInstanceWithMedicineResponse])
@@ -35,8 +60,7 @@ async def get_today_reminder_instances_with_medicine(
     db: Session = Depends(get_db)
 ):
     """Obtener instancias de hoy con datos de reminder y medicina (optimizado con join)"""
-    instances = ReminderInstanceService.get_today_with_medicine(db)
-    return instances
+    return rows_response(ReminderInstanceService.get_today_with_medicine_rows(db))
 
 
 @router.get("/month/{year}/{month}/with-medicine", response_model=List[ReminderInstanceWithMedicineResponse])
@@ -51,48 +75,125 @@ async def get_month_reminder_instances_with_medicine(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="El mes debe estar entre 1 y 12"
         )
-    instances = ReminderInstanceService.get_by_month_with_medicine(db, year, month)
-    return instances
+    return rows_response(ReminderInstanceService.get_by_month_with_medicine_rows(db, year, month))
+
+
+@router.get("/today/summary", response_model=List[DailyAdherence])
+async def get_today_reminder_instances_summary(
+    elderly_profile_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Conteo de instancias de hoy por estado, leído del rollup diario"""
+    today = date.today()
+    return AdherenceService.get_daily(db, today, today + timedelta(days=1), elderly_profile_id)
+
+
+@router.get("/month/{year}/{month}/summary", response_model=List[DailyAdherence])
+async def get_month_reminder_instances_summary(
+    year: int,
+    month: int,
+    elderly_profile_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Conteo por día y estado de un mes específico, leído del rollup diario (para el calendario)"""
+    if month < 1 or month > 12:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El mes debe estar entre 1 y 12"
+        )
+    start_day = date(year, month, 1)
+    end_day = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return AdherenceService.get_daily(db, start_day, end_day, elderly_profile_id)
 
 
 @router.get("/pending/all", response_model=List[ReminderInstanceResponse])
 async def get_pending_reminder_instances(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Obtener todas las instancias pendientes"""
-    instances = ReminderInstanceService.get_pending(db)
-    return instances
+    """Obtener las instancias pendientes (paginado: el cursor de la siguiente página viene en X-Next-Cursor; con stream=true se devuelve todo como NDJSON)"""
+    if stream:
+        return StreamingResponse(
+            stream_ndjson(lambda s: ReminderInstanceService.query_by_status(s, ReminderInstanceStatus.PENDING.value), ReminderInstanceResponse.model_validate),
+            media_type="application/x-ndjson"
+        )
+    try:
+        items, next_cursor = ReminderInstanceService.get_pending(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/reminder/{reminder_id}", response_model=List[ReminderInstanceResponse])
 async def get_reminder_instances_by_reminder(
     reminder_id: int,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Obtener todas las instancias de un recordatorio"""
-    instances = ReminderInstanceService.get_by_reminder_id(db, reminder_id)
-    return instances
+    """Obtener las instancias de un recordatorio (paginado: el cursor de la siguiente página viene en X-Next-Cursor; con stream=true se devuelve todo como NDJSON)"""
+    if stream:
+        return StreamingResponse(
+            stream_ndjson(lambda s: ReminderInstanceService.query_by_reminder_id(s, reminder_id), ReminderInstanceResponse.model_validate),
+            media_type="application/x-ndjson"
+        )
+    try:
+        items, next_cursor = ReminderInstanceService.get_by_reminder_id(db, reminder_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/reminder/{reminder_id}/with-medicine", response_model=List[ReminderInstanceWithMedicineResponse])
 async def get_reminder_instances_by_reminder_with_medicine(
     reminder_id: int,
-    limit: Optional[int] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     db: Session = Depends(get_db)
 ):
-    """Obtener instancias de un recordatorio con datos de medicina (optimizado con join)"""
-    instances = ReminderInstanceService.get_by_reminder_id_with_medicine(db, reminder_id, limit=limit)
-    return instances
+    """Obtener las instancias más recientes de un recordatorio con datos de medicina (a lo más MAX_PAGE_SIZE)"""
+    return rows_response(ReminderInstanceService.get_by_reminder_id_with_medicine_rows(db, reminder_id, limit=limit))
 
 
 @router.get("/status/{status}", response_model=List[ReminderInstanceResponse])
 async def get_reminder_instances_by_status(
     status: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Obtener todas las instancias por estado"""
-    instances = ReminderInstanceService.get_by_status(db, status)
-    return instances
+    """Obtener las instancias por estado (paginado: el cursor de la siguiente página viene en X-Next-Cursor; con stream=true se devuelve todo como NDJSON)"""
+    if stream:
+        return StreamingResponse(
+            stream_ndjson(lambda s: ReminderInstanceService.query_by_status(s, status), ReminderInstanceResponse.model_validate),
+            media_type="application/x-ndjson"
+        )
+    try:
+        items, next_cursor = ReminderInstanceService.get_by_status(db, status, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,  # el path param `status` oculta fastapi.status
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/{instance_id}", response_model=ReminderInstanceResponse)
@@ -1,20 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Request, BackgroundTasks, Query, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime
 from database import get_db
+from services.conditional import entity_not_modified, collection_not_modified
 from services.reminders import ReminderService
 from services.reminder_scheduler import ReminderSchedulerService
 from services.reminder_instances import ReminderInstanceService
-from services.notification_logs import NotificationLogService
+from services.webhook_events import WebhookEventService
+from services.cron_service import process_webhook_events_job
 from dtos.reminders import ReminderCreate, ReminderUpdate, ReminderResponse, ReminderWithMedicineResponse
-from dtos.reminder_instances import ReminderInstanceUpdate
-from dtos.notification_logs import NotificationLogUpdate
-from enums import ReminderInstanceStatus
+from dtos.pagination import Page
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.streaming import stream_ndjson
+from services.json_projection import dump_rows
+from services.response_cache import response_cache, REMINDERS_TAG, MEDICINES_TAG
+from dtos.bulk import BulkResult
 import logging
-import httpx
-import os
-from models import ReminderInstance, Reminder, Medicine
 
 logger = logging.getLogger(__name__)
 
@@ -23,57 +26,137 @@ router = APIRouter(prefix="/reminders", tags=["reminders"])
 
 @router.get("/", response_model=List[ReminderResponse])
 async def get_reminders(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
-    """Obtener todos los recordatorios con paginación"""
+    """Obtener todos los recordatorios con paginación (soporta If-None-Match / If-Modified-Since)"""
+    not_modified = collection_not_modified(request, response, db, ReminderService.query_all(db, skip=skip, limit=limit))
+    if not_modified:
+        return not_modified
     reminders = ReminderService.get_all(db, skip=skip, limit=limit)
     return reminders
 
 
+@router.get("/page", response_model=Page[ReminderResponse])
+async def get_reminders_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Obtener recordatorios paginados por cursor. Usar next_cursor de la respuesta para pedir la página siguiente."""
+    try:
+        items, next_cursor = ReminderService.get_page(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Page[ReminderResponse](items=items, next_cursor=next_cursor, limit=limit)
+
+
 @router.get("/with-medicine", response_model=List[ReminderWithMedicineResponse])
 async def get_reminders_with_medicine(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db)
 ):
-    """Obtener todos los recordatorios con datos de medicina (optimizado con join)"""
-    reminders = ReminderService.get_all_with_medicine(db, skip=skip, limit=limit)
-    return reminders
+    """Obtener todos los recordatorios con datos de medicina (optimizado con join, cacheado con ETag)"""
+    return response_cache.respond(
+        request,
+        List[ReminderWithMedicineResponse],
+        tags=[REMINDERS_TAG, MEDICINES_TAG],
+        render=lambda: dump_rows(ReminderService.get_all_with_medicine_rows(db, skip=skip, limit=limit))
+    )
 
 
 @router.get("/active/all", response_model=List[ReminderResponse])
 async def get_active_reminders(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Obtener todos los recordatorios activos"""
-    reminders = ReminderService.get_active(db)
-    return reminders
+    """Obtener los recordatorios activos (paginado: el cursor de la siguiente página viene en X-Next-Cursor; con stream=true se devuelve todo como NDJSON)"""
+    if stream:
+        return StreamingResponse(
+            stream_ndjson(ReminderService.query_active, ReminderResponse.model_validate),
+            media_type="application/x-ndjson"
+        )
+    try:
+        items, next_cursor = ReminderService.get_active(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/active/with-medicine", response_model=List[ReminderWithMedicineResponse])
 async def get_active_reminders_with_medicine(
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Obtener todos los recordatorios activos con datos de medicina (optimizado con join)"""
-    reminders = ReminderService.get_active_with_medicine(db)
-    return reminders
+    """Obtener los recordatorios activos con datos de medicina (optimizado con join) (paginado: el cursor de la siguiente página viene en X-Next-Cursor; con stream=true se devuelve todo como NDJSON)"""
+    if stream:
+        return StreamingResponse(
+            stream_ndjson(ReminderService.query_active_with_medicine, lambda row: ReminderService.to_with_medicine_response(*row)),
+            media_type="application/x-ndjson"
+        )
+    try:
+        items, next_cursor = ReminderService.get_active_with_medicine(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/type/{reminder_type}", response_model=List[ReminderResponse])
 async def get_reminders_by_type(
     reminder_type: str,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    stream: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Obtener todos los recordatorios por tipo"""
-    reminders = ReminderService.get_by_type(db, reminder_type)
-    return reminders
+    """Obtener los recordatorios por tipo (paginado: el cursor de la siguiente página viene en X-Next-Cursor; con stream=true se devuelve todo como NDJSON)"""
+    if stream:
+        return StreamingResponse(
+            stream_ndjson(lambda s: ReminderService.query_by_type(s, reminder_type), ReminderResponse.model_validate),
+            media_type="application/x-ndjson"
+        )
+    try:
+        items, next_cursor = ReminderService.get_by_type(db, reminder_type, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return items
 
 
 @router.get("/{reminder_id}", response_model=ReminderResponse)
 async def get_reminder(
     reminder_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db)
 ):
     """Obtener un recordatorio por su ID"""
@@ -83,6 +166,9 @@ async def get_reminder(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Recordatorio con ID {reminder_id} no encontrado"
         )
+    not_modified = entity_not_modified(request, response, "reminders", reminder)
+    if not_modified:
+        return not_modified
     return reminder
 
 
@@ -107,6 +193,38 @@ async def create_reminder(
         )
 
 
+@router.post("/bulk", response_model=BulkResult[ReminderResponse])
+async def bulk_create_reminders(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """Crear varios recordatorios en una sola transacción; los elementos que fallan se reportan en `errors` por índice"""
+    try:
+        created, errors = ReminderService.bulk_create(db, items)
+        return BulkResult[ReminderResponse](items=created, errors=errors)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.patch("/bulk", response_model=BulkResult[ReminderResponse])
+async def bulk_update_reminders(
+    items: List[Dict[str, Any]] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """Actualizar varios recordatorios (cada elemento lleva su `id`) en una sola transacción; los que fallan se reportan en `errors`"""
+    try:
+        updated, errors = ReminderService.bulk_update(db, items)
+        return BulkResult[ReminderResponse](items=updated, errors=errors)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.put("/{reminder_id}", response_model=ReminderResponse)
 async def update_reminder(
     reminder_id: int,
@@ -204,16 +322,20 @@ async def check_reminders(
 @router.post("/webhook")
 async def whatsapp_webhook(
     request: Request,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
     Webhook para recibir respuestas de WhatsApp desde Kapso.
-    Actualiza el reminder_instance y notification_log con la respuesta del usuario.
+    Valida el payload, lo guarda en el inbox durable (webhook_events) y responde de inmediato.
+    Las transiciones de estado las aplica el consumidor en segundo plano.
     
     Payload esperado de Kapso:
     {
         "message": {
+            "id": "wamid.respuesta",
             "from": "56979745451",
+            "context": {"id": "wamid.mensaje_original"},
             "interactive": {
                 "type": "button_reply",
                 "button_reply": {
@@ -229,143 +351,51 @@ async def whatsapp_webhook(
     """
     try:
         body = await request.json()
-        logger.info(f"Webhook recibido: {body}")
-        
-        # Extraer información del payload de Kapso
-        phone_number = None
-        user_response = None
-        button_id = None
-        button_title = None
         
-        # Obtener número de teléfono del remitente
-        if "message" in body and "from" in body["message"]:
-            phone_number = body["message"]["from"]
-        elif "conversation" in body and "phone_number" in body["conversation"]:
-            phone_number = body["conversation"]["phone_number"]
-        
-        # Obtener respuesta del botón si es un mensaje interactivo
-        if "message" in body and "interactive" in body["message"]:
-            interactive = body["message"]["interactive"]
-            if interactive.get("type") == "button_reply" and "button_reply" in interactive:
-                button_reply = interactive["button_reply"]
-                button_id = button_reply.get("id")
-                button_title = button_reply.get("title")
-                user_response = f"{button_id}: {button_title}" if button_id and button_title else button_id or button_title
+        if not isinstance(body, dict):
+            return {"status": "error", "message": "Payload inválido"}
         
+        message = body.get("message", {})
+        phone_number = message.get("from") or body.get("conversation", {}).get("phone_number")
         if not phone_number:
-            logger.warning(f"No se pudo obtener phone_number del webhook: {body}")
+            logger.warning("No se pudo obtener phone_number del webhook")
+            logger.debug("Payload del webhook sin phone_number: %s", body)
             return {
                 "status": "error",
                 "message": "No se pudo obtener el número de teléfono del webhook"
             }
         
-        # Buscar reminder_instance por message_id del mensaje original
-        message_id = body.get("message", {}).get("context", {}).get("id", None)
-        
-        if not message_id:
+        if not message.get("context", {}).get("id"):
             logger.warning("No se pudo obtener message_id del webhook")
             return {
                 "status": "error",
                 "message": "No se pudo obtener message_id del mensaje"
             }
         
-        reminder_instance = db.query(ReminderInstance).filter(
-            ReminderInstance.message_id == message_id
-        ).first()
-        
-        if not reminder_instance:
-            logger.warning(f"No se encontró reminder_instance para message_id {message_id}")
-            return {
-                "status": "error",
-                "message": f"No se encontró reminder_instance para el message_id {message_id}"
-            }
-        
-        reminder_instance_id = reminder_instance.id
-        
-        # Determinar el estado según la respuesta del botón
-        # "taken" o "btn_yes" o "Si" = respuesta positiva
-        # "skip" o "btn_no" o "No" = respuesta negativa
-        is_positive_response = (
-            button_id in ["taken", "btn_yes"] or 
-            button_title and button_title.lower() in ["sí", "si", "yes", "ya lo tomé"]
-        )
-        print('is_positive_response', is_positive_response)
-        
-        # Status del notification_log: "sent" si fue sí, "rejected" si fue no
-        log_status = "sent" if is_positive_response else "rejected"
-        print('log_status', log_status)
-        
-        # Status del reminder_instance
-        instance_status = ReminderInstanceStatus.SUCCESS.value if is_positive_response else ReminderInstanceStatus.REJECTED.value
-        print('instance_status', instance_status)
-
-        # Crear nuevo notification_log con la respuesta
-        from models import NotificationLog
-        notification_log = NotificationLog(
-            reminder_instance_id=reminder_instance_id,
-            notification_type="whatsapp",
-            recepient_phone=phone_number,
-            status=log_status,
-            sent_at=datetime.now(),
-            delivered_at=datetime.now(),
-            response=user_response or f"Respuesta recibida: {button_id or button_title}"
-        )
-        db.add(notification_log)
-        db.flush()
-        db.refresh(notification_log)
-        
-        # Actualizar reminder_instance status directamente (sin usar el servicio para evitar commit prematuro)
-        reminder_instance.status = instance_status
-        if is_positive_response:
-            reminder_instance.taken_at = datetime.now()
-        db.flush()
-        
-        # Si la respuesta fue positiva, restar 1 al total de tablets_left de la medicina
-        if is_positive_response:
-            # Obtener el reminder del reminder_instance
-            reminder = db.query(Reminder).filter(Reminder.id == reminder_instance.reminder_id).first()
-            
-            if reminder and reminder.medicine:
-                medicine = db.query(Medicine).filter(Medicine.id == reminder.medicine).first()
-                
-                if medicine and medicine.tablets_left is not None and medicine.tablets_left > 0:
-                    # Restar 1 al total de tablets_left
-                    medicine.tablets_left = medicine.tablets_left - 1
-                    print(f"Medicina {medicine.id} ({medicine.name}): tablets_left actualizado de {medicine.tablets_left + 1} a {medicine.tablets_left}")
-                elif medicine:
-                    print(f"Medicina {medicine.id} ({medicine.name}): tablets_left es {medicine.tablets_left}, no se puede restar")
-            elif reminder:
-                print(f"Reminder {reminder.id} no tiene medicine asociada")
-            else:
-                print(f"No se encontró reminder con id {reminder_instance.reminder_id}")
-        
-        # Hacer un solo commit al final para guardar todos los cambios (notification_log, reminder_instance, medicine)
-        db.commit()
-        
-        logger.info(f"NotificationLog {notification_log.id} creado con status {log_status}. Reminder instance {reminder_instance_id} actualizado a {instance_status}. Respuesta: {user_response}")
+        event_key = WebhookEventService.whatsapp_event_key(body)
+        event = WebhookEventService.enqueue(db, "whatsapp", event_key, body)
+        if event:
+            background_tasks.add_task(process_webhook_events_job)
         
         return {
-            "status": "success",
-            "reminder_instance_id": reminder_instance_id,
-            "phone_number": phone_number,
-            "user_response": user_response,
-            "message": "Webhook procesado correctamente"
+            "status": "accepted",
+            "event_key": event_key,
+            "duplicate": event is None
         }
         
     except Exception as e:
-        logger.error(f"Error procesando webhook: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.error(f"Error encolando webhook: {str(e)}", exc_info=True)
         return {
             "status": "error",
             "message": str(e)
         }
 
 @router.post("/webhook/telegram")
-async def telegram_webhook(request: Request, db: Session = Depends(get_db)):
+async def telegram_webhook(request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
     """
     Webhook para recibir respuestas de Telegram.
-    Actualiza el reminder_instance y notification_log con la respuesta del usuario.
+    Valida el payload, lo guarda en el inbox durable (webhook_events) y responde de inmediato.
+    El answerCallbackQuery va en la misma respuesta del webhook, sin una llamada saliente.
     
     Payload esperado de Telegram:
     {
@@ -380,120 +410,41 @@ async def telegram_webhook(request: Request, db: Session = Depends(get_db)):
     """
     try:
         body = await request.json()
-        logger.info(f"Webhook de Telegram recibido: {body}")
-        
-        bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
         
-        if "callback_query" not in body:
+        if not isinstance(body, dict) or "callback_query" not in body:
             logger.info("No hay callback_query en el webhook, ignorando")
             return {"status": "ok", "message": "No es un callback_query"}
         
         callback_query = body["callback_query"]
         callback_id = callback_query["id"]
-        chat_id = str(callback_query["from"]["id"])  # Convertir a string para comparar
-        callback_data = callback_query.get("data")
         
-        # Extraer message_id del mensaje original
-        message_id = None
-        if "message" in callback_query and "message_id" in callback_query["message"]:
-            message_id = str(callback_query["message"]["message_id"])
-        
-        logger.info(f"Callback recibido - chat_id: {chat_id}, message_id: {message_id}, data: {callback_data}")
-        
-        async with httpx.AsyncClient() as client:
-            await client.post(
-                f"https://api.telegram.org/bot{bot_token}/answerCallbackQuery",
-                json={"callback_query_id": callback_id}
-            )
-        
-        if not callback_data:
+        if not callback_query.get("data"):
             logger.warning("No hay callback_data en el callback_query")
             return {
                 "status": "error",
                 "message": "No se pudo obtener callback_data"
             }
         
-        if not message_id:
+        if "message_id" not in callback_query.get("message", {}):
             logger.warning("No hay message_id en el callback_query")
             return {
                 "status": "error",
                 "message": "No se pudo obtener message_id del mensaje"
             }
         
-        # Buscar reminder_instance por message_id
-        from models import ReminderInstance
-        reminder_instance = db.query(ReminderInstance).filter(
-            ReminderInstance.message_id == message_id
-        ).first()
-        
-        if not reminder_instance:
-            logger.warning(f"No se encontró reminder_instance para message_id {message_id}")
-            return {
-                "status": "error",
-                "message": f"No se encontró reminder_instance para el message_id {message_id}"
-            }
-        
-        reminder_instance_id = reminder_instance.id
-        
-        # Determinar el estado según el callback_data
-        if callback_data == "taken":
-            instance_status = ReminderInstanceStatus.SUCCESS.value
-            user_response = "taken: Ya lo tomé"
-        elif callback_data == "skip":
-            instance_status = ReminderInstanceStatus.REJECTED.value  # Usar REJECTED para "skip"
-            user_response = "skip: Omitir"
-        elif callback_data == "confirm":
-            instance_status = ReminderInstanceStatus.SUCCESS.value
-            user_response = "confirm: Confirmado"
-        elif callback_data == "cancel":
-            instance_status = ReminderInstanceStatus.REJECTED.value
-            user_response = "cancel: Cancelado"
-        else:
-            # Para otros casos
-            instance_status = ReminderInstanceStatus.SUCCESS.value
-            user_response = f"{callback_data}: Respuesta recibida"
-        
-        # Buscar notification_log asociado al reminder_instance
-        from models import NotificationLog
-        notification_log = db.query(NotificationLog).filter(
-            NotificationLog.reminder_instance_id == reminder_instance_id,
-            NotificationLog.notification_type == "telegram"
-        ).first()
-        
-        # Actualizar notification_log con la respuesta si existe
-        if notification_log:
-            log_update = NotificationLogUpdate(
-                response=user_response,
-                delivered_at=datetime.now(),
-                status="delivered"
-            )
-            NotificationLogService.update(db, notification_log.id, log_update)
-            logger.info(f"NotificationLog {notification_log.id} actualizado con respuesta: {user_response}")
-        else:
-            logger.warning(f"No se encontró notification_log para reminder_instance_id {reminder_instance_id}")
-        
-        # Actualizar reminder_instance status
-        instance_update = ReminderInstanceUpdate(
-            status=instance_status,
-            taken_at=datetime.now() if callback_data == "taken" else None
-        )
-        ReminderInstanceService.update(db, reminder_instance_id, instance_update)
-        logger.info(f"Reminder instance {reminder_instance_id} actualizado a {instance_status}. Respuesta: {user_response}")
+        event = WebhookEventService.enqueue(db, "telegram", WebhookEventService.telegram_event_key(body), body)
+        if event:
+            background_tasks.add_task(process_webhook_events_job)
         
+        # Telegram ejecuta el método indicado en la respuesta del webhook
         return {
-            "status": "success",
-            "reminder_instance_id": reminder_instance_id,
-            "chat_id": chat_id,
-            "user_response": user_response,
-            "callback_data": callback_data,
-            "message": "Webhook procesado correctamente"
+            "method": "answerCallbackQuery",
+            "callback_query_id": callback_id
         }
         
     except Exception as e:
-        logger.error(f"Error procesando webhook de Telegram: {str(e)}")
-        import traceback
-        logger.error(traceback.format_exc())
+        logger.error(f"Error encolando webhook de Telegram: {str(e)}", exc_info=True)
         return {
             "status": "error",
             "message": str(e)
-        }
\ No newline at end of file
+        }
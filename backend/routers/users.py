@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from database import get_db
 from services.users import UserService
 from dtos.users import UserCreate, UserUpdate, UserResponse
+from dtos.pagination import Page
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -19,6 +21,23 @@ async def get_users(
     return users
 
 
+@router.get("/page", response_model=Page[UserResponse])
+async def get_users_page(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """Obtener usuarios paginados por cursor. Usar next_cursor de la respuesta para pedir la página siguiente."""
+    try:
+        items, next_cursor = UserService.get_page(db, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return Page[UserResponse](items=items, next_cursor=next_cursor, limit=limit)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
@@ -41,7 +60,7 @@ async def create_user(
 ):
     """Crear un nuevo usuario"""
     try:
-        user = UserService.create(db, user_data)
+        user = await UserService.create(db, user_data)
         return user
     except ValueError as e:
         raise HTTPException(
@@ -63,7 +82,7 @@ async def update_user(
 ):
     """Actualizar un usuario existente"""
     try:
-        user = UserService.update(db, user_id, user_data)
+        user = await UserService.update(db, user_id, user_data)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -90,7 +109,7 @@ async def partial_update_user(
 ):
     """Actualizar parcialmente un usuario existente"""
     try:
-        user = UserService.update(db, user_id, user_data)
+        user = await UserService.update(db, user_id, user_data)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,47 @@
+"""
+Reconstruye reminder_daily_rollups desde reminder_instances, con el adulto mayor resuelto por
+elderly_profile_id, cita o medicina (services/elderly_resolution.py). Cada tramo bloquea la tabla
+contra escrituras mientras se recalcula, así no compite con los deltas del listener.
+
+Uso (desde backend/):
+    python -m scripts.backfill_reminder_rollups
+    python -m scripts.backfill_reminder_rollups --start 2025-01-01 --end 2025-12-31 --chunk-days 7
+"""
+from datetime import date, timedelta
+from sqlalchemy import func
+from database import SessionLocal
+from models import ReminderInstance
+from services.reminder_rollups import ReminderRollupService
+import argparse
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill de reminder_daily_rollups")
+    parser.add_argument("--start", type=date.fromisoformat, help="Primer día (por defecto, la instancia más antigua)")
+    parser.add_argument("--end", type=date.fromisoformat, help="Último día, inclusive (por defecto, la instancia más nueva)")
+    parser.add_argument("--chunk-days", type=int, default=31, help="Días por transacción")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        first, last = db.query(
+            func.min(ReminderInstance.scheduled_datetime),
+            func.max(ReminderInstance.scheduled_datetime)
+        ).one()
+        if first is None:
+            print("No hay reminder_instances, nada que reconstruir")
+            return
+
+        start_day = args.start or first.date()
+        end_day = (args.end or last.date()) + timedelta(days=1)
+        total = 0
+        for chunk_start, chunk_end, count in ReminderRollupService.backfill(db, start_day, end_day, args.chunk_days):
+            total += count
+            print(f"{chunk_start} -> {chunk_end - timedelta(days=1)}: {count} filas")
+        print(f"✅ Backfill terminado: {total} filas")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark de logins concurrentes: bcrypt inline en el event loop vs. en el pool de services/passwords.py.
+Mide throughput de verificaciones y el lag máximo del event loop (cuánto espera cualquier otro request).
+
+Uso (desde backend/):
+    python -m scripts.bench_password_hashing
+    python -m scripts.bench_password_hashing --logins 200 --concurrency 50 --rounds 10 --workers 4
+"""
+from typing import Awaitable, Callable, List
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+
+async def _measure_loop_lag(stop: asyncio.Event, lags: List[float], interval: float = 0.01) -> None:
+    """Ticker que mide cuánto se atrasa el event loop respecto de `interval`"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        lags.append(max(0.0, loop.time() - expected))
+
+
+async def _run(name: str, login: Callable[[], Awaitable[bool]], logins: int, concurrency: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one_login():
+        async with semaphore:
+            start = time.perf_counter()
+            assert await login()
+            latencies.append(time.perf_counter() - start)
+
+    stop = asyncio.Event()
+    lags: List[float] = []
+    ticker = asyncio.create_task(_measure_loop_lag(stop, lags))
+    await asyncio.sleep(0)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await ticker
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0
+    print(
+        f"{name:>7}: {logins / elapsed:7.1f} logins/s | "
+        f"latencia p50 {statistics.median(latencies) * 1000:7.1f} ms p95 {p95 * 1000:7.1f} ms | "
+        f"lag del event loop máx {max(lags, default=0) * 1000:7.1f} ms"
+    )
+
+
+async def main_async(args) -> None:
+    # El costo y el tamaño del pool se leen al importar el módulo
+    os.environ['PASSWORD_BCRYPT_ROUNDS'] = str(args.rounds)
+    os.environ['PASSWORD_HASH_WORKERS'] = str(args.workers)
+    from services.passwords import get_pwd_context, verify_and_update_password, BCRYPT_ROUNDS, PASSWORD_HASH_WORKERS
+
+    password = "correct horse battery staple"
+    pwd_context = get_pwd_context()
+    hashed = pwd_context.hash(password)
+    print(f"bcrypt rounds={BCRYPT_ROUNDS} workers={PASSWORD_HASH_WORKERS} logins={args.logins} concurrencia={args.concurrency}")
+
+    async def inline_login() -> bool:
+        return pwd_context.verify(password, hashed)
+
+    async def pool_login() -> bool:
+        valid, _ = await verify_and_update_password(password, hashed)
+        return valid
+
+    await _run("inline", inline_login, args.logins, args.concurrency)
+    await _run("pool", pool_login, args.logins, args.concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de bcrypt en logins concurrentes")
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=int(os.getenv('PASSWORD_BCRYPT_ROUNDS', '12')))
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Verifica que el arranque en frío (`import app`) se mantenga bajo un presupuesto de tiempo y que
+los SDKs de proveedores y passlib sigan cargándose recién al primer uso. Sale con código 1 si no.
+
+Uso (desde backend/):
+    python -m scripts.check_import_time
+    python -m scripts.check_import_time --budget-ms 1500 --runs 7
+"""
+from scripts.profile_startup import import_profile, total_ms
+import argparse
+import os
+import statistics
+
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "2500"))
+# Se importan dentro de integrations/ y services/passwords.py, no al arrancar
+LAZY_MODULES = ("twilio.rest", "passlib.context", "httpx")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Presupuesto de tiempo de import al arrancar")
+    parser.add_argument("--module", default="app")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_TIME_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5, help="Procesos nuevos a medir (se usa la mediana)")
+    args = parser.parse_args()
+
+    profiles = [import_profile(args.module) for _ in range(args.runs)]
+    median_ms = statistics.median(total_ms(rows, args.module) for rows in profiles)
+    within_budget = median_ms <= args.budget_ms
+    print(f"{'✅' if within_budget else '❌'} import {args.module}: mediana {median_ms:.0f} ms (presupuesto {args.budget_ms:.0f} ms)")
+
+    imported = {row.module for row in profiles[0]}
+    eager = [module for module in LAZY_MODULES if module in imported]
+    for module in LAZY_MODULES:
+        print(f"{'❌' if module in eager else '✅'} {module} {'se importa al arrancar' if module in eager else 'se carga al primer uso'}")
+
+    if not within_budget or eager:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
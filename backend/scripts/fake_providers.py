@@ -0,0 +1,196 @@
+"""
+Servidor falso de proveedores (Twilio, Kapso, Telegram y Gemini) para medir el scheduler sin
+hacer llamadas ni enviar mensajes reales. Simula latencia, errores 5xx y 429 con Retry-After.
+
+Uso (desde backend/):
+    python -m scripts.fake_providers --port 9000
+    python -m scripts.fake_providers --latency-ms 300 --jitter-ms 100 --error-rate 0.02 --rate-limit-rate 0.05
+    python -m scripts.fake_providers --provider-latency-ms gemini=1200 --provider-latency-ms twilio=600
+
+Y en el backend (o en scripts.load_test con --providers http://127.0.0.1:9000):
+    TWILIO_BASE_URL=http://127.0.0.1:9000/twilio
+    KAPSO_BASE_URL=http://127.0.0.1:9000/kapso
+    TELEGRAM_BASE_URL=http://127.0.0.1:9000/telegram
+    GEMINI_BASE_URL=http://127.0.0.1:9000/gemini
+
+GET /stats devuelve cuántos requests, errores y 429 respondió cada proveedor.
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from collections import Counter
+from typing import Any, Dict, Optional
+import argparse
+import asyncio
+import itertools
+import random
+import uuid
+
+PROVIDERS = ("twilio", "kapso", "telegram", "gemini")
+
+
+class FaultConfig:
+    """Latencia y tasas de error del servidor falso (globales, con latencia opcional por proveedor)"""
+
+    def __init__(
+        self,
+        latency_ms: float = 150,
+        jitter_ms: float = 50,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        retry_after_seconds: int = 1,
+        provider_latency_ms: Optional[Dict[str, float]] = None,
+        seed: Optional[int] = None
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after_seconds = retry_after_seconds
+        self.provider_latency_ms = provider_latency_ms or {}
+        self.random = random.Random(seed)
+
+    def delay(self, provider: str) -> float:
+        base = self.provider_latency_ms.get(provider, self.latency_ms)
+        return max(0.0, self.random.gauss(base, self.jitter_ms)) / 1000 if self.jitter_ms else base / 1000
+
+    def outcome(self) -> str:
+        """'rate_limited', 'error' u 'ok'"""
+        roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            return "rate_limited"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+
+def _error_body(provider: str, status: int, message: str) -> Dict[str, Any]:
+    """Cuerpo de error con la forma de cada proveedor"""
+    if provider == "twilio":
+        return {"code": 20429 if status == 429 else 20500, "message": message, "status": status}
+    if provider == "telegram":
+        return {"ok": False, "error_code": status, "description": message}
+    return {"error": {"code": status, "message": message}}
+
+
+def create_app(config: FaultConfig) -> FastAPI:
+    app = FastAPI(title="Proveedores falsos")
+    stats: Counter = Counter()
+    telegram_ids = itertools.count(1)
+
+    async def _respond(provider: str, status: int, body: Dict[str, Any]) -> JSONResponse:
+        stats[f"{provider}.requests"] += 1
+        await asyncio.sleep(config.delay(provider))
+        outcome = config.outcome()
+        if outcome == "rate_limited":
+            stats[f"{provider}.rate_limited"] += 1
+            return JSONResponse(
+                _error_body(provider, 429, "Too Many Requests"),
+                status_code=429,
+                headers={"Retry-After": str(config.retry_after_seconds)}
+            )
+        if outcome == "error":
+            stats[f"{provider}.errors"] += 1
+            return JSONResponse(_error_body(provider, 503, "Service Unavailable"), status_code=503)
+        stats[f"{provider}.ok"] += 1
+        return JSONResponse(body, status_code=status)
+
+    @app.post("/twilio/2010-04-01/Accounts/{account_sid}/Calls.json")
+    async def twilio_create_call(account_sid: str, request: Request):
+        form = await request.form()
+        return await _respond("twilio", 201, {
+            "sid": f"CA{uuid.uuid4().hex}",
+            "account_sid": account_sid,
+            "to": form.get("To"),
+            "from": form.get("From"),
+            "status": "queued",
+            "direction": "outbound-api",
+            "api_version": "2010-04-01",
+            "uri": f"/2010-04-01/Accounts/{account_sid}/Calls.json"
+        })
+
+    @app.post("/kapso/{version}/{phone_number_id}/messages")
+    async def kapso_send_message(version: str, phone_number_id: str, request: Request):
+        payload = await request.json()
+        return await _respond("kapso", 200, {
+            "messaging_product": "whatsapp",
+            "contacts": [{"input": payload.get("to"), "wa_id": payload.get("to")}],
+            "messages": [{"id": f"wamid.{uuid.uuid4().hex}"}]
+        })
+
+    @app.post("/telegram/bot{token}/sendMessage")
+    async def telegram_send_message(token: str, request: Request):
+        payload = await request.json()
+        return await _respond("telegram", 200, {
+            "ok": True,
+            "result": {
+                "message_id": next(telegram_ids),
+                "chat": {"id": payload.get("chat_id")},
+                "text": payload.get("text")
+            }
+        })
+
+    @app.post("/gemini/v1beta/models/{model_action}")
+    async def gemini_generate_content(model_action: str, request: Request):
+        await request.body()
+        return await _respond("gemini", 200, {
+            "candidates": [{
+                "content": {
+                    "role": "model",
+                    "parts": [{"text": "Hola, es hora de tomar tu medicamento. ¿Ya lo tomaste?"}]
+                },
+                "finishReason": "STOP"
+            }],
+            "modelVersion": model_action.split(":")[0]
+        })
+
+    @app.get("/stats")
+    async def get_stats():
+        return dict(stats)
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        stats.clear()
+        return {"status": "ok"}
+
+    return app
+
+
+def _provider_latencies(values) -> Dict[str, float]:
+    latencies = {}
+    for value in values or []:
+        provider, _, ms = value.partition("=")
+        if provider not in PROVIDERS or not ms:
+            raise argparse.ArgumentTypeError(f"Formato esperado PROVEEDOR=MS con proveedor en {PROVIDERS}: {value}")
+        latencies[provider] = float(ms)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor falso de Twilio, Kapso, Telegram y Gemini")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=150, help="Latencia media de cada respuesta")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="Desviación estándar de la latencia")
+    parser.add_argument("--provider-latency-ms", action="append", help="Latencia de un proveedor, p. ej. gemini=1200")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fracción de respuestas 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Segundos en el header Retry-After de los 429")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after_seconds=args.retry_after,
+        provider_latency_ms=_provider_latencies(args.provider_latency_ms),
+        seed=args.seed
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+"""
+Prueba de carga: siembra miles de adultos mayores, medicamentos y recordatorios, y luego
+ejercita el scheduler de llamadas, los webhooks y los endpoints de lectura, reportando
+throughput y latencia (p50/p95/p99) por fase.
+
+Pensado para correr contra una BD local y el servidor falso de proveedores
+(scripts/fake_providers.py); por seguridad se niega a escribir en una BD remota
+salvo con --allow-remote-db. Los datos sembrados usan emails @loadtest.local y se
+borran con --cleanup (el resto cae por ON DELETE CASCADE).
+
+Uso (desde backend/):
+    python -m scripts.fake_providers --port 9000 &
+    TWILIO_BASE_URL=http://127.0.0.1:9000/twilio KAPSO_BASE_URL=http://127.0.0.1:9000/kapso \\
+    TELEGRAM_BASE_URL=http://127.0.0.1:9000/telegram GEMINI_BASE_URL=http://127.0.0.1:9000/gemini \\
+        uvicorn app:app --port 8000 &
+    python -m scripts.load_test --providers http://127.0.0.1:9000 --elderly 2000 --due 300
+    python -m scripts.load_test --phases reads --requests 2000 --concurrency 50
+    python -m scripts.load_test --cleanup
+"""
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, List, Optional
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from database import SessionLocal, engine
+from models import User, ElderlyProfile, ReminderInstance, NotificationLog, MessageCorrelation, WebhookEvent
+from services.medicines import MedicineService
+from services.reminders import ReminderService
+from services.bulk import MAX_BULK_ITEMS
+from services.passwords import hash_password
+from services.tracing import percentile
+from enums import ReminderInstanceStatus
+import argparse
+import asyncio
+import httpx
+import os
+import random
+import sys
+import time
+
+EMAIL_DOMAIN = "loadtest.local"
+# Prefijo de los message_id sembrados, para distinguir los eventos de webhook de la prueba
+MESSAGE_PREFIX = "loadtest"
+PHASES = ("seed", "scheduler", "webhooks", "reads")
+
+
+def _report(name: str, latencies: List[float], errors: int, elapsed: float) -> None:
+    count = len(latencies)
+    print(
+        f"{name:<42} {count:6d} ops | {errors:5d} errores | {count / elapsed if elapsed else 0:8.1f} ops/s | "
+        f"p50 {percentile(latencies, 0.5) * 1000:8.1f} ms | p95 {percentile(latencies, 0.95) * 1000:8.1f} ms | "
+        f"p99 {percentile(latencies, 0.99) * 1000:8.1f} ms"
+    )
+
+
+def _report_seed(name: str, rows: int, errors: int, elapsed: float) -> None:
+    print(f"{name:<42} {rows:6d} filas | {errors:5d} errores | {elapsed:6.2f} s | {rows / elapsed if elapsed else 0:8.1f} filas/s")
+
+
+def _use_fake_providers(base_url: str) -> None:
+    """Apuntar las integraciones al servidor falso (con credenciales de mentira si faltan)"""
+    base_url = base_url.rstrip("/")
+    for provider in ("TWILIO", "KAPSO", "TELEGRAM", "GEMINI"):
+        os.environ[f"{provider}_BASE_URL"] = f"{base_url}/{provider.lower()}"
+    for name, value in (
+        ("TWILIO_ACCOUNT_SID", "ACloadtest"),
+        ("TWILIO_AUTH_TOKEN", "loadtest"),
+        ("KAPSO_API_KEY", "loadtest"),
+        ("KAPSO_PHONE_NUMBER_ID", "loadtest"),
+        ("TELEGRAM_BOT_TOKEN", "loadtest"),
+        ("GEMINI_API_KEY", "loadtest")
+    ):
+        os.environ.setdefault(name, value)
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def seed(db: Session, elderly: int, reminders_per_elderly: int, due: int, replies: int) -> List[int]:
+    """Sembrar usuarios, perfiles, medicamentos, recordatorios e instancias vencidas; retorna los ids de los perfiles"""
+    rng = random.Random(42)
+    run = int(time.time())
+    password = hash_password("loadtest")
+    now = datetime.now()
+
+    start = time.perf_counter()
+    elderly_ids = list(db.scalars(
+        insert(User).returning(User.id),
+        [
+            {
+                "email": f"elderly-{run}-{n}@{EMAIL_DOMAIN}",
+                "password": password,
+                "full_name": f"Persona de prueba {n}",
+                "phone": f"+5690{n:07d}",
+                "role": "elderly"
+            }
+            for n in range(elderly)
+        ]
+    ))
+    db.execute(insert(ElderlyProfile), [
+        {"id": elderly_id, "emergency_contact": f"+5691{elderly_id:07d}"} for elderly_id in elderly_ids
+    ])
+    db.commit()
+    _report_seed("seed: usuarios + perfiles", len(elderly_ids), 0, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    errors = 0
+    for batch in _chunks(elderly_ids, MAX_BULK_ITEMS):
+        _, batch_errors = MedicineService.bulk_create(db, [
+            {"id": elderly_id, "name": rng.choice(["Paracetamol", "Losartán", "Metformina", "Atorvastatina"]),
+             "total_tablets": 60, "tablets_left": rng.randint(5, 60), "tablets_per_dose": 1}
+            for elderly_id in batch
+        ])
+        errors += len(batch_errors)
+    _report_seed("seed: medicamentos (bulk)", len(elderly_ids) - errors, errors, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    errors = 0
+    reminder_items = [
+        {
+            "reminder_type": "medicine",
+            "periodicity": rng.choice([480, 720, 1440]),
+            "start_date": now - timedelta(days=rng.randint(0, 30), minutes=rng.randint(0, 1439)),
+            "medicine": elderly_id,
+            "elderly_profile_id": elderly_id
+        }
+        for elderly_id in elderly_ids
+        for _ in range(reminders_per_elderly)
+    ]
+    reminder_ids: List[int] = []
+    for batch in _chunks(reminder_items, MAX_BULK_ITEMS):
+        created, batch_errors = ReminderService.bulk_create(db, batch)
+        reminder_ids.extend(reminder.id for reminder in created)
+        errors += len(batch_errors)
+    _report_seed("seed: recordatorios + instancias futuras", len(reminder_ids), errors, time.perf_counter() - start)
+
+    # Instancias vencidas y pendientes: lo que el scheduler tiene que despachar
+    start = time.perf_counter()
+    instances = [
+        ReminderInstance(
+            reminder_id=rng.choice(reminder_ids),
+            scheduled_datetime=now - timedelta(minutes=rng.randint(0, 30)),
+            status=ReminderInstanceStatus.PENDING.value
+        )
+        for _ in range(due)
+    ]
+    # Y otras ya enviadas por WhatsApp, esperando la respuesta que mandará la fase de webhooks
+    waiting = [
+        ReminderInstance(
+            reminder_id=rng.choice(reminder_ids),
+            scheduled_datetime=now - timedelta(minutes=rng.randint(5, 60)),
+            status=ReminderInstanceStatus.WAITING.value,
+            message_id=f"{MESSAGE_PREFIX}.wamid.{run}.{n}"
+        )
+        for n in range(replies)
+    ]
+    db.add_all(instances + waiting)
+    db.flush()
+    for instance in waiting:
+        db.add(MessageCorrelation(channel="whatsapp", provider_message_id=instance.message_id, reminder_instance_id=instance.id))
+        db.add(NotificationLog(
+            reminder_instance_id=instance.id,
+            notification_type="whatsapp",
+            recepient_phone="+56900000000",
+            status="sent",
+            sent_at=instance.scheduled_datetime + timedelta(seconds=rng.randint(1, 120))
+        ))
+    db.commit()
+    _report_seed("seed: instancias vencidas + en espera", due + replies, 0, time.perf_counter() - start)
+    return elderly_ids
+
+
+def run_scheduler(db: Session, ticks: int) -> None:
+    """Correr el job de llamadas en proceso, igual que el cron, contra los proveedores configurados"""
+    from services.reminder_call_service import ReminderCallService
+
+    for tick in range(ticks):
+        start = time.perf_counter()
+        results = asyncio.run(ReminderCallService.process_pending_calls(db))
+        elapsed = time.perf_counter() - start
+        print(
+            f"scheduler tick {tick + 1}: {results['processed']} procesadas, {results['successful']} exitosas, "
+            f"{results['failed']} fallidas en {elapsed:.2f} s ({results['processed'] / elapsed if elapsed else 0:.1f} llamadas/s)"
+        )
+        for name, stats in results["stages"].items():
+            print(f"    {name:<24} n={stats['count']:5d} p50 {stats['p50_ms']:8.1f} ms p95 {stats['p95_ms']:8.1f} ms total {stats['total_ms']:10.1f} ms")
+        if not results["processed"]:
+            break
+
+
+async def _drive(name: str, requests: List[Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]], api_url: str, concurrency: int) -> None:
+    latencies: List[float] = []
+    errors = 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=30) as client:
+        async def one(request):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await request(client)
+                    if response.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one(request) for request in requests))
+        _report(name, latencies, errors, time.perf_counter() - start)
+
+
+def _waiting_message_ids(db: Session, limit: int) -> List[str]:
+    return [
+        message_id for (message_id,) in
+        db.query(MessageCorrelation.provider_message_id)
+        .filter(MessageCorrelation.provider_message_id.like(f"{MESSAGE_PREFIX}.wamid.%"))
+        .order_by(MessageCorrelation.id.desc())
+        .limit(limit)
+        .all()
+    ]
+
+
+def run_webhooks(db: Session, api_url: str, count: int, concurrency: int) -> None:
+    """Responder por webhook de Kapso a las instancias en espera sembradas"""
+    message_ids = _waiting_message_ids(db, count)
+    if not message_ids:
+        print("webhooks: no hay mensajes sembrados en espera (correr la fase seed con --replies)")
+        return
+
+    def reply(message_id: str, n: int):
+        body = {
+            "message": {
+                "id": f"{MESSAGE_PREFIX}.in.{time.time_ns()}.{n}",
+                "from": "56900000000",
+                "context": {"id": message_id},
+                "interactive": {"type": "button_reply", "button_reply": {"id": "taken", "title": "Ya lo tomé"}}
+            }
+        }
+        return lambda client: client.post("/reminders/webhook", json=body)
+
+    asyncio.run(_drive(
+        "webhooks: POST /reminders/webhook",
+        [reply(message_id, n) for n, message_id in enumerate(message_ids)],
+        api_url,
+        concurrency
+    ))
+
+
+def run_reads(db: Session, api_url: str, count: int, concurrency: int, elderly_ids: Optional[List[int]]) -> None:
+    """Ejercitar los listados y vistas que usa el dashboard"""
+    if not elderly_ids:
+        elderly_ids = [
+            elderly_id for (elderly_id,) in
+            db.query(User.id).filter(User.email.like(f"%@{EMAIL_DOMAIN}")).limit(1000).all()
+        ]
+    rng = random.Random(7)
+    today = datetime.now()
+    paths = [
+        lambda: "/reminders/with-medicine?limit=100",
+        lambda: "/reminder-instances/today/with-medicine",
+        lambda: f"/reminder-instances/month/{today.year}/{today.month}/summary",
+        lambda: "/medicines/",
+    ]
+    if elderly_ids:
+        paths.append(lambda: f"/elderly-profiles/{rng.choice(elderly_ids)}/overview")
+
+    def get(path: str):
+        return lambda client: client.get(path)
+
+    asyncio.run(_drive(
+        "lecturas: dashboard (mezcla)",
+        [get(paths[n % len(paths)]()) for n in range(count)],
+        api_url,
+        concurrency
+    ))
+
+
+def cleanup(db: Session) -> None:
+    """Borrar todo lo sembrado (usuarios de prueba y, en cascada, el resto)"""
+    events = db.query(WebhookEvent).filter(WebhookEvent.event_key.like(f"{MESSAGE_PREFIX}.%")).delete(synchronize_session=False)
+    users = db.query(User).filter(User.email.like(f"%@{EMAIL_DOMAIN}")).delete(synchronize_session=False)
+    db.commit()
+    print(f"Borrados {users} usuarios de prueba (con sus perfiles, medicamentos y recordatorios) y {events} eventos de webhook")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga del scheduler, webhooks y lecturas")
+    parser.add_argument("--phases", default=",".join(PHASES), help=f"Fases a correr, separadas por coma: {','.join(PHASES)}")
+    parser.add_argument("--elderly", type=int, default=2000, help="Adultos mayores a sembrar")
+    parser.add_argument("--reminders-per-elderly", type=int, default=2)
+    parser.add_argument("--due", type=int, default=200, help="Instancias vencidas pendientes para el scheduler")
+    parser.add_argument("--replies", type=int, default=500, help="Instancias en espera de respuesta para los webhooks")
+    parser.add_argument("--ticks", type=int, default=1, help="Ticks del scheduler a correr")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests de lectura")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--api-url", default="http://127.0.0.1:8000", help="Backend corriendo (fases webhooks y reads)")
+    parser.add_argument("--providers", default=None, help="URL base del servidor falso (scripts.fake_providers)")
+    parser.add_argument("--allow-remote-db", action="store_true", help="Permitir sembrar en una BD que no es local")
+    parser.add_argument("--cleanup", action="store_true", help="Borrar los datos sembrados y salir")
+    args = parser.parse_args()
+
+    phases = {phase.strip() for phase in args.phases.split(",") if phase.strip()}
+    unknown = phases - set(PHASES)
+    if unknown:
+        parser.error(f"Fases desconocidas: {', '.join(sorted(unknown))}")
+
+    if engine.url.host not in (None, "localhost", "127.0.0.1") and not args.allow_remote_db:
+        print(f"POSTGRES_URL apunta a {engine.url.host}; usa --allow-remote-db para correr contra una BD remota", file=sys.stderr)
+        sys.exit(1)
+
+    if args.providers:
+        _use_fake_providers(args.providers)
+    elif "scheduler" in phases and not os.getenv("TWILIO_BASE_URL"):
+        print("Aviso: sin --providers ni TWILIO_BASE_URL el scheduler llamará a los proveedores reales", file=sys.stderr)
+
+    db = SessionLocal()
+    try:
+        if args.cleanup:
+            cleanup(db)
+            return
+
+        elderly_ids = None
+        if "seed" in phases:
+            elderly_ids = seed(db, args.elderly, args.reminders_per_elderly, args.due, args.replies)
+        if "scheduler" in phases:
+            run_scheduler(db, args.ticks)
+        if "webhooks" in phases:
+            run_webhooks(db, args.api_url, args.replies, args.concurrency)
+        if "reads" in phases:
+            run_reads(db, args.api_url, args.requests, args.concurrency, elderly_ids)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import Date, DateTime, and_, case, extract, func, text
+from sqlalchemy.dialects import postgresql, sqlite
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from models import ReminderInstance, Reminder, Medicine, Appointment, ReminderDailyRollup
+from services.elderly_resolution import elderly_id_expression, belongs_to_elderly
+from dtos.adherence import AdherenceCounts, MedicineAdherence, DailyAdherence, AdherenceSummaryResponse
+from enums import ReminderInstanceStatus
+import os
+
+# Una toma cuenta "a tiempo" si taken_at - scheduled_datetime no supera este margen
+# (migrations/007 lo fija en 30 minutos: si cambia, re-ejecutar scripts.backfill_reminder_rollups)
+ON_TIME_MINUTES = int(os.getenv('ADHERENCE_ON_TIME_MINUTES', '30'))
+# Días cerrados que se reconcilian en cada corrida del job de rollups
+ROLLUP_LOOKBACK_DAYS = int(os.getenv('ADHERENCE_ROLLUP_LOOKBACK_DAYS', '2'))
+
+STATUS_FIELDS = tuple(status.value for status in ReminderInstanceStatus)
+COUNTER_FIELDS = ("count", "latency_count", "latency_seconds_sum", "on_time_count")
+
+
+class RollupRow(NamedTuple):
+    """Una fila de reminder_daily_rollups (o su equivalente agregado desde reminder_instances)"""
+    reminder_id: int
+    elderly_profile_id: Optional[int]
+    medicine_id: Optional[int]
+    day: date
+    status: str
+    count: int
+    latency_count: int
+    latency_seconds_sum: float
+    on_time_count: int
+
+
+class AdherenceService:
+    """
+    Métricas de adherencia por adulto mayor, medicamento y día.
+    Se leen de reminder_daily_rollups, que ReminderRollupService mantiene al día en cada flush;
+    el GROUP BY sobre reminder_instances solo se usa para reconstruir (backfill y reconciliación).
+    """
+
+    @staticmethod
+    def _aggregate_query(db: Session, start: datetime, end: datetime, elderly_profile_id: Optional[int] = None):
+        """GROUP BY (reminder, día, estado) sobre reminder_instances en [start, end), con el adulto mayor ya resuelto"""
+        elderly_id = elderly_id_expression()
+        if db.get_bind().dialect.name == "postgresql":
+            day = func.date_trunc('day', ReminderInstance.scheduled_datetime, type_=DateTime)
+        else:
+            # SQLite (tests y benchmarks) no tiene date_trunc
+            day = func.date(ReminderInstance.scheduled_datetime, type_=Date)
+        status = func.coalesce(ReminderInstance.status, ReminderInstanceStatus.PENDING.value)
+        latency = extract('epoch', ReminderInstance.taken_at) - extract('epoch', ReminderInstance.scheduled_datetime)
+        has_latency = and_(
+            ReminderInstance.status == ReminderInstanceStatus.SUCCESS.value,
+            ReminderInstance.taken_at.isnot(None)
+        )
+        query = (
+            db.query(
+                ReminderInstance.reminder_id,
+                elderly_id.label("elderly_profile_id"),
+                Reminder.medicine.label("medicine_id"),
+                day.label("day"),
+                status.label("status"),
+                func.count(ReminderInstance.id).label("count"),
+                func.sum(case((has_latency, 1), else_=0)).label("latency_count"),
+                func.sum(case((has_latency, latency), else_=0)).label("latency_seconds_sum"),
+                func.sum(case((and_(has_latency, latency <= ON_TIME_MINUTES * 60), 1), else_=0)).label("on_time_count")
+            )
+            .join(Reminder, ReminderInstance.reminder_id == Reminder.id)
+            .outerjoin(Appointment, Reminder.appointment_id == Appointment.id)
+            .filter(
+                ReminderInstance.scheduled_datetime >= start,
+                ReminderInstance.scheduled_datetime < end
+            )
+            .group_by(ReminderInstance.reminder_id, elderly_id, Reminder.medicine, day, status)
+        )
+        if elderly_profile_id is not None:
+            query = query.filter(belongs_to_elderly(elderly_profile_id))
+        return query
+
+    @staticmethod
+    def _to_rollup_row(row) -> RollupRow:
+        day = row.day.date() if isinstance(row.day, datetime) else row.day
+        return RollupRow(
+            reminder_id=row.reminder_id,
+            elderly_profile_id=row.elderly_profile_id,
+            medicine_id=row.medicine_id,
+            day=day,
+            status=row.status,
+            count=int(row.count or 0),
+            latency_count=int(row.latency_count or 0),
+            latency_seconds_sum=float(row.latency_seconds_sum or 0),
+            on_time_count=int(row.on_time_count or 0)
+        )
+
+    @staticmethod
+    def aggregate_raw(
+        db: Session, start_day: date, end_day: date, elderly_profile_id: Optional[int] = None
+    ) -> List[RollupRow]:
+        """Agregar instancias de los días [start_day, end_day) directamente desde reminder_instances"""
+        start = datetime.combine(start_day, datetime.min.time())
+        end = datetime.combine(end_day, datetime.min.time())
+        rows = AdherenceService._aggregate_query(db, start, end, elderly_profile_id).all()
+        return [AdherenceService._to_rollup_row(row) for row in rows]
+
+    @staticmethod
+    def upsert_rollups(db: Session, rows: List[Dict[str, Any]], accumulate: bool) -> None:
+        """
+        Upsert de filas (reminder, día, estado) en un solo executemany.
+        Con accumulate los contadores se suman a los existentes (deltas del listener); si no, los reemplazan.
+        """
+        if not rows:
+            return
+        dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(ReminderDailyRollup)
+        set_ = {
+            field: getattr(ReminderDailyRollup, field) + getattr(stmt.excluded, field) if accumulate else getattr(stmt.excluded, field)
+            for field in COUNTER_FIELDS
+        }
+        set_["elderly_profile_id"] = stmt.excluded.elderly_profile_id
+        set_["medicine_id"] = stmt.excluded.medicine_id
+        set_["updated_at"] = func.current_timestamp()
+        db.execute(stmt.on_conflict_do_update(index_elements=["reminder_id", "day", "status"], set_=set_), rows)
+
+    @staticmethod
+    def refresh_rollups(db: Session, start_day: date, end_day: date) -> int:
+        """
+        Recalcular los rollups de los días [start_day, end_day) desde reminder_instances.
+        El listener de ReminderRollupService aplica cada delta en la misma transacción que cambia la
+        instancia; bloquear la tabla contra escrituras espera a esas transacciones y frena las nuevas
+        hasta el commit, así ningún delta se pierde ni se cuenta dos veces. Las lecturas no se bloquean.
+        """
+        if db.get_bind().dialect.name == "postgresql":
+            db.execute(text("LOCK TABLE reminder_daily_rollups IN SHARE ROW EXCLUSIVE MODE"))
+        rows = AdherenceService.aggregate_raw(db, start_day, end_day)
+        # Las filas del rango que ya no tienen instancias quedan en cero, como las que deja el listener
+        db.query(ReminderDailyRollup).filter(
+            ReminderDailyRollup.day >= start_day,
+            ReminderDailyRollup.day < end_day
+        ).update({field: 0 for field in COUNTER_FIELDS}, synchronize_session=False)
+        AdherenceService.upsert_rollups(db, [row._asdict() for row in rows], accumulate=False)
+        db.commit()
+        return len(rows)
+
+    @staticmethod
+    def refresh_closed_days(db: Session, lookback_days: int = ROLLUP_LOOKBACK_DAYS) -> int:
+        """Recalcular los últimos `lookback_days` días cerrados (no incluye hoy)"""
+        today = date.today()
+        return AdherenceService.refresh_rollups(db, today - timedelta(days=lookback_days), today)
+
+    @staticmethod
+    def _rollup_rows(
+        db: Session, start_day: date, end_day: date, elderly_profile_id: Optional[int] = None
+    ) -> List[RollupRow]:
+        query = db.query(
+            ReminderDailyRollup.reminder_id,
+            ReminderDailyRollup.elderly_profile_id,
+            ReminderDailyRollup.medicine_id,
+            ReminderDailyRollup.day,
+            ReminderDailyRollup.status,
+            ReminderDailyRollup.count,
+            ReminderDailyRollup.latency_count,
+            ReminderDailyRollup.latency_seconds_sum,
+            ReminderDailyRollup.on_time_count
+        ).filter(
+            ReminderDailyRollup.day >= start_day,
+            ReminderDailyRollup.day < end_day,
+            ReminderDailyRollup.count != 0  # Filas que quedaron en cero tras mover instancias a otro estado
+        )
+        if elderly_profile_id is not None:
+            query = query.filter(ReminderDailyRollup.elderly_profile_id == elderly_profile_id)
+        return [AdherenceService._to_rollup_row(row) for row in query.all()]
+
+    @staticmethod
+    def get_rows(
+        db: Session, start_day: date, end_day: date, elderly_profile_id: Optional[int] = None
+    ) -> List[RollupRow]:
+        """Filas agregadas de [start_day, end_day) desde reminder_daily_rollups"""
+        return AdherenceService._rollup_rows(db, start_day, end_day, elderly_profile_id)
+
+    @staticmethod
+    def get_daily(
+        db: Session, start_day: date, end_day: date, elderly_profile_id: Optional[int] = None
+    ) -> List[DailyAdherence]:
+        """Conteos por día de [start_day, end_day) para calendarios, sin leer reminder_instances"""
+        rows_by_day: Dict[date, List[RollupRow]] = {}
+        for row in AdherenceService.get_rows(db, start_day, end_day, elderly_profile_id):
+            rows_by_day.setdefault(row.day, []).append(row)
+        return [
+            AdherenceService._summarize(rows_by_day[day], DailyAdherence(day=day))
+            for day in sorted(rows_by_day)
+        ]
+
+    @staticmethod
+    def _summarize(rows: Iterable[RollupRow], counts: AdherenceCounts) -> AdherenceCounts:
+        """Sumar las filas en `counts` y calcular las tasas"""
+        latency_count = 0
+        latency_seconds_sum = 0.0
+        on_time_count = 0
+        for row in rows:
+            if row.status in STATUS_FIELDS:
+                setattr(counts, row.status, getattr(counts, row.status) + row.count)
+            counts.total += row.count
+            latency_count += row.latency_count
+            latency_seconds_sum += row.latency_seconds_sum
+            on_time_count += row.on_time_count
+
+        resolved = counts.success + counts.rejected + counts.failure
+        counts.adherence_rate = counts.success / resolved if resolved else None
+        if latency_count:
+            counts.avg_latency_minutes = latency_seconds_sum / latency_count / 60
+            counts.on_time_rate = on_time_count / latency_count
+        return counts
+
+    @staticmethod
+    def _streaks(by_day: List[DailyAdherence]) -> Tuple[int, int]:
+        """
+        Racha actual y más larga de días sin dosis rechazadas ni fallidas.
+        Los días sin tomas resueltas no cortan ni suman a la racha.
+        """
+        current = 0
+        longest = 0
+        for day in by_day:
+            if day.success + day.rejected + day.failure == 0:
+                continue
+            if day.rejected or day.failure:
+                current = 0
+            else:
+                current += 1
+                longest = max(longest, current)
+        return current, longest
+
+    @staticmethod
+    def get_summary(
+        db: Session, elderly_profile_id: int, start_day: date, end_day: date
+    ) -> AdherenceSummaryResponse:
+        """Resumen de adherencia de un adulto mayor entre start_day y end_day (ambos inclusive)"""
+        if start_day > end_day:
+            raise ValueError("start_date debe ser anterior o igual a end_date")
+
+        rows = AdherenceService.get_rows(db, start_day, end_day + timedelta(days=1), elderly_profile_id)
+
+        rows_by_medicine: Dict[Optional[int], List[RollupRow]] = {}
+        rows_by_day: Dict[date, List[RollupRow]] = {}
+        for row in rows:
+            rows_by_medicine.setdefault(row.medicine_id, []).append(row)
+            rows_by_day.setdefault(row.day, []).append(row)
+
+        medicine_ids = [medicine_id for medicine_id in rows_by_medicine if medicine_id is not None]
+        medicine_names = dict(
+            db.query(Medicine.id, Medicine.name).filter(Medicine.id.in_(medicine_ids)).all()
+        ) if medicine_ids else {}
+
+        by_medicine = [
+            AdherenceService._summarize(
+                medicine_rows,
+                MedicineAdherence(medicine_id=medicine_id, medicine_name=medicine_names.get(medicine_id))
+            )
+            for medicine_id, medicine_rows in rows_by_medicine.items()
+        ]
+        by_day = [
+            AdherenceService._summarize(rows_by_day[day], DailyAdherence(day=day))
+            for day in sorted(rows_by_day)
+        ]
+        current_streak, longest_streak = AdherenceService._streaks(by_day)
+
+        return AdherenceSummaryResponse(
+            elderly_profile_id=elderly_profile_id,
+            start_date=start_day,
+            end_date=end_day,
+            totals=AdherenceService._summarize(rows, AdherenceCounts()),
+            current_streak=current_streak,
+            longest_streak=longest_streak,
+            by_medicine=by_medicine,
+            by_day=by_day
+        )
@@ -1,15 +1,24 @@
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import insert
+from typing import Any, Dict, List, Optional, Tuple
 from models import Appointment, ElderlyProfile, HealthWorker  # Importar todos los modelos para que estén en metadata
-from dtos.appointments import AppointmentCreate, AppointmentUpdate
+from dtos.appointments import AppointmentCreate, AppointmentUpdate, AppointmentBulkUpdate
+from dtos.bulk import BulkItemError
+from services.response_cache import response_cache, appointments_tag
+from services.bulk import validate_items, bulk_targets, existing_ids, write_rows, sorted_items, refresh_all
 
 
 class AppointmentService:
+    @staticmethod
+    def query_all(db: Session, skip: int = 0, limit: int = 100):
+        """Query de citas con paginación"""
+        return db.query(Appointment).offset(skip).limit(limit)
+
     @staticmethod
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Appointment]:
         """Obtener todas las citas con paginación"""
-        return db.query(Appointment).offset(skip).limit(limit).all()
+        return AppointmentService.query_all(db, skip=skip, limit=limit).all()
 
     @staticmethod
     def get_by_id(db: Session, appointment_id: int) -> Optional[Appointment]:
@@ -24,6 +33,7 @@ class AppointmentService:
         try:
             db.commit()
             db.refresh(appointment)
+            response_cache.invalidate(appointments_tag(appointment.elderly_id))
             return appointment
         except IntegrityError as e:
             db.rollback()
@@ -44,6 +54,8 @@ class AppointmentService:
         if not appointment:
             return None
 
+        old_elderly_id = appointment.elderly_id
+
         update_data = appointment_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(appointment, field, value)
@@ -51,11 +63,98 @@ class AppointmentService:
         try:
             db.commit()
             db.refresh(appointment)
+            response_cache.invalidate(appointments_tag(old_elderly_id), appointments_tag(appointment.elderly_id))
             return appointment
         except IntegrityError as e:
             db.rollback()
             raise ValueError(f"Error al actualizar la cita: {str(e)}")
 
+    @staticmethod
+    def _missing_references(db: Session, rows: List[Tuple[int, Any]], errors: List[BulkItemError]) -> List[Tuple[int, Any]]:
+        """Descartar (con error) las filas cuyo adulto mayor o trabajador de salud no existe (una query por tabla)"""
+        elderly_ids = existing_ids(db, ElderlyProfile.id, (row.elderly_id for _, row in rows))
+        health_worker_ids = existing_ids(db, HealthWorker.id, (row.health_worker_id for _, row in rows))
+        valid = []
+        for index, row in rows:
+            if row.elderly_id is not None and row.elderly_id not in elderly_ids:
+                errors.append(BulkItemError(index=index, id=getattr(row, "id", None), error=f"Error: ElderlyProfile con ID {row.elderly_id} no existe"))
+            elif row.health_worker_id is not None and row.health_worker_id not in health_worker_ids:
+                errors.append(BulkItemError(index=index, id=getattr(row, "id", None), error=f"Error: HealthWorker con ID {row.health_worker_id} no existe"))
+            else:
+                valid.append((index, row))
+        return valid
+
+    @staticmethod
+    def bulk_create(db: Session, items: List[Dict[str, Any]]) -> Tuple[List[Appointment], List[BulkItemError]]:
+        """
+        Crear varias citas en una sola transacción con un INSERT ... RETURNING (executemany).
+        Los elementos inválidos se reportan por índice sin abortar al resto.
+        """
+        errors: List[BulkItemError] = []
+        rows = validate_items(AppointmentCreate, items, errors)
+        rows = AppointmentService._missing_references(db, rows, errors)
+        written = write_rows(db, rows, lambda batch: list(db.scalars(
+            insert(Appointment).returning(Appointment, sort_by_parameter_order=True),
+            [row.model_dump() for row in batch]
+        )), errors)
+        try:
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise ValueError(f"Error al crear las citas: {str(e)}")
+
+        appointments = sorted_items(written)
+        if appointments:
+            refresh_all(db, Appointment, appointments)
+            response_cache.invalidate(*{appointments_tag(appointment.elderly_id) for appointment in appointments})
+        return appointments, sorted(errors, key=lambda error: error.index)
+
+    @staticmethod
+    def _update_many(db: Session, rows: List[AppointmentBulkUpdate]) -> List[Appointment]:
+        """Aplicar los cambios de cada fila y un flush para todos"""
+        appointments = {
+            appointment.id: appointment
+            for appointment in db.query(Appointment).filter(Appointment.id.in_([row.id for row in rows])).all()
+        }
+        for row in rows:
+            for field, value in row.model_dump(exclude_unset=True, exclude={"id"}).items():
+                setattr(appointments[row.id], field, value)
+        db.flush()
+        return [appointments[row.id] for row in rows]
+
+    @staticmethod
+    def bulk_update(db: Session, items: List[Dict[str, Any]]) -> Tuple[List[Appointment], List[BulkItemError]]:
+        """
+        Actualizar varias citas (cada elemento lleva su id) en una sola transacción.
+        Los elementos inválidos o inexistentes se reportan por índice sin abortar al resto.
+        """
+        errors: List[BulkItemError] = []
+        rows = validate_items(AppointmentBulkUpdate, items, errors)
+        rows = bulk_targets(db, Appointment, rows, errors, "Cita")
+        rows = AppointmentService._missing_references(db, rows, errors)
+
+        old_elderly_ids = dict(
+            db.query(Appointment.id, Appointment.elderly_id).filter(Appointment.id.in_([row.id for _, row in rows])).all()
+        ) if rows else {}
+        written = write_rows(
+            db, rows, lambda batch: AppointmentService._update_many(db, batch), errors, describe=lambda row: row.id
+        )
+        try:
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise ValueError(f"Error al actualizar las citas: {str(e)}")
+
+        appointments = sorted_items(written)
+        if appointments:
+            refresh_all(db, Appointment, appointments)
+            response_cache.invalidate(*{
+                appointments_tag(elderly_id)
+                for appointment in appointments
+                for elderly_id in (old_elderly_ids.get(appointment.id), appointment.elderly_id)
+            })
+        return appointments, sorted(errors, key=lambda error: error.index)
+
     @staticmethod
     def delete(db: Session, appointment_id: int) -> bool:
         """Eliminar una cita"""
@@ -63,8 +162,10 @@ class AppointmentService:
         if not appointment:
             return False
 
+        elderly_id = appointment.elderly_id
         db.delete(appointment)
         db.commit()
+        response_cache.invalidate(appointments_tag(elderly_id))
         return True
 
     @staticmethod
@@ -72,8 +173,13 @@ class AppointmentService:
         """Obtener todas las citas de un adulto mayor"""
         return db.query(Appointment).filter(Appointment.elderly_id == elderly_id).all()
 
+    @staticmethod
+    def query_by_health_worker_id(db: Session, health_worker_id: int):
+        """Query de citas de un trabajador de salud"""
+        return db.query(Appointment).filter(Appointment.health_worker_id == health_worker_id)
+
     @staticmethod
     def get_by_health_worker_id(db: Session, health_worker_id: int) -> List[Appointment]:
         """Obtener todas las citas de un trabajador de salud"""
-        return db.query(Appointment).filter(Appointment.health_worker_id == health_worker_id).all()
+        return AppointmentService.query_by_health_worker_id(db, health_worker_id).all()
 
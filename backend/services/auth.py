@@ -0,0 +1,130 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+from jose import JWTError, jwt
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+from database import get_db
+from models import User
+from dtos.auth import Principal, TokenResponse
+from dtos.users import UserResponse
+from services.users import UserService
+from services.principals import principal_cache
+import logging
+import os
+import secrets
+
+logger = logging.getLogger(__name__)
+
+JWT_ALGORITHM = os.getenv('JWT_ALGORITHM', 'HS256')
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', '60'))
+# APP_ENV en los que se tolera arrancar sin JWT_SECRET_KEY (con un secreto aleatorio por proceso)
+DEVELOPMENT_ENVIRONMENTS = ("development", "local", "test")
+
+
+@lru_cache(maxsize=None)
+def get_jwt_secret() -> str:
+    """
+    Secreto de firma de los JWT, leído en el primer uso (después de load_dotenv y configure_logging).
+    Fuera de desarrollo (APP_ENV) es obligatorio: con un secreto por proceso cada worker rechazaría
+    los tokens de los demás y todos se invalidarían al reiniciar. Si falta, solo fallan las rutas que
+    emiten o verifican tokens; la app y el scheduler arrancan igual.
+    """
+    secret = os.getenv('JWT_SECRET_KEY')
+    if secret:
+        return secret
+    environment = os.getenv('APP_ENV', 'production').lower()
+    if environment not in DEVELOPMENT_ENVIRONMENTS:
+        raise RuntimeError(
+            f"JWT_SECRET_KEY no está configurado (APP_ENV={environment}); "
+            f"solo se permite omitirlo con APP_ENV en {', '.join(DEVELOPMENT_ENVIRONMENTS)}"
+        )
+    # Los tokens solo sirven en este proceso y hasta que se reinicie
+    logger.warning("JWT_SECRET_KEY no está configurado; usando un secreto aleatorio por proceso")
+    return secrets.token_urlsafe(32)
+
+_bearer = HTTPBearer(auto_error=False)
+
+
+class AuthService:
+    @staticmethod
+    def create_access_token(user: User) -> TokenResponse:
+        """Emitir un JWT firmado con la identidad y el rol del usuario"""
+        now = datetime.now(timezone.utc)
+        expires_in = ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        claims = {
+            "sub": str(user.id),
+            "email": user.email,
+            "role": user.role,
+            "iat": now,
+            "exp": now + timedelta(seconds=expires_in)
+        }
+        return TokenResponse(
+            access_token=jwt.encode(claims, get_jwt_secret(), algorithm=JWT_ALGORITHM),
+            expires_in=expires_in,
+            user=UserResponse.model_validate(user)
+        )
+
+    @staticmethod
+    def decode_access_token(token: str) -> Principal:
+        """Verificar firma y expiración del JWT (sin consultar la base)"""
+        try:
+            claims = jwt.decode(token, get_jwt_secret(), algorithms=[JWT_ALGORITHM])
+            return Principal(id=int(claims["sub"]), email=claims["email"], role=claims["role"])
+        except (JWTError, KeyError, ValueError) as e:
+            raise ValueError(f"Token inválido: {str(e)}")
+
+    @staticmethod
+    async def login(db: Session, email: str, password: str) -> Optional[TokenResponse]:
+        """Autenticar con email y contraseña y emitir un token, o None si las credenciales no son válidas"""
+        user = await UserService.authenticate(db, email, password)
+        if not user:
+            return None
+        return AuthService.create_access_token(user)
+
+
+def _unauthorized(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"}
+    )
+
+
+async def get_current_principal(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(_bearer)
+) -> Principal:
+    """Dependencia: identidad del request a partir del header Authorization: Bearer <token>"""
+    if credentials is None:
+        raise _unauthorized("No autenticado")
+    try:
+        return AuthService.decode_access_token(credentials.credentials)
+    except ValueError as e:
+        raise _unauthorized(str(e))
+
+
+async def get_current_user(
+    principal: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+) -> UserResponse:
+    """
+    Dependencia: usuario autenticado completo, desde el cache TTL de principals.
+    Un cambio hecho en otro worker puede tardar hasta PRINCIPAL_CACHE_TTL_SECONDS en verse aquí.
+    """
+    user = principal_cache.get_user(db, principal.id)
+    if not user:
+        raise _unauthorized("El usuario del token ya no existe")
+    return user
+
+
+def require_roles(*roles: str):
+    """Dependencia: exige que el rol del token sea uno de `roles` (sin consultar la base)"""
+    async def dependency(principal: Principal = Depends(get_current_principal)) -> Principal:
+        if principal.role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Se requiere uno de los roles: {', '.join(roles)}"
+            )
+        return principal
+    return dependency
@@ -0,0 +1,110 @@
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Type, TypeVar
+from dtos.bulk import BulkItemError
+import os
+
+# Máximo de elementos por request en los endpoints /bulk
+MAX_BULK_ITEMS = int(os.getenv('MAX_BULK_ITEMS', '500'))
+
+M = TypeVar("M", bound=BaseModel)
+R = TypeVar("R")
+
+
+def _db_error_message(error: SQLAlchemyError) -> str:
+    return str(error.orig) if getattr(error, 'orig', None) is not None else str(error)
+
+
+def validate_items(
+    model: Type[M], items: List[Dict[str, Any]], errors: List[BulkItemError]
+) -> List[Tuple[int, M]]:
+    """
+    Validar cada elemento contra su DTO; los inválidos van a `errors` con su índice
+    en vez de rechazar la lista completa con un 422.
+    """
+    if len(items) > MAX_BULK_ITEMS:
+        raise ValueError(f"Se permiten como máximo {MAX_BULK_ITEMS} elementos por operación masiva")
+
+    valid: List[Tuple[int, M]] = []
+    for index, item in enumerate(items):
+        try:
+            valid.append((index, model.model_validate(item)))
+        except ValidationError as e:
+            details = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in e.errors()
+            )
+            item_id = item.get("id") if isinstance(item, dict) else None
+            errors.append(BulkItemError(index=index, id=item_id if isinstance(item_id, int) else None, error=details))
+    return valid
+
+
+def existing_ids(db: Session, column, ids: Iterable[Optional[int]]) -> Set[int]:
+    """IDs de `ids` que existen en la tabla de `column`, con una sola query"""
+    ids = {value for value in ids if value is not None}
+    if not ids:
+        return set()
+    return {value for (value,) in db.query(column).filter(column.in_(ids)).all()}
+
+
+def bulk_targets(
+    db: Session, model, rows: List[Tuple[int, M]], errors: List[BulkItemError], label: str
+) -> List[Tuple[int, M]]:
+    """Descartar (con error) las filas de una actualización masiva cuyo id no existe o se repite en la lista"""
+    found = existing_ids(db, model.id, (row.id for _, row in rows))
+    seen: Set[int] = set()
+    valid: List[Tuple[int, M]] = []
+    for index, row in rows:
+        if row.id not in found:
+            errors.append(BulkItemError(index=index, id=row.id, error=f"{label} con ID {row.id} no encontrado"))
+        elif row.id in seen:
+            errors.append(BulkItemError(index=index, id=row.id, error=f"El ID {row.id} aparece más de una vez en la lista"))
+        else:
+            seen.add(row.id)
+            valid.append((index, row))
+    return valid
+
+
+def write_rows(
+    db: Session,
+    rows: List[Tuple[int, M]],
+    write: Callable[[List[M]], List[R]],
+    errors: List[BulkItemError],
+    describe: Callable[[M], Optional[int]] = lambda row: None
+) -> List[Tuple[int, R]]:
+    """
+    Escribir todas las filas con una sola llamada a `write` (INSERT/UPDATE masivo) dentro de un SAVEPOINT.
+    Si la base rechaza el lote (p. ej. una FK que cambió entre la validación y la escritura), se deshace el
+    SAVEPOINT y se reintenta fila por fila, cada una en su propio SAVEPOINT, para aislar las que fallan.
+    No hace commit: la transacción completa se confirma una vez al final de la operación masiva.
+    """
+    if not rows:
+        return []
+    try:
+        with db.begin_nested():
+            results = write([row for _, row in rows])
+        return [(index, result) for (index, _), result in zip(rows, results)]
+    except SQLAlchemyError:
+        pass
+
+    written: List[Tuple[int, R]] = []
+    for index, row in rows:
+        try:
+            with db.begin_nested():
+                written.append((index, write([row])[0]))
+        except SQLAlchemyError as e:
+            errors.append(BulkItemError(index=index, id=describe(row), error=_db_error_message(e)))
+    return written
+
+
+def sorted_items(written: List[Tuple[int, R]]) -> List[R]:
+    """Resultados en el orden de la lista enviada"""
+    return [result for _, result in sorted(written, key=lambda pair: pair[0])]
+
+
+def refresh_all(db: Session, model, objects: List[Any]) -> None:
+    """Recargar con una sola query los objetos que expiró el commit (si no, se recarga uno por uno al serializar)"""
+    if objects:
+        # inspect().identity no dispara la recarga que sí dispararía obj.id
+        db.query(model).filter(model.id.in_([inspect(obj).identity[0] for obj in objects])).all()
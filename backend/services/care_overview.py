@@ -0,0 +1,32 @@
+from sqlalchemy.orm import Session
+from typing import Optional
+from dtos.elderly_profiles import ElderlyCareOverviewResponse, ElderlyProfileResponse
+from services.elderly_profiles import ElderlyProfileService
+from services.medicines import MedicineService
+from services.reminders import ReminderService
+from services.reminder_instances import ReminderInstanceService
+from services.appointments import AppointmentService
+from services.family_elderly_relationship import FamilyElderlyRelationshipService
+
+
+class CareOverviewService:
+    """
+    Vista compuesta de un adulto mayor (perfil, medicamentos, recordatorios, instancias de hoy,
+    citas y familiares) armada en una sola sesión con una query por sección.
+    """
+
+    @staticmethod
+    def get_overview(db: Session, elderly_id: int) -> Optional[ElderlyCareOverviewResponse]:
+        """Obtener la vista compuesta de un adulto mayor, o None si el perfil no existe"""
+        profile = ElderlyProfileService.get_by_id(db, elderly_id)
+        if not profile:
+            return None
+
+        return ElderlyCareOverviewResponse(
+            profile=ElderlyProfileResponse.model_validate(profile),
+            medicines=MedicineService.get_by_elderly_id(db, elderly_id),
+            reminders=ReminderService.get_by_elderly_id_with_medicine(db, elderly_id),
+            today_instances=ReminderInstanceService.get_today_with_medicine(db, elderly_profile_id=elderly_id),
+            appointments=AppointmentService.get_by_elderly_id(db, elderly_id),
+            family_relationships=FamilyElderlyRelationshipService.get_by_elderly_id(db, elderly_id)
+        )
@@ -0,0 +1,76 @@
+from fastapi import Request, Response
+from sqlalchemy import func
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+import hashlib
+
+
+def _etag(*parts) -> str:
+    return 'W/"' + hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()[:32] + '"'
+
+
+def entity_validators(kind: str, entity_id, updated_at: Optional[datetime]) -> Tuple[str, Optional[datetime]]:
+    """ETag débil y Last-Modified de un recurso a partir de su updated_at"""
+    return _etag(kind, entity_id, updated_at.isoformat() if updated_at else ""), updated_at
+
+
+def collection_validators(db, query, scope: str) -> Tuple[str, Optional[datetime]]:
+    """
+    ETag débil y Last-Modified de un listado: max(updated_at) y count(*) sobre las mismas filas
+    que devolvería `query` (el count detecta eliminaciones, que no mueven el máximo).
+    `scope` distingue listados distintos (ruta + query params).
+    """
+    subquery = query.subquery()
+    count, last_modified = db.query(func.count(), func.max(subquery.c.updated_at)).one()
+    return _etag(scope, count, last_modified.isoformat() if last_modified else ""), last_modified
+
+
+def _http_date(value: datetime) -> str:
+    # updated_at se guarda sin zona horaria
+    return format_datetime(value.replace(tzinfo=value.tzinfo or timezone.utc, microsecond=0), usegmt=True)
+
+
+def _is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match tiene prioridad sobre If-Modified-Since (RFC 9110)
+        candidates = [value.strip() for value in if_none_match.split(",")]
+        return etag in candidates or "*" in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        modified = last_modified.replace(tzinfo=last_modified.tzinfo or timezone.utc, microsecond=0)
+        return modified <= since
+    return False
+
+
+def conditional_response(
+    request: Request, response: Response, etag: str, last_modified: Optional[datetime]
+) -> Optional[Response]:
+    """
+    Agrega ETag / Last-Modified a la respuesta y, si el cliente ya tiene esta versión,
+    retorna un 304 para devolver directamente (sin construir DTOs ni serializar).
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified:
+        headers["Last-Modified"] = _http_date(last_modified)
+    response.headers.update(headers)
+    if _is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def entity_not_modified(request: Request, response: Response, kind: str, entity) -> Optional[Response]:
+    """304 si el cliente ya tiene esta versión del recurso (por updated_at)"""
+    return conditional_response(request, response, *entity_validators(kind, entity.id, entity.updated_at))
+
+
+def collection_not_modified(request: Request, response: Response, db, query) -> Optional[Response]:
+    """304 si el listado no cambió (max(updated_at) y count(*)), sin cargar las filas"""
+    scope = f"{request.url.path}?{request.url.query}"
+    return conditional_response(request, response, *collection_validators(db, query, scope))
@@ -3,9 +3,15 @@ from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
 from database import SessionLocal
 from services.reminder_call_service import ReminderCallService
+from services.webhook_events import WebhookEventService
+from services.stock_forecast import StockForecastService
+from services.adherence import AdherenceService
+from services.query_metrics import track_queries
+from services.structured_logging import with_tick
 import logging
 import atexit
 import asyncio
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +19,54 @@ logger = logging.getLogger(__name__)
 scheduler = None
 
 
+@with_tick("process_webhook_events")
+@track_queries("job:process_webhook_events")
+def process_webhook_events_job(batch_size: int = 50):
+    """Consume el inbox de webhooks en lotes hasta vaciarlo (los que fallan se reintentan en la próxima corrida)"""
+    db = SessionLocal()
+    failed_ids = set()
+    try:
+        while True:
+            results = WebhookEventService.process_batch(db, batch_size=batch_size, failed_ids=failed_ids)
+            handled = results["processed"] + results["ignored"] + results["failed"]
+            if handled < batch_size:
+                break
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error en job de webhooks: {str(e)}", exc_info=True)
+    finally:
+        db.close()
+
+
+@with_tick("refresh_stock_forecast")
+@track_queries("job:refresh_stock_forecast")
+def refresh_stock_forecast_job():
+    """Recalcula el pronóstico de stock de todos los medicamentos en una sola query"""
+    db = SessionLocal()
+    try:
+        count = StockForecastService.refresh(db)
+        logger.info(f"Pronóstico de stock recalculado para {count} medicamentos")
+    except Exception as e:
+        logger.error(f"Error recalculando pronóstico de stock: {str(e)}", exc_info=True)
+    finally:
+        db.close()
+
+
+@with_tick("refresh_adherence_rollups")
+@track_queries("job:refresh_adherence_rollups")
+def refresh_adherence_rollups_job():
+    """Reconcilia los rollups diarios de adherencia de los últimos días cerrados con reminder_instances"""
+    db = SessionLocal()
+    try:
+        count = AdherenceService.refresh_closed_days(db)
+        logger.info(f"Rollups de adherencia recalculados: {count} filas")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error recalculando rollups de adherencia: {str(e)}", exc_info=True)
+    finally:
+        db.close()
+
+
 def init_scheduler(interval_seconds: int = 20):
     """
     Inicializa el scheduler de cron para procesar recordatorios pendientes.
@@ -29,19 +83,17 @@ def init_scheduler(interval_seconds: int = 20):
     
     scheduler = BackgroundScheduler()
     
+    @with_tick("process_reminder_calls")
+    @track_queries("job:process_reminder_calls")
     def process_reminders_job():
         """Job que se ejecuta periódicamente para procesar recordatorios pendientes"""
         db = SessionLocal()
         try:
             # Procesar llamadas pendientes (es async, usar asyncio.run)
             try:
-                print('Processing pending calls')
-                print('owo', flush=True)
-                logger.info('logger.info owo')
                 results = asyncio.run(
                     ReminderCallService.process_pending_calls(db)
                 )
-                print('Results: ', results)
                 logger.info(
                     f"Cron job ejecutado: {results['processed']} procesados, "
                     f"{results['successful']} exitosos, {results['failed']} fallidos"
@@ -62,6 +114,39 @@ def init_scheduler(interval_seconds: int = 20):
         replace_existing=True
     )
     
+    # Red de seguridad para eventos que no alcanzó a procesar la BackgroundTask del webhook
+    scheduler.add_job(
+        func=process_webhook_events_job,
+        trigger=IntervalTrigger(seconds=int(os.getenv('WEBHOOK_INBOX_INTERVAL_SECONDS', '5'))),
+        id='process_webhook_events',
+        name='Procesar inbox de webhooks',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    
+    # Los días restantes avanzan con el reloj aunque no haya cambios, por eso se recalcula todo periódicamente
+    scheduler.add_job(
+        func=refresh_stock_forecast_job,
+        trigger=IntervalTrigger(seconds=int(os.getenv('STOCK_FORECAST_INTERVAL_SECONDS', '600'))),
+        id='refresh_stock_forecast',
+        name='Recalcular pronóstico de stock de medicamentos',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    
+    # Los rollups se mantienen en cada flush; este job solo corrige desvíos de los últimos días cerrados
+    scheduler.add_job(
+        func=refresh_adherence_rollups_job,
+        trigger=IntervalTrigger(seconds=int(os.getenv('ADHERENCE_ROLLUP_INTERVAL_SECONDS', '86400'))),
+        id='refresh_adherence_rollups',
+        name='Recalcular rollups diarios de adherencia',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    
     scheduler.start()
     logger.info(f"Scheduler iniciado. Ejecutándose cada {interval_seconds} segundos.")
     
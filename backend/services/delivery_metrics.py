@@ -0,0 +1,59 @@
+from datetime import datetime
+from typing import Iterable, Optional
+from services.metrics import registry
+
+# De segundos a un día: un recordatorio puede salir al instante o quedar atascado horas
+LAG_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200, 21600, 86400)
+
+DISPATCH_LAG = registry.histogram(
+    "reminder_dispatch_lag_seconds",
+    "Atraso entre scheduled_datetime y la aceptación del envío por el proveedor",
+    ("channel",),
+    buckets=LAG_BUCKETS
+)
+PENDING_BACKLOG = registry.gauge(
+    "reminder_pending_backlog",
+    "Recordatorios vencidos y aún no enviados en el último tick",
+    ("channel",)
+)
+OLDEST_PENDING_AGE = registry.gauge(
+    "reminder_oldest_pending_age_seconds",
+    "Antigüedad del recordatorio vencido más antiguo sin enviar en el último tick",
+    ("channel",)
+)
+REPLY_LATENCY = registry.histogram(
+    "reminder_reply_latency_seconds",
+    "Tiempo entre el envío del recordatorio y la respuesta de la persona",
+    ("channel",),
+    buckets=LAG_BUCKETS
+)
+
+
+def _seconds_between(start: datetime, end: datetime) -> float:
+    # Relojes desfasados entre la BD y el proceso no deben dar atrasos negativos
+    return max(0.0, (end - start).total_seconds())
+
+
+def observe_dispatch(channel: str, scheduled_datetime: Optional[datetime], accepted_at: Optional[datetime] = None) -> None:
+    """Registrar el atraso de un envío aceptado por el proveedor (Twilio, Kapso, ...)"""
+    if scheduled_datetime is None:
+        return
+    DISPATCH_LAG.observe(_seconds_between(scheduled_datetime, accepted_at or datetime.now()), channel=channel)
+
+
+def observe_backlog(channel: str, scheduled_datetimes: Iterable[datetime], now: Optional[datetime] = None) -> None:
+    """Profundidad y antigüedad del backlog, a partir de los vencidos que el tick ya cargó"""
+    now = now or datetime.now()
+    scheduled_datetimes = [value for value in scheduled_datetimes if value is not None]
+    PENDING_BACKLOG.set(len(scheduled_datetimes), channel=channel)
+    OLDEST_PENDING_AGE.set(
+        _seconds_between(min(scheduled_datetimes), now) if scheduled_datetimes else 0,
+        channel=channel
+    )
+
+
+def observe_reply(channel: str, sent_at: Optional[datetime], replied_at: Optional[datetime]) -> None:
+    """Registrar cuánto tardó la persona en responder un recordatorio enviado"""
+    if sent_at is None or replied_at is None:
+        return
+    REPLY_LATENCY.observe(_seconds_between(sent_at, replied_at), channel=channel)
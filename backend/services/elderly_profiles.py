@@ -7,10 +7,15 @@ from dtos.elderly_profiles import ElderlyProfileCreate, ElderlyProfileUpdate
 
 
 class ElderlyProfileService:
+    @staticmethod
+    def query_all(db: Session, skip: int = 0, limit: int = 100):
+        """Query de perfiles de adultos mayores con paginación"""
+        return db.query(ElderlyProfile).offset(skip).limit(limit)
+
     @staticmethod
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[ElderlyProfile]:
         """Obtener todos los perfiles de adultos mayores con paginación"""
-        return db.query(ElderlyProfile).offset(skip).limit(limit).all()
+        return ElderlyProfileService.query_all(db, skip=skip, limit=limit).all()
 
     @staticmethod
     def get_by_id(db: Session, profile_id: int) -> Optional[ElderlyProfile]:
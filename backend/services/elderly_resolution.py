@@ -0,0 +1,58 @@
+"""
+A qué adulto mayor pertenece un reminder. Igual que ReminderCallService.get_phone_number_for_reminder:
+primero reminders.elderly_profile_id, si no el elderly_id de su cita y si no su medicina
+(medicines.id es FK a elderly_profiles.id).
+"""
+from sqlalchemy import and_, case, or_, select
+from sqlalchemy.orm import Session
+from typing import Dict, Iterable, Optional
+from models import Reminder, Appointment
+
+
+def elderly_id_expression():
+    """Adulto mayor resuelto en SQL; la query debe hacer outerjoin(Appointment, Appointment.id == Reminder.appointment_id)"""
+    return case(
+        (Reminder.elderly_profile_id.isnot(None), Reminder.elderly_profile_id),
+        (Reminder.appointment_id.isnot(None), Appointment.elderly_id),
+        else_=Reminder.medicine
+    )
+
+
+def belongs_to_elderly(elderly_id: int):
+    """Filtro de los reminders de un adulto mayor (no requiere join con appointments)"""
+    return or_(
+        Reminder.elderly_profile_id == elderly_id,
+        and_(
+            Reminder.elderly_profile_id.is_(None),
+            Reminder.appointment_id.in_(select(Appointment.id).where(Appointment.elderly_id == elderly_id))
+        ),
+        and_(
+            Reminder.elderly_profile_id.is_(None),
+            Reminder.appointment_id.is_(None),
+            Reminder.medicine == elderly_id
+        )
+    )
+
+
+def appointment_elderly_ids(db: Session, appointment_ids: Iterable[int]) -> Dict[int, int]:
+    """elderly_id de varias citas en una sola query"""
+    appointment_ids = {appointment_id for appointment_id in appointment_ids if appointment_id is not None}
+    if not appointment_ids:
+        return {}
+    return dict(
+        db.query(Appointment.id, Appointment.elderly_id).filter(Appointment.id.in_(appointment_ids)).all()
+    )
+
+
+def resolve_elderly_id(
+    elderly_profile_id: Optional[int],
+    appointment_id: Optional[int],
+    medicine: Optional[int],
+    appointment_elderly: Dict[int, int]
+) -> Optional[int]:
+    """Lo mismo que elderly_id_expression, con las citas ya cargadas por appointment_elderly_ids"""
+    if elderly_profile_id is not None:
+        return elderly_profile_id
+    if appointment_id is not None:
+        return appointment_elderly.get(appointment_id)
+    return medicine
@@ -0,0 +1,83 @@
+from sqlalchemy.orm import Session
+from datetime import datetime
+from typing import Optional
+from models import ReminderInstance, Reminder, Medicine, NotificationLog, Appointment
+from services.elderly_resolution import elderly_id_expression, belongs_to_elderly
+
+
+class ExportService:
+    """
+    Queries de exportación del historial de adherencia.
+    Proyectan solo las columnas exportadas (sin cargar entidades ORM) para que se puedan
+    recorrer con yield_per en memoria constante.
+    """
+
+    @staticmethod
+    def query_reminder_history(
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        elderly_profile_id: Optional[int] = None
+    ):
+        """Historial de instancias con su reminder y medicina, ordenado por (scheduled_datetime, id)"""
+        query = (
+            db.query(
+                ReminderInstance.id.label("instance_id"),
+                ReminderInstance.reminder_id,
+                elderly_id_expression().label("elderly_profile_id"),
+                Reminder.reminder_type,
+                Medicine.id.label("medicine_id"),
+                Medicine.name.label("medicine_name"),
+                Medicine.dosage,
+                ReminderInstance.scheduled_datetime,
+                ReminderInstance.status,
+                ReminderInstance.taken_at,
+                ReminderInstance.retry_count,
+                ReminderInstance.family_notified,
+                ReminderInstance.notes
+            )
+            .join(Reminder, ReminderInstance.reminder_id == Reminder.id)
+            .outerjoin(Appointment, Reminder.appointment_id == Appointment.id)
+            .outerjoin(Medicine, Reminder.medicine == Medicine.id)
+        )
+        if start_date:
+            query = query.filter(ReminderInstance.scheduled_datetime >= start_date)
+        if end_date:
+            query = query.filter(ReminderInstance.scheduled_datetime < end_date)
+        if elderly_profile_id is not None:
+            query = query.filter(belongs_to_elderly(elderly_profile_id))
+        return query.order_by(ReminderInstance.scheduled_datetime.asc(), ReminderInstance.id.asc())
+
+    @staticmethod
+    def query_notification_logs(
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        elderly_profile_id: Optional[int] = None
+    ):
+        """Logs de notificaciones con la instancia asociada, filtrados por sent_at y ordenados por id"""
+        query = (
+            db.query(
+                NotificationLog.id,
+                NotificationLog.reminder_instance_id,
+                elderly_id_expression().label("elderly_profile_id"),
+                ReminderInstance.scheduled_datetime,
+                NotificationLog.notification_type,
+                NotificationLog.recepient_phone,
+                NotificationLog.status,
+                NotificationLog.sent_at,
+                NotificationLog.delivered_at,
+                NotificationLog.response,
+                NotificationLog.error_message
+            )
+            .join(ReminderInstance, NotificationLog.reminder_instance_id == ReminderInstance.id)
+            .join(Reminder, ReminderInstance.reminder_id == Reminder.id)
+            .outerjoin(Appointment, Reminder.appointment_id == Appointment.id)
+        )
+        if start_date:
+            query = query.filter(NotificationLog.sent_at >= start_date)
+        if end_date:
+            query = query.filter(NotificationLog.sent_at < end_date)
+        if elderly_profile_id is not None:
+            query = query.filter(belongs_to_elderly(elderly_profile_id))
+        return query.order_by(NotificationLog.id.asc())
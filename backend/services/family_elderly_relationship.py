@@ -4,6 +4,7 @@ from sqlalchemy import text
 from typing import List, Optional
 from models import FamilyElderlyRelationship, ElderlyProfile, User  # Importar para que estén en metadata
 from dtos.family_elderly_relationship import FamilyElderlyRelationshipCreate, FamilyElderlyRelationshipUpdate
+from services.response_cache import response_cache, family_relationships_tag
 
 
 class FamilyElderlyRelationshipService:
@@ -54,6 +55,7 @@ class FamilyElderlyRelationshipService:
         try:
             result = db.execute(text(query), params)
             db.commit()
+            response_cache.invalidate(family_relationships_tag(relationship_id))
             # Obtener la relación creada
             relationship = db.query(FamilyElderlyRelationship).filter(FamilyElderlyRelationship.id == relationship_id).first()
             return relationship
@@ -86,6 +88,7 @@ class FamilyElderlyRelationshipService:
         try:
             db.commit()
             db.refresh(relationship)
+            response_cache.invalidate(family_relationships_tag(relationship_id))
             return relationship
         except IntegrityError as e:
             db.rollback()
@@ -104,5 +107,6 @@ class FamilyElderlyRelationshipService:
 
         db.delete(relationship)
         db.commit()
+        response_cache.invalidate(family_relationships_tag(relationship_id))
         return True
 
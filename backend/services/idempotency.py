@@ -0,0 +1,44 @@
+from collections import OrderedDict
+from threading import Lock
+import os
+
+
+class IdempotencyStore:
+    """
+    LRU en memoria de llaves de eventos ya vistos.
+    Es solo un filtro rápido: la garantía real la da la restricción única en la BD
+    (webhook_events.provider + event_key), que también cubre reinicios y varios workers.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        self.capacity = capacity
+        self._keys = OrderedDict()
+        self._lock = Lock()
+
+    def seen(self, provider: str, event_key: str) -> bool:
+        """Retorna True si la llave ya fue vista (y la marca como usada recientemente)"""
+        key = (provider, event_key)
+        with self._lock:
+            if key in self._keys:
+                self._keys.move_to_end(key)
+                return True
+            return False
+
+    def mark(self, provider: str, event_key: str) -> None:
+        """Registra la llave, descartando la menos usada si se supera la capacidad"""
+        key = (provider, event_key)
+        with self._lock:
+            self._keys[key] = True
+            self._keys.move_to_end(key)
+            while len(self._keys) > self.capacity:
+                self._keys.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+
+
+# Store compartido por los webhooks de Kapso y Telegram
+webhook_idempotency = IdempotencyStore(
+    capacity=int(os.getenv('WEBHOOK_IDEMPOTENCY_CACHE_SIZE', '10000'))
+)
@@ -0,0 +1,17 @@
+from fastapi.responses import Response
+from typing import Any, Dict, Iterable
+import orjson
+
+
+def dump_rows(rows: Iterable[Dict[str, Any]]) -> bytes:
+    """
+    Serializar filas ya proyectadas (dicts con las claves y el orden del DTO) directo a JSON con orjson,
+    sin construir ni re-validar un modelo Pydantic por fila.
+    orjson escribe datetime/date en ISO 8601 igual que Pydantic para valores sin zona horaria.
+    """
+    return orjson.dumps(list(rows))
+
+
+def rows_response(rows: Iterable[Dict[str, Any]]) -> Response:
+    """Respuesta JSON a partir de filas proyectadas (FastAPI no vuelve a validar un Response)"""
+    return Response(content=dump_rows(rows), media_type="application/json")
@@ -1,16 +1,25 @@
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy import text
-from typing import List, Optional
-from models import Medicine, ElderlyProfile  # Importar ElderlyProfile para que esté en metadata
-from dtos.medicines import MedicineCreate, MedicineUpdate
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import text, update, func
+from typing import List, Optional, Dict, Any, Tuple
+from models import Medicine, MedicineStockLedger, ElderlyProfile  # Importar ElderlyProfile para que esté en metadata
+from dtos.medicines import MedicineCreate, MedicineUpdate, MedicineBulkUpdate
+from dtos.bulk import BulkItemError
+from services.stock_forecast import StockForecastService
+from services.response_cache import response_cache, medicines_tag, MEDICINES_TAG
+from services.bulk import validate_items, bulk_targets, existing_ids, write_rows, sorted_items, refresh_all
 
 
 class MedicineService:
+    @staticmethod
+    def query_all(db: Session, skip: int = 0, limit: int = 100):
+        """Query de medicamentos con paginación"""
+        return db.query(Medicine).offset(skip).limit(limit)
+
     @staticmethod
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Medicine]:
         """Obtener todos los medicamentos con paginación"""
-        return db.query(Medicine).offset(skip).limit(limit).all()
+        return MedicineService.query_all(db, skip=skip, limit=limit).all()
 
     @staticmethod
     def get_by_id(db: Session, medicine_id: int) -> Optional[Medicine]:
@@ -43,7 +52,11 @@ class MedicineService:
         
         try:
             result = db.execute(text(query), params)
+            if medicine_data.tablets_left is not None:
+                MedicineService._record_movement(db, medicine_id, medicine_data.tablets_left, medicine_data.tablets_left, "initial")
             db.commit()
+            StockForecastService.invalidate(medicine_id)
+            response_cache.invalidate(MEDICINES_TAG, medicines_tag(medicine_id))
             # Obtener el medicamento creado
             medicine = db.query(Medicine).filter(Medicine.id == medicine_id).first()
             return medicine
@@ -66,12 +79,20 @@ class MedicineService:
         if not medicine:
             return None
 
+        old_tablets_left = medicine.tablets_left
+
         update_data = medicine_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(medicine, field, value)
 
         try:
+            # Registrar ajustes manuales de stock en el ledger
+            if medicine.tablets_left is not None and medicine.tablets_left != old_tablets_left:
+                delta = medicine.tablets_left - (old_tablets_left or 0)
+                MedicineService._record_movement(db, medicine.id, delta, medicine.tablets_left, "adjustment")
             db.commit()
+            StockForecastService.invalidate(medicine_id)
+            response_cache.invalidate(MEDICINES_TAG, medicines_tag(medicine_id))
             db.refresh(medicine)
             return medicine
         except IntegrityError as e:
@@ -82,6 +103,124 @@ class MedicineService:
             db.rollback()
             raise ValueError(f"Error inesperado al actualizar el medicamento: {str(e)}")
 
+    @staticmethod
+    def _insert_many(db: Session, rows: List[MedicineCreate]) -> List[Medicine]:
+        """
+        INSERT de todos los medicamentos con executemany (uno por grupo de columnas informadas,
+        para que las columnas en None sigan tomando el default de la tabla) y sus movimientos iniciales.
+        """
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in rows:
+            params = {k: v for k, v in row.model_dump().items() if v is not None}
+            groups.setdefault(tuple(k for k in params if k != 'id'), []).append(params)
+
+        for columns, params in groups.items():
+            db.execute(text(f"""
+                INSERT INTO medicines (id{''.join(f', "{k}"' for k in columns)})
+                OVERRIDING SYSTEM VALUE
+                VALUES (:id{''.join(f', :{k}' for k in columns)})
+            """), params)
+
+        db.add_all([
+            MedicineStockLedger(
+                medicine_id=row.id,
+                delta=row.tablets_left,
+                balance_after=row.tablets_left,
+                reason="initial"
+            )
+            for row in rows if row.tablets_left is not None
+        ])
+        db.flush()
+
+        medicines = {
+            medicine.id: medicine
+            for medicine in db.query(Medicine).filter(Medicine.id.in_([row.id for row in rows])).all()
+        }
+        return [medicines[row.id] for row in rows]
+
+    @staticmethod
+    def bulk_create(db: Session, items: List[Dict[str, Any]]) -> Tuple[List[Medicine], List[BulkItemError]]:
+        """
+        Crear varios medicamentos en una sola transacción.
+        Los elementos inválidos se reportan por índice sin abortar al resto.
+        """
+        errors: List[BulkItemError] = []
+        rows = validate_items(MedicineCreate, items, errors)
+
+        profiles = existing_ids(db, ElderlyProfile.id, (row.id for _, row in rows))
+        taken = existing_ids(db, Medicine.id, (row.id for _, row in rows))
+        valid = []
+        for index, row in rows:
+            if row.id not in profiles:
+                errors.append(BulkItemError(index=index, id=row.id, error=f"Error: El ID {row.id} no existe en la tabla elderly_profiles"))
+            elif row.id in taken:
+                errors.append(BulkItemError(index=index, id=row.id, error=f"Error: Ya existe un medicamento con ID {row.id}"))
+            else:
+                taken.add(row.id)
+                valid.append((index, row))
+
+        written = write_rows(
+            db, valid, lambda batch: MedicineService._insert_many(db, batch), errors, describe=lambda row: row.id
+        )
+        try:
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise ValueError(f"Error al crear los medicamentos: {str(e)}")
+
+        medicines = sorted_items(written)
+        if medicines:
+            refresh_all(db, Medicine, medicines)
+            ids = [medicine.id for medicine in medicines]
+            StockForecastService.invalidate(*ids)
+            response_cache.invalidate(MEDICINES_TAG, *(medicines_tag(medicine_id) for medicine_id in ids))
+        return medicines, sorted(errors, key=lambda error: error.index)
+
+    @staticmethod
+    def _update_many(db: Session, rows: List[MedicineBulkUpdate]) -> List[Medicine]:
+        """Aplicar los cambios de cada fila (con su ajuste de stock en el ledger) y un flush para todos"""
+        medicines = {
+            medicine.id: medicine
+            for medicine in db.query(Medicine).filter(Medicine.id.in_([row.id for row in rows])).all()
+        }
+        for row in rows:
+            medicine = medicines[row.id]
+            old_tablets_left = medicine.tablets_left
+            for field, value in row.model_dump(exclude_unset=True, exclude={"id"}).items():
+                setattr(medicine, field, value)
+            # Registrar ajustes manuales de stock en el ledger
+            if medicine.tablets_left is not None and medicine.tablets_left != old_tablets_left:
+                delta = medicine.tablets_left - (old_tablets_left or 0)
+                MedicineService._record_movement(db, medicine.id, delta, medicine.tablets_left, "adjustment")
+        db.flush()
+        return [medicines[row.id] for row in rows]
+
+    @staticmethod
+    def bulk_update(db: Session, items: List[Dict[str, Any]]) -> Tuple[List[Medicine], List[BulkItemError]]:
+        """
+        Actualizar varios medicamentos (cada elemento lleva su id) en una sola transacción.
+        Los elementos inválidos o inexistentes se reportan por índice sin abortar al resto.
+        """
+        errors: List[BulkItemError] = []
+        rows = validate_items(MedicineBulkUpdate, items, errors)
+        rows = bulk_targets(db, Medicine, rows, errors, "Medicamento")
+        written = write_rows(
+            db, rows, lambda batch: MedicineService._update_many(db, batch), errors, describe=lambda row: row.id
+        )
+        try:
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise ValueError(f"Error al actualizar los medicamentos: {str(e)}")
+
+        medicines = sorted_items(written)
+        if medicines:
+            refresh_all(db, Medicine, medicines)
+            ids = [medicine.id for medicine in medicines]
+            StockForecastService.invalidate(*ids)
+            response_cache.invalidate(MEDICINES_TAG, *(medicines_tag(medicine_id) for medicine_id in ids))
+        return medicines, sorted(errors, key=lambda error: error.index)
+
     @staticmethod
     def delete(db: Session, medicine_id: int) -> bool:
         """Eliminar un medicamento"""
@@ -91,5 +230,72 @@ class MedicineService:
 
         db.delete(medicine)
         db.commit()
+        StockForecastService.invalidate(medicine_id)
+        response_cache.invalidate(MEDICINES_TAG, medicines_tag(medicine_id))
         return True
 
+
+    @staticmethod
+    def _record_movement(
+        db: Session,
+        medicine_id: int,
+        delta: int,
+        balance_after: int,
+        reason: str,
+        reminder_instance_id: Optional[int] = None
+    ) -> MedicineStockLedger:
+        """Agregar un movimiento al ledger de stock (sin commit)"""
+        entry = MedicineStockLedger(
+            medicine_id=medicine_id,
+            delta=delta,
+            balance_after=balance_after,
+            reason=reason,
+            reminder_instance_id=reminder_instance_id
+        )
+        db.add(entry)
+        return entry
+
+    @staticmethod
+    def consume_dose(db: Session, medicine_id: int, reminder_instance_id: Optional[int] = None) -> Optional[int]:
+        """
+        Descontar una dosis (tablets_per_dose) de forma atómica con un solo UPDATE ... RETURNING.
+        Retorna el nuevo tablets_left, o None si no hay stock suficiente. No hace commit.
+        """
+        dose = func.coalesce(Medicine.tablets_per_dose, 1)
+        row = db.execute(
+            update(Medicine)
+            .where(Medicine.id == medicine_id, Medicine.tablets_left >= dose)
+            .values(tablets_left=Medicine.tablets_left - dose)
+            .returning(Medicine.tablets_left, dose.label("dose"))
+            .execution_options(synchronize_session="fetch")
+        ).first()
+
+        if row is None:
+            return None
+
+        MedicineService._record_movement(
+            db, medicine_id, -row.dose, row.tablets_left, "dose_taken", reminder_instance_id
+        )
+        StockForecastService.invalidate_on_commit(db, medicine_id)
+        response_cache.invalidate_on_commit(db, MEDICINES_TAG, medicines_tag(medicine_id))
+        return row.tablets_left
+
+    @staticmethod
+    def get_stock_balance(db: Session, medicine_id: int) -> Optional[Dict[str, Any]]:
+        """Obtener saldo y días de stock restantes desde la vista medicine_stock_balance"""
+        row = db.execute(
+            text("SELECT * FROM medicine_stock_balance WHERE medicine_id = :medicine_id"),
+            {"medicine_id": medicine_id}
+        ).mappings().first()
+        return dict(row) if row else None
+
+    @staticmethod
+    def get_stock_ledger(db: Session, medicine_id: int, limit: int = 100) -> List[MedicineStockLedger]:
+        """Obtener los movimientos de stock más recientes de un medicamento"""
+        return (
+            db.query(MedicineStockLedger)
+            .filter(MedicineStockLedger.medicine_id == medicine_id)
+            .order_by(MedicineStockLedger.id.desc())
+            .limit(limit)
+            .all()
+        )
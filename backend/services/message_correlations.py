@@ -0,0 +1,85 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy import and_
+from typing import Optional, Tuple
+from models import MessageCorrelation, ReminderInstance, Reminder, Medicine, NotificationLog
+
+
+# (reminder_instance, reminder, medicine, notification_log) resuelto en una sola query
+ResolvedReply = Tuple[ReminderInstance, Reminder, Optional[Medicine], Optional[NotificationLog]]
+
+
+class MessageCorrelationService:
+    @staticmethod
+    def telegram_key(chat_id, message_id) -> str:
+        """Los message_id de Telegram son únicos solo dentro de un chat, por eso se combinan con el chat_id"""
+        return f"{chat_id}:{message_id}"
+
+    @staticmethod
+    def register(
+        db: Session, channel: str, provider_message_id: str, reminder_instance_id: int
+    ) -> Optional[MessageCorrelation]:
+        """
+        Registra el message_id del proveedor para una instancia de recordatorio.
+        Solo hace flush: el commit queda a cargo de quien llama.
+        """
+        correlation = MessageCorrelation(
+            channel=channel,
+            provider_message_id=provider_message_id,
+            reminder_instance_id=reminder_instance_id
+        )
+        try:
+            with db.begin_nested():
+                db.add(correlation)
+            return correlation
+        except IntegrityError:
+            # Ya existe una correlación para este mensaje (reintento del envío)
+            return None
+
+    @staticmethod
+    def _resolve_query(db: Session, channel: str):
+        """Query base: instancia + reminder + medicina + último notification_log del canal"""
+        return (
+            db.query(ReminderInstance, Reminder, Medicine, NotificationLog)
+            .join(Reminder, ReminderInstance.reminder_id == Reminder.id)
+            .outerjoin(Medicine, Reminder.medicine == Medicine.id)
+            .outerjoin(
+                NotificationLog,
+                and_(
+                    NotificationLog.reminder_instance_id == ReminderInstance.id,
+                    NotificationLog.notification_type == channel
+                )
+            )
+            .order_by(NotificationLog.sent_at.desc())
+        )
+
+    @staticmethod
+    def resolve(
+        db: Session, channel: str, provider_message_id: str, legacy_message_id: Optional[str] = None
+    ) -> Optional[ResolvedReply]:
+        """
+        Resuelve todo lo que necesita un webhook a partir del message_id del proveedor
+        usando el índice único de message_correlations y un solo join.
+        Si no hay correlación (mensajes enviados antes de existir la tabla), usa
+        el índice de reminder_instances.message_id.
+        """
+        row = (
+            MessageCorrelationService._resolve_query(db, channel)
+            .join(MessageCorrelation, MessageCorrelation.reminder_instance_id == ReminderInstance.id)
+            .filter(
+                and_(
+                    MessageCorrelation.channel == channel,
+                    MessageCorrelation.provider_message_id == provider_message_id
+                )
+            )
+            .first()
+        )
+        if row:
+            return tuple(row)
+
+        row = (
+            MessageCorrelationService._resolve_query(db, channel)
+            .filter(ReminderInstance.message_id == (legacy_message_id or provider_message_id))
+            .first()
+        )
+        return tuple(row) if row else None
@@ -1,8 +1,9 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from models import NotificationLog, ReminderInstance
 from dtos.notification_logs import NotificationLogCreate, NotificationLogUpdate
+from services.pagination import keyset_paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 
 class NotificationLogService:
@@ -11,6 +12,13 @@ class NotificationLogService:
         """Obtener todos los logs de notificaciones con paginación"""
         return db.query(NotificationLog).offset(skip).limit(limit).all()
 
+    @staticmethod
+    def get_page(
+        db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List[NotificationLog], Optional[str]]:
+        """Obtener logs de notificaciones paginados por cursor (id)"""
+        return keyset_paginate(db.query(NotificationLog), [NotificationLog.id], cursor=cursor, limit=limit)
+
     @staticmethod
     def get_by_id(db: Session, log_id: int) -> Optional[NotificationLog]:
         """Obtener un log de notificación por su ID"""
@@ -22,9 +30,17 @@ class NotificationLogService:
         return db.query(NotificationLog).filter(NotificationLog.reminder_instance_id == reminder_instance_id).all()
 
     @staticmethod
-    def get_by_status(db: Session, status: str) -> List[NotificationLog]:
-        """Obtener todos los logs de notificaciones por estado"""
-        return db.query(NotificationLog).filter(NotificationLog.status == status).all()
+    def query_by_status(db: Session, status: str):
+        """Query de logs de notificaciones por estado ordenada por id"""
+        return db.query(NotificationLog).filter(NotificationLog.status == status).order_by(NotificationLog.id.asc())
+
+    @staticmethod
+    def get_by_status(
+        db: Session, status: str, cursor: Optional[str] = None, limit: int = MAX_PAGE_SIZE
+    ) -> Tuple[List[NotificationLog], Optional[str]]:
+        """Obtener logs de notificaciones por estado paginados por cursor"""
+        query = db.query(NotificationLog).filter(NotificationLog.status == status)
+        return keyset_paginate(query, [NotificationLog.id], cursor=cursor, limit=limit)
 
     @staticmethod
     def create(db: Session, log_data: NotificationLogCreate) -> NotificationLog:
@@ -0,0 +1,78 @@
+from sqlalchemy import tuple_
+from datetime import datetime, date
+from typing import Any, List, Optional, Sequence, Tuple
+import base64
+import json
+
+# Tamaño máximo de página para cualquier listado
+MAX_PAGE_SIZE = 500
+DEFAULT_PAGE_SIZE = 100
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Serializar los valores de la llave de la última fila en un cursor opaco"""
+    raw = json.dumps(
+        [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values],
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """Deserializar un cursor según los tipos de las columnas de la llave. Lanza ValueError si es inválido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Cursor inválido")
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise ValueError("Cursor inválido")
+
+    result = []
+    for column, value in zip(columns, values):
+        python_type = column.type.python_type
+        try:
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            elif python_type is int:
+                value = int(value)
+        except (TypeError, ValueError):
+            raise ValueError("Cursor inválido")
+        result.append(value)
+    return result
+
+
+def keyset_paginate(
+    query,
+    columns: Sequence[Any],
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    descending: bool = False,
+    entity=None
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Paginar una query por llave compuesta (ej: scheduled_datetime, id) en vez de OFFSET.
+    El costo de cada página es el mismo sin importar qué tan profunda sea.
+    Las columnas de la llave no deben ser NULL y la última debe ser única.
+    Si las filas no son la entidad directamente (ej: tuplas de un join), `entity`
+    indica cómo obtener el objeto que contiene la llave.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    key = tuple_(*columns)
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        query = query.filter(key < tuple_(*values) if descending else key > tuple_(*values))
+
+    order = [c.desc() if descending else c.asc() for c in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = entity(rows[-1]) if entity else rows[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return rows, next_cursor
@@ -0,0 +1,56 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+import asyncio
+import os
+
+# Costo de bcrypt (log2 de las iteraciones). Los hashes con otro costo, menor o mayor, se re-hashean
+# en el próximo login (min_rounds y max_rounds del contexto lo marcan como deprecado)
+BCRYPT_ROUNDS = int(os.getenv('PASSWORD_BCRYPT_ROUNDS', '12'))
+# Hilos dedicados a bcrypt: acota cuánta CPU puede tomar una ráfaga de logins
+PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Contexto de hashing de contraseñas, creado en el primer login (passlib no se importa al arrancar)"""
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=BCRYPT_ROUNDS,
+        bcrypt__min_rounds=BCRYPT_ROUNDS,
+        bcrypt__max_rounds=BCRYPT_ROUNDS
+    )
+
+
+# bcrypt libera el GIL mientras calcula, así que un pool de hilos alcanza para sacar el trabajo
+# del event loop sin el costo de serializar argumentos hacia otro proceso
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def hash_password(password: str) -> str:
+    """Hashear una contraseña (bloqueante)"""
+    return get_pwd_context().hash(password)
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verificar una contraseña (bloqueante)"""
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+async def hash_password_async(password: str) -> str:
+    """Hashear una contraseña en el pool de bcrypt sin bloquear el event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_executor, get_pwd_context().hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verificar una contraseña en el pool de bcrypt.
+    Retorna (válida, nuevo_hash); nuevo_hash no es None cuando el hash guardado usa un costo
+    distinto a BCRYPT_ROUNDS y hay que reemplazarlo.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, get_pwd_context().verify_and_update, plain_password, hashed_password
+    )
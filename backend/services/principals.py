@@ -0,0 +1,59 @@
+from sqlalchemy.orm import Session
+from collections import OrderedDict
+from threading import Lock
+from typing import Optional, Tuple
+from models import User
+from dtos.users import UserResponse
+import os
+import time
+
+
+class PrincipalCache:
+    """
+    Cache TTL (LRU) de usuarios por id para los requests autenticados.
+    Guarda el DTO (no la entidad ORM) para poder compartirlo entre sesiones;
+    UserService lo invalida al actualizar o eliminar un usuario, pero solo en su propio proceso:
+    en los demás workers el usuario anterior (datos, o que exista) sigue vigente hasta que vence el TTL,
+    así que PRINCIPAL_CACHE_TTL_SECONDS acota cuánto puede quedar desactualizado.
+    """
+
+    def __init__(self, ttl: float = 60, capacity: int = 1000):
+        self.ttl = ttl
+        self.capacity = capacity
+        self._entries: "OrderedDict[int, Tuple[float, UserResponse]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get_user(self, db: Session, user_id: int) -> Optional[UserResponse]:
+        """Obtener el usuario desde el cache, o desde la base si no está o expiró"""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] >= time.monotonic():
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            self.invalidate(user_id)
+            return None
+
+        response = UserResponse.model_validate(user)
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+        return response
+
+    def invalidate(self, user_id: Optional[int]) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    ttl=float(os.getenv('PRINCIPAL_CACHE_TTL_SECONDS', '60')),
+    capacity=int(os.getenv('PRINCIPAL_CACHE_SIZE', '1000'))
+)
@@ -0,0 +1,183 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Iterator, List, Optional, Tuple
+from services.metrics import registry
+import logging
+import os
+import time
+
+logger = logging.getLogger(__name__)
+
+# Una misma sentencia ejecutada al menos estas veces en un request / tick se marca como posible N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', '5'))
+# Agregar X-DB-Query-Count / X-DB-Query-Time-Ms / X-DB-N-Plus-One a las respuestas (solo para depurar)
+SQL_DEBUG_HEADERS = os.getenv('SQL_DEBUG_HEADERS', '').lower() in ('1', 'true', 'yes')
+
+QUERIES_PER_SCOPE = registry.histogram(
+    "db_queries_per_scope",
+    "Queries SQL por request o tick del scheduler",
+    ("scope",),
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+QUERY_TIME_PER_SCOPE = registry.histogram(
+    "db_query_time_per_scope_seconds",
+    "Tiempo total en queries SQL por request o tick del scheduler",
+    ("scope",)
+)
+N_PLUS_ONE = registry.counter(
+    "db_n_plus_one",
+    "Sentencias repetidas al menos SQL_N_PLUS_ONE_THRESHOLD veces en un mismo request o tick",
+    ("scope",)
+)
+
+FAILED_QUERIES = registry.counter(
+    "db_failed_queries",
+    "Sentencias SQL que fallaron (p. ej. por una restricción única) por request o tick",
+    ("scope",)
+)
+
+
+class QueryStats:
+    """Queries SQL atribuidas a un request o a un tick del scheduler"""
+
+    def __init__(self, scope: str):
+        self.scope = scope
+        self.count = 0
+        self.failed = 0
+        self.seconds = 0.0
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, statement: str, elapsed: float, failed: bool = False) -> None:
+        self.count += 1
+        if failed:
+            self.failed += 1
+        self.seconds += elapsed
+        # Los parámetros van ligados, así que el texto de la sentencia ya es su "forma"
+        self.shapes[statement] = self.shapes.get(statement, 0) + 1
+
+    def n_plus_one(self) -> List[Tuple[str, int]]:
+        """Sentencias que se repitieron al menos N_PLUS_ONE_THRESHOLD veces, de la más repetida a la menos"""
+        return sorted(
+            ((statement, count) for statement, count in self.shapes.items() if count >= N_PLUS_ONE_THRESHOLD),
+            key=lambda item: -item[1]
+        )
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def current_stats() -> Optional[QueryStats]:
+    return _current.get()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # En el contexto de la ejecución y no en conn.info: si la sentencia falla no queda un inicio
+    # colgado en la conexión (que vuelve al pool y se reutiliza)
+    if context is not None:
+        context._query_metrics_start = time.perf_counter()
+
+
+def _elapsed(context) -> Optional[float]:
+    """Segundos desde before_cursor_execute, una sola vez por ejecución"""
+    start = getattr(context, "_query_metrics_start", None)
+    if start is None:
+        return None
+    context._query_metrics_start = None
+    return time.perf_counter() - start
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = _elapsed(context)
+    stats = _current.get()
+    if elapsed is not None and stats is not None:
+        stats.record(statement, elapsed)
+
+
+def _handle_error(exception_context):
+    """Una sentencia que falla (p. ej. IntegrityError) no pasa por after_cursor_execute: contarla aquí"""
+    context = exception_context.execution_context
+    elapsed = _elapsed(context) if context is not None else None
+    stats = _current.get()
+    if elapsed is not None and stats is not None and exception_context.statement is not None:
+        stats.record(exception_context.statement, elapsed, failed=True)
+
+
+def install() -> None:
+    """Registrar los hooks de cursor en todos los engines (idempotente)"""
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def _report(stats: QueryStats) -> None:
+    QUERIES_PER_SCOPE.observe(stats.count, scope=stats.scope)
+    QUERY_TIME_PER_SCOPE.observe(stats.seconds, scope=stats.scope)
+    if stats.failed:
+        FAILED_QUERIES.inc(stats.failed, scope=stats.scope)
+    for statement, count in stats.n_plus_one():
+        N_PLUS_ONE.inc(scope=stats.scope)
+        logger.warning(f"Posible N+1 en {stats.scope}: {count} ejecuciones de {' '.join(statement.split())[:300]}")
+
+
+@contextmanager
+def query_scope(scope: str) -> Iterator[QueryStats]:
+    """Atribuir las queries ejecutadas dentro del bloque a `scope` (p. ej. un job del scheduler)"""
+    stats = QueryStats(scope)
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        _report(stats)
+
+
+def track_queries(scope: str):
+    """Decorador: cada ejecución de la función es un scope de queries"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with query_scope(scope):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class QueryMetricsMiddleware:
+    """
+    Middleware ASGI que atribuye las queries SQL de cada request a su ruta
+    (el ContextVar se propaga a los threads de FastAPI y a las BackgroundTasks del request).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats("unmatched")
+        token = _current.set(stats)
+
+        async def send_wrapper(message: Message) -> None:
+            if SQL_DEBUG_HEADERS and message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Query-Time-Ms"] = f"{stats.seconds * 1000:.1f}"
+                headers["X-DB-N-Plus-One"] = str(len(stats.n_plus_one()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = scope.get("route")
+            stats.scope = f"{scope['method']} {getattr(route, 'path', None) or 'unmatched'}"
+            _report(stats)
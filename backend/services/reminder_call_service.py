@@ -10,6 +10,9 @@ from dtos.notification_logs import NotificationLogCreate, NotificationLogUpdate
 from enums import ReminderInstanceStatus
 from integrations.twilio import create_call
 from integrations.gemini import generate_content
+from services.structured_logging import log_context
+from services.tracing import stage, trace_tick
+from services.delivery_metrics import observe_backlog, observe_dispatch
 import logging
 import os
 
@@ -38,7 +41,8 @@ class ReminderCallService:
                 ReminderInstance.scheduled_datetime <= now,
             )
         ).all()
-        print(f"Pending instances for call: {len(pending_instances)}")
+        logger.info("Instancias pendientes de llamada: %d", len(pending_instances))
+        observe_backlog("call", (instance.scheduled_datetime for instance in pending_instances), now)
         
         return pending_instances
     
@@ -191,17 +195,25 @@ class ReminderCallService:
         Returns:
             Diccionario con el resultado del procesamiento
         """
-        print('in process_reminder_call', flush=True)
+        with log_context(reminder_instance_id=reminder_instance.id, reminder_id=reminder_instance.reminder_id), \
+                stage("process_reminder_call", reminder_instance_id=reminder_instance.id):
+            return await ReminderCallService._process_reminder_call(db, reminder_instance)
+
+    @staticmethod
+    async def _process_reminder_call(db: Session, reminder_instance: ReminderInstance) -> Dict:
         result = {
             "reminder_instance_id": reminder_instance.id,
             "success": False,
             "error": None,
             "call_sid": None
         }
+        # Leerlo antes de los commits, que expiran la instancia
+        scheduled_datetime = reminder_instance.scheduled_datetime
         
         try:
             # Obtener el reminder asociado
-            reminder = db.query(Reminder).filter(Reminder.id == reminder_instance.reminder_id).first()
+            with stage("load_reminder"):
+                reminder = db.query(Reminder).filter(Reminder.id == reminder_instance.reminder_id).first()
             if not reminder:
                 error_msg = f"Reminder con ID {reminder_instance.reminder_id} no encontrado"
                 logger.error(error_msg)
@@ -209,7 +221,8 @@ class ReminderCallService:
                 return result
             
             # Obtener número de teléfono
-            phone_number = ReminderCallService.get_phone_number_for_reminder(db, reminder)
+            with stage("resolve_phone"):
+                phone_number = ReminderCallService.get_phone_number_for_reminder(db, reminder)
             if not phone_number:
                 error_msg = f"No se pudo obtener número de teléfono para reminder {reminder.id}"
                 logger.error(error_msg)
@@ -217,14 +230,13 @@ class ReminderCallService:
                 return result
             
             # Generar mensaje
-            message = ReminderCallService.generate_call_message(db, reminder)
-            print('message from generate_call_message', message, flush=True)
-            logger.info(f"Mensaje generado para la llamada: {message}")
+            with stage("generate_message"):
+                message = ReminderCallService.generate_call_message(db, reminder)
+            logger.debug("Mensaje generado para la llamada: %s", message)
             
             # Obtener webhook URL si está configurada
             webhook_url = os.getenv('TWILIO_WEBHOOK_URL')
-            print(f"Webhook URL: {webhook_url}")
-            logger.info(f"Webhook URL: {webhook_url}")
+            logger.debug("Webhook URL: %s", webhook_url)
             
             # Crear notification_log antes de enviar la llamada
             log_data = NotificationLogCreate(
@@ -234,13 +246,15 @@ class ReminderCallService:
                 status="pending",
                 sent_at=datetime.now()
             )
-            notification_log = NotificationLogService.create(db, log_data)
+            with stage("insert_pending_log"):
+                notification_log = NotificationLogService.create(db, log_data)
             
             # Enviar llamada
             try:
-                print('process reminder call')
-                logger.info(f"Enviando llamada a {phone_number} con mensaje: {message}")
-                call_sid = create_call(phone_number, message, webhook_url=webhook_url, reminder_instance_id=reminder_instance.id, db=db)
+                logger.debug("Enviando llamada a %s con mensaje: %s", phone_number, message)
+                with stage("twilio_call"):
+                    call_sid = create_call(phone_number, message, webhook_url=webhook_url, reminder_instance_id=reminder_instance.id, db=db)
+                observe_dispatch("call", scheduled_datetime)
                 
                 result["call_sid"] = call_sid
                 
@@ -248,7 +262,8 @@ class ReminderCallService:
                 instance_update = ReminderInstanceUpdate(
                     status=ReminderInstanceStatus.WAITING.value
                 )
-                ReminderInstanceService.update(db, reminder_instance.id, instance_update)
+                with stage("update_status"):
+                    ReminderInstanceService.update(db, reminder_instance.id, instance_update)
                 
                 # Actualizar notification_log
                 approved_log_data = NotificationLogCreate(
@@ -259,8 +274,9 @@ class ReminderCallService:
                     sent_at=datetime.now(),
                     response=f"Call SID: {call_sid}"
                 )
-                NotificationLogService.create(db, approved_log_data)
-                db.commit()
+                with stage("insert_sent_log_commit"):
+                    NotificationLogService.create(db, approved_log_data)
+                    db.commit()
                 
                 result["success"] = True
                 logger.info(f"Llamada enviada exitosamente para reminder_instance {reminder_instance.id}. Call SID: {call_sid}")
@@ -300,12 +316,17 @@ class ReminderCallService:
             db: Sesión de base de datos
         
         Returns:
-            Diccionario con estadísticas del procesamiento
+            Diccionario con estadísticas del procesamiento y p50/p95 por etapa del tick
         """
-        print('in async process_pending_calls', flush=True)
-        logger.info('logger.info in async process_pending_calls')
-        pending_instances = ReminderCallService.get_pending_instances_for_call(db)
-        print('pending_instances from get_pending_instances_for_call', pending_instances, flush=True)
+        with trace_tick("process_pending_calls") as tick:
+            results = await ReminderCallService._process_pending_calls(db)
+        results["stages"] = tick.report()
+        return results
+
+    @staticmethod
+    async def _process_pending_calls(db: Session) -> Dict:
+        with stage("load_pending"):
+            pending_instances = ReminderCallService.get_pending_instances_for_call(db)
         
         results = {
             "processed": 0,
@@ -315,9 +336,8 @@ class ReminderCallService:
         }
         
         for instance in pending_instances:
-            print('before process_reminder_call', flush=True)
             result = await ReminderCallService.process_reminder_call(db, instance)
-            print('result from process_reminder_call', result, flush=True)
+            logger.debug("Resultado de la llamada: %s", result, extra={"reminder_instance_id": instance.id})
             results["processed"] += 1
             
             if result["success"]:
@@ -2,9 +2,12 @@ from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import and_, func, cast, Date
 from datetime import datetime, date, timedelta
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from models import ReminderInstance, Reminder, Medicine, NotificationLog
 from dtos.reminder_instances import ReminderInstanceCreate, ReminderInstanceUpdate, ReminderInstanceWithMedicineResponse
+from services.pagination import keyset_paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.elderly_resolution import belongs_to_elderly
+from enums import ReminderInstanceStatus
 
 
 class ReminderInstanceService:
@@ -13,85 +16,64 @@ class ReminderInstanceService:
         """Obtener todas las instancias de recordatorios con paginación"""
         return db.query(ReminderInstance).offset(skip).limit(limit).all()
 
+    @staticmethod
+    def get_page(
+        db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List[ReminderInstance], Optional[str]]:
+        """Obtener instancias paginadas por cursor (scheduled_datetime, id)"""
+        return keyset_paginate(db.query(ReminderInstance), [ReminderInstance.scheduled_datetime, ReminderInstance.id], cursor=cursor, limit=limit)
+
     @staticmethod
     def get_by_id(db: Session, instance_id: int) -> Optional[ReminderInstance]:
         """Obtener una instancia de recordatorio por su ID"""
         return db.query(ReminderInstance).filter(ReminderInstance.id == instance_id).first()
 
     @staticmethod
-    def get_by_reminder_id(db: Session, reminder_id: int) -> List[ReminderInstance]:
-        """Obtener todas las instancias de un recordatorio"""
-        return db.query(ReminderInstance).filter(ReminderInstance.reminder_id == reminder_id).all()
+    def query_by_reminder_id(db: Session, reminder_id: int):
+        """Query de instancias de un recordatorio ordenada por (scheduled_datetime, id)"""
+        return (
+            db.query(ReminderInstance)
+            .filter(ReminderInstance.reminder_id == reminder_id)
+            .order_by(ReminderInstance.scheduled_datetime.asc(), ReminderInstance.id.asc())
+        )
 
     @staticmethod
-    def get_by_reminder_id_with_medicine(
-        db: Session, 
-        reminder_id: int, 
-        limit: Optional[int] = None,
-        order_by_desc: bool = True
-    ) -> List[ReminderInstanceWithMedicineResponse]:
-        """Obtener instancias de un recordatorio con datos de medicina usando joins"""
-        query = (
-            db.query(ReminderInstance, Reminder, Medicine)
-            .join(Reminder, ReminderInstance.reminder_id == Reminder.id)
-            .outerjoin(Medicine, Reminder.medicine == Medicine.id)
-            .filter(and_(ReminderInstance.reminder_id == reminder_id, ReminderInstance.status != 'pending'))
+    def get_by_reminder_id(
+        db: Session, reminder_id: int, cursor: Optional[str] = None, limit: int = MAX_PAGE_SIZE
+    ) -> Tuple[List[ReminderInstance], Optional[str]]:
+        """Obtener instancias de un recordatorio paginadas por cursor"""
+        query = db.query(ReminderInstance).filter(ReminderInstance.reminder_id == reminder_id)
+        return keyset_paginate(
+            query, [ReminderInstance.scheduled_datetime, ReminderInstance.id], cursor=cursor, limit=limit
+        )
+
+    @staticmethod
+    def query_by_status(db: Session, status: str):
+        """Query de instancias por estado ordenada por (scheduled_datetime, id)"""
+        return (
+            db.query(ReminderInstance)
+            .filter(ReminderInstance.status == status)
+            .order_by(ReminderInstance.scheduled_datetime.asc(), ReminderInstance.id.asc())
         )
-        
-        # Order by scheduled_datetime (most recent first by default)
-        if order_by_desc:
-            query = query.order_by(ReminderInstance.scheduled_datetime.desc())
-        else:
-            query = query.order_by(ReminderInstance.scheduled_datetime.asc())
-        
-        # Apply limit if provided
-        if limit:
-            query = query.limit(limit)
-        
-        instances = query.all()
-        
-        result = []
-        for instance, reminder, medicine in instances:
-            # Get method from notification log (most recent one for this instance)
-            notification_log = (
-                db.query(NotificationLog)
-                .filter(NotificationLog.reminder_instance_id == instance.id)
-                .order_by(NotificationLog.sent_at.desc())
-                .first()
-            )
-            method = notification_log.notification_type if notification_log else None
-            
-            instance_response = ReminderInstanceWithMedicineResponse(
-                id=instance.id,
-                reminder_id=instance.reminder_id,
-                scheduled_datetime=instance.scheduled_datetime,
-                status=instance.status,
-                taken_at=instance.taken_at,
-                retry_count=instance.retry_count,
-                max_retries=instance.max_retries,
-                family_notified=instance.family_notified,
-                family_notified_at=instance.family_notified_at,
-                notes=instance.notes,
-                created_at=instance.created_at,
-                updated_at=instance.updated_at,
-                message_id=instance.message_id,
-                medicine_name=medicine.name if medicine else None,
-                dosage=medicine.dosage if medicine else None,
-                method=method
-            )
-            result.append(instance_response)
-        
-        return result
 
     @staticmethod
-    def get_by_status(db: Session, status: str) -> List[ReminderInstance]:
-        """Obtener todas las instancias por estado"""
-        return db.query(ReminderInstance).filter(ReminderInstance.status == status).all()
+    def get_by_status(
+        db: Session, status: str, cursor: Optional[str] = None, limit: int = MAX_PAGE_SIZE
+    ) -> Tuple[List[ReminderInstance], Optional[str]]:
+        """Obtener instancias por estado paginadas por cursor"""
+        query = db.query(ReminderInstance).filter(ReminderInstance.status == status)
+        return keyset_paginate(
+            query, [ReminderInstance.scheduled_datetime, ReminderInstance.id], cursor=cursor, limit=limit
+        )
 
     @staticmethod
-    def get_pending(db: Session) -> List[ReminderInstance]:
-        """Obtener todas las instancias pendientes"""
-        return db.query(ReminderInstance).filter(ReminderInstance.status == "pending").all()
+    def get_pending(
+        db: Session, cursor: Optional[str] = None, limit: int = MAX_PAGE_SIZE
+    ) -> Tuple[List[ReminderInstance], Optional[str]]:
+        """Obtener instancias pendientes paginadas por cursor"""
+        return ReminderInstanceService.get_by_status(
+            db, ReminderInstanceStatus.PENDING.value, cursor=cursor, limit=limit
+        )
 
     @staticmethod
     def create(db: Session, instance_data: ReminderInstanceCreate) -> ReminderInstance:
@@ -152,157 +134,159 @@ class ReminderInstanceService:
         return True
 
     @staticmethod
-    def _get_method_from_notification_log(db: Session, instance_id: int) -> Optional[str]:
-        """Obtener el método (whatsapp/call) del NotificationLog más reciente para una instancia"""
-        notification_log = (
-            db.query(NotificationLog)
-            .filter(NotificationLog.reminder_instance_id == instance_id)
-            .order_by(NotificationLog.sent_at.desc())
-            .first()
+    def _get_methods_from_notification_logs(
+        db: Session, instance_ids: List[int], normalize: bool = True
+    ) -> Dict[int, Optional[str]]:
+        """Método (whatsapp/call) del NotificationLog más reciente de varias instancias en una sola query"""
+        if not instance_ids:
+            return {}
+        logs = (
+            db.query(NotificationLog.reminder_instance_id, NotificationLog.notification_type)
+            .filter(NotificationLog.reminder_instance_id.in_(instance_ids))
+            .order_by(NotificationLog.reminder_instance_id, NotificationLog.sent_at.desc())
+            .all()
         )
-        
-        if notification_log and notification_log.notification_type:
-            # Normalizar el tipo de notificación a "whatsapp" o "call"
-            notification_type = notification_log.notification_type.lower()
-            if notification_type == "whatsapp":
-                return "whatsapp"
-            elif notification_type == "call":
-                return "call"
-        
-        return None
+        methods: Dict[int, Optional[str]] = {}
+        for instance_id, notification_type in logs:
+            if instance_id in methods:
+                continue
+            if normalize:
+                # Normalizar el tipo de notificación a "whatsapp" o "call"
+                notification_type = (notification_type or "").lower()
+                notification_type = notification_type if notification_type in ("whatsapp", "call") else None
+            methods[instance_id] = notification_type
+        return methods
 
     @staticmethod
-    def get_all_with_medicine(db: Session, skip: int = 0, limit: int = 100) -> List[ReminderInstanceWithMedicineResponse]:
-        """Obtener todas las instancias con datos de reminder y medicina usando joins"""
-        instances = (
-            db.query(ReminderInstance, Reminder, Medicine)
+    def _query_with_medicine(db: Session):
+        """
+        Proyección de columnas instancia + medicina, en el orden de ReminderInstanceWithMedicineResponse.
+        Devuelve tuplas (no entidades ORM), que se pueden serializar directo a JSON.
+        """
+        return (
+            db.query(
+                ReminderInstance.id,
+                ReminderInstance.reminder_id,
+                ReminderInstance.scheduled_datetime,
+                ReminderInstance.status,
+                ReminderInstance.taken_at,
+                ReminderInstance.retry_count,
+                ReminderInstance.max_retries,
+                ReminderInstance.family_notified,
+                ReminderInstance.family_notified_at,
+                ReminderInstance.notes,
+                ReminderInstance.created_at,
+                ReminderInstance.updated_at,
+                ReminderInstance.message_id,
+                Medicine.name.label("medicine_name"),
+                Medicine.dosage.label("dosage")
+            )
             .join(Reminder, ReminderInstance.reminder_id == Reminder.id)
             .outerjoin(Medicine, Reminder.medicine == Medicine.id)
-            .offset(skip)
-            .limit(limit)
-            .all()
         )
-        
-        result = []
-        for instance, reminder, medicine in instances:
-            method = ReminderInstanceService._get_method_from_notification_log(db, instance.id)
-            
-            instance_response = ReminderInstanceWithMedicineResponse(
-                id=instance.id,
-                reminder_id=instance.reminder_id,
-                scheduled_datetime=instance.scheduled_datetime,
-                status=instance.status,
-                taken_at=instance.taken_at,
-                retry_count=instance.retry_count,
-                max_retries=instance.max_retries,
-                family_notified=instance.family_notified,
-                family_notified_at=instance.family_notified_at,
-                notes=instance.notes,
-                created_at=instance.created_at,
-                updated_at=instance.updated_at,
-                message_id=instance.message_id,
-                medicine_name=medicine.name if medicine else None,
-                dosage=medicine.dosage if medicine else None,
-                method=method
-            )
-            result.append(instance_response)
-        
-        return result
 
     @staticmethod
-    def get_today_with_medicine(db: Session) -> List[ReminderInstanceWithMedicineResponse]:
-        """Obtener instancias de hoy con datos de reminder y medicina usando joins"""
+    def _with_medicine_rows(db: Session, query, normalize_method: bool = True) -> List[Dict[str, Any]]:
+        """Ejecutar la proyección y agregar el método de notificación (una query para todas las filas)"""
+        rows = query.all()
+        methods = ReminderInstanceService._get_methods_from_notification_logs(
+            db, [row.id for row in rows], normalize=normalize_method
+        )
+        return [{**row._asdict(), "method": methods.get(row.id)} for row in rows]
+
+    @staticmethod
+    def get_all_with_medicine_rows(db: Session, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Filas de todas las instancias con datos de reminder y medicina"""
+        query = ReminderInstanceService._query_with_medicine(db).offset(skip).limit(limit)
+        return ReminderInstanceService._with_medicine_rows(db, query)
+
+    @staticmethod
+    def get_today_with_medicine_rows(db: Session, elderly_profile_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Filas de las instancias de hoy con datos de reminder y medicina (opcionalmente de un adulto mayor)"""
         today = datetime.now().date()
         start_of_day = datetime.combine(today, datetime.min.time())
         start_of_tomorrow = datetime.combine(today + timedelta(days=1), datetime.min.time())
-        
-        # Use date range for PostgreSQL - more reliable
-        # Get all instances where scheduled_datetime is >= start of today and < start of tomorrow
-        instances = (
-            db.query(ReminderInstance, Reminder, Medicine)
-            .join(Reminder, ReminderInstance.reminder_id == Reminder.id)
-            .outerjoin(Medicine, Reminder.medicine == Medicine.id)
-            .filter(
-                and_(
-                    ReminderInstance.scheduled_datetime >= start_of_day,
-                    ReminderInstance.scheduled_datetime < start_of_tomorrow
-                )
+
+        query = ReminderInstanceService._query_with_medicine(db).filter(
+            and_(
+                ReminderInstance.scheduled_datetime >= start_of_day,
+                ReminderInstance.scheduled_datetime < start_of_tomorrow
             )
-            .order_by(ReminderInstance.scheduled_datetime.asc())
-            .all()
         )
-        
-        result = []
-        for instance, reminder, medicine in instances:
-            method = ReminderInstanceService._get_method_from_notification_log(db, instance.id)
-            
-            instance_response = ReminderInstanceWithMedicineResponse(
-                id=instance.id,
-                reminder_id=instance.reminder_id,
-                scheduled_datetime=instance.scheduled_datetime,
-                status=instance.status,
-                taken_at=instance.taken_at,
-                retry_count=instance.retry_count,
-                max_retries=instance.max_retries,
-                family_notified=instance.family_notified,
-                family_notified_at=instance.family_notified_at,
-                notes=instance.notes,
-                created_at=instance.created_at,
-                updated_at=instance.updated_at,
-                message_id=instance.message_id,
-                medicine_name=medicine.name if medicine else None,
-                dosage=medicine.dosage if medicine else None,
-                method=method
-            )
-            result.append(instance_response)
-        
-        return result
+        if elderly_profile_id is not None:
+            # Por elderly_profile_id, cita o medicina (medicine.id es FK a elderly_profiles.id)
+            query = query.filter(belongs_to_elderly(elderly_profile_id))
+        query = query.order_by(ReminderInstance.scheduled_datetime.asc())
+        return ReminderInstanceService._with_medicine_rows(db, query)
 
     @staticmethod
-    def get_by_month_with_medicine(db: Session, year: int, month: int) -> List[ReminderInstanceWithMedicineResponse]:
-        """Obtener instancias de un mes específico con datos de reminder y medicina usando joins"""
+    def get_by_month_with_medicine_rows(db: Session, year: int, month: int) -> List[Dict[str, Any]]:
+        """Filas de las instancias de un mes específico con datos de reminder y medicina"""
         start_date = datetime(year, month, 1)
         if month == 12:
             end_date = datetime(year + 1, 1, 1)
         else:
             end_date = datetime(year, month + 1, 1)
-        
-        instances = (
-            db.query(ReminderInstance, Reminder, Medicine)
-            .join(Reminder, ReminderInstance.reminder_id == Reminder.id)
-            .outerjoin(Medicine, Reminder.medicine == Medicine.id)
-            .filter(
-                and_(
-                    ReminderInstance.scheduled_datetime >= start_date,
-                    ReminderInstance.scheduled_datetime < end_date
-                )
+
+        query = ReminderInstanceService._query_with_medicine(db).filter(
+            and_(
+                ReminderInstance.scheduled_datetime >= start_date,
+                ReminderInstance.scheduled_datetime < end_date
             )
-            .all()
         )
-        
-        result = []
-        for instance, reminder, medicine in instances:
-            method = ReminderInstanceService._get_method_from_notification_log(db, instance.id)
-            
-            instance_response = ReminderInstanceWithMedicineResponse(
-                id=instance.id,
-                reminder_id=instance.reminder_id,
-                scheduled_datetime=instance.scheduled_datetime,
-                status=instance.status,
-                taken_at=instance.taken_at,
-                retry_count=instance.retry_count,
-                max_retries=instance.max_retries,
-                family_notified=instance.family_notified,
-                family_notified_at=instance.family_notified_at,
-                notes=instance.notes,
-                created_at=instance.created_at,
-                updated_at=instance.updated_at,
-                message_id=instance.message_id,
-                medicine_name=medicine.name if medicine else None,
-                dosage=medicine.dosage if medicine else None,
-                method=method
-            )
-            result.append(instance_response)
-        
-        return result
+        return ReminderInstanceService._with_medicine_rows(db, query)
 
+    @staticmethod
+    def get_by_reminder_id_with_medicine_rows(
+        db: Session,
+        reminder_id: int,
+        limit: int = MAX_PAGE_SIZE,
+        order_by_desc: bool = True
+    ) -> List[Dict[str, Any]]:
+        """Filas de las instancias ya resueltas de un recordatorio con datos de medicina"""
+        query = ReminderInstanceService._query_with_medicine(db).filter(
+            and_(ReminderInstance.reminder_id == reminder_id, ReminderInstance.status != 'pending')
+        )
+
+        # Order by scheduled_datetime (most recent first by default)
+        if order_by_desc:
+            query = query.order_by(ReminderInstance.scheduled_datetime.desc())
+        else:
+            query = query.order_by(ReminderInstance.scheduled_datetime.asc())
+
+        # Acotado a MAX_PAGE_SIZE aunque quien llama pida más (o nada)
+        query = query.limit(max(1, min(limit or MAX_PAGE_SIZE, MAX_PAGE_SIZE)))
+
+        # Este listado siempre devolvió el notification_type tal cual, sin normalizar
+        return ReminderInstanceService._with_medicine_rows(db, query, normalize_method=False)
+
+    @staticmethod
+    def get_all_with_medicine(db: Session, skip: int = 0, limit: int = 100) -> List[ReminderInstanceWithMedicineResponse]:
+        """Obtener todas las instancias con datos de reminder y medicina usando joins"""
+        rows = ReminderInstanceService.get_all_with_medicine_rows(db, skip=skip, limit=limit)
+        return [ReminderInstanceWithMedicineResponse(**row) for row in rows]
+
+    @staticmethod
+    def get_today_with_medicine(db: Session, elderly_profile_id: Optional[int] = None) -> List[ReminderInstanceWithMedicineResponse]:
+        """Obtener instancias de hoy con datos de reminder y medicina usando joins (opcionalmente de un adulto mayor)"""
+        rows = ReminderInstanceService.get_today_with_medicine_rows(db, elderly_profile_id=elderly_profile_id)
+        return [ReminderInstanceWithMedicineResponse(**row) for row in rows]
+
+    @staticmethod
+    def get_by_month_with_medicine(db: Session, year: int, month: int) -> List[ReminderInstanceWithMedicineResponse]:
+        """Obtener instancias de un mes específico con datos de reminder y medicina usando joins"""
+        rows = ReminderInstanceService.get_by_month_with_medicine_rows(db, year, month)
+        return [ReminderInstanceWithMedicineResponse(**row) for row in rows]
+
+    @staticmethod
+    def get_by_reminder_id_with_medicine(
+        db: Session,
+        reminder_id: int,
+        limit: int = MAX_PAGE_SIZE,
+        order_by_desc: bool = True
+    ) -> List[ReminderInstanceWithMedicineResponse]:
+        """Obtener instancias de un recordatorio con datos de medicina usando joins"""
+        rows = ReminderInstanceService.get_by_reminder_id_with_medicine_rows(
+            db, reminder_id, limit=limit, order_by_desc=order_by_desc
+        )
+        return [ReminderInstanceWithMedicineResponse(**row) for row in rows]
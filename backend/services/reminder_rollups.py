@@ -0,0 +1,183 @@
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.util import identity_key
+from datetime import datetime, date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from models import ReminderInstance, Reminder, Appointment, ReminderDailyRollup
+from services.adherence import AdherenceService, ON_TIME_MINUTES
+from services.elderly_resolution import appointment_elderly_ids, resolve_elderly_id
+from enums import ReminderInstanceStatus
+
+# (reminder_id, day, status)
+RollupKey = Tuple[int, date, str]
+
+TRACKED_INSTANCE_FIELDS = ("reminder_id", "scheduled_datetime", "status", "taken_at")
+TRACKED_REMINDER_FIELDS = ("elderly_profile_id", "appointment_id", "medicine")
+
+
+class ReminderRollupService:
+    """
+    Mantiene reminder_daily_rollups al día de forma incremental.
+    Un listener before_flush calcula el delta de cada instancia creada, modificada o eliminada
+    (webhooks, scheduler, llamadas o API) y lo aplica con un upsert en la misma transacción.
+    """
+
+    @staticmethod
+    def install() -> None:
+        """Registrar el listener en todas las sesiones (idempotente)"""
+        if event.contains(Session, "before_flush", ReminderRollupService._before_flush):
+            return
+        # active_history carga el valor anterior aunque el atributo esté expirado (p. ej. después de un commit),
+        # si no el historial no trae el estado del que sale la instancia
+        for field in TRACKED_INSTANCE_FIELDS:
+            event.listen(getattr(ReminderInstance, field), "set", ReminderRollupService._on_set, active_history=True)
+        event.listen(Session, "before_flush", ReminderRollupService._before_flush)
+
+    @staticmethod
+    def _on_set(target, value, oldvalue, initiator):
+        return value
+
+    @staticmethod
+    def _old_value(instance, field: str):
+        history = inspect(instance).attrs[field].history
+        return history.deleted[0] if history.deleted else getattr(instance, field)
+
+    @staticmethod
+    def _add(
+        deltas: Dict[RollupKey, List[float]],
+        reminder_id: Optional[int],
+        scheduled_datetime: Optional[datetime],
+        status: Optional[str],
+        taken_at: Optional[datetime],
+        sign: int
+    ) -> None:
+        """Sumar (sign=1) o restar (sign=-1) una instancia al delta de su (reminder, día, estado)"""
+        if reminder_id is None or scheduled_datetime is None:
+            return
+        status = status or ReminderInstanceStatus.PENDING.value
+        key = (reminder_id, scheduled_datetime.date(), status)
+        delta = deltas.setdefault(key, [0, 0, 0.0, 0])
+        delta[0] += sign
+        if status == ReminderInstanceStatus.SUCCESS.value and taken_at is not None:
+            latency = (taken_at - scheduled_datetime).total_seconds()
+            delta[1] += sign
+            delta[2] += sign * latency
+            if latency <= ON_TIME_MINUTES * 60:
+                delta[3] += sign
+
+    @staticmethod
+    def _before_flush(session: Session, flush_context, instances) -> None:
+        deltas: Dict[RollupKey, List[float]] = {}
+
+        for instance in session.new:
+            if isinstance(instance, ReminderInstance):
+                ReminderRollupService._add(
+                    deltas, instance.reminder_id, instance.scheduled_datetime, instance.status, instance.taken_at, 1
+                )
+
+        for instance in session.dirty:
+            if isinstance(instance, ReminderInstance):
+                state = inspect(instance)
+                if not any(state.attrs[field].history.has_changes() for field in TRACKED_INSTANCE_FIELDS):
+                    continue
+                ReminderRollupService._add(
+                    deltas, *(ReminderRollupService._old_value(instance, field) for field in TRACKED_INSTANCE_FIELDS), -1
+                )
+                ReminderRollupService._add(
+                    deltas, instance.reminder_id, instance.scheduled_datetime, instance.status, instance.taken_at, 1
+                )
+            elif isinstance(instance, Reminder):
+                state = inspect(instance)
+                if any(state.attrs[field].history.has_changes() for field in TRACKED_REMINDER_FIELDS):
+                    with session.no_autoflush:
+                        elderly_id, medicine_id = ReminderRollupService.load_rollup_owners(session, [instance.id])[instance.id]
+                    session.execute(
+                        update(ReminderDailyRollup)
+                        .where(ReminderDailyRollup.reminder_id == instance.id)
+                        .values(elderly_profile_id=elderly_id, medicine_id=medicine_id)
+                        .execution_options(synchronize_session=False)
+                    )
+            elif isinstance(instance, Appointment):
+                # Los reminders sin elderly_profile_id propio toman el adulto mayor de su cita
+                if inspect(instance).attrs["elderly_id"].history.has_changes():
+                    session.execute(
+                        update(ReminderDailyRollup)
+                        .where(ReminderDailyRollup.reminder_id.in_(
+                            select(Reminder.id).where(
+                                Reminder.appointment_id == instance.id,
+                                Reminder.elderly_profile_id.is_(None)
+                            )
+                        ))
+                        .values(elderly_profile_id=instance.elderly_id)
+                        .execution_options(synchronize_session=False)
+                    )
+
+        for instance in session.deleted:
+            if isinstance(instance, ReminderInstance):
+                ReminderRollupService._add(
+                    deltas, *(ReminderRollupService._old_value(instance, field) for field in TRACKED_INSTANCE_FIELDS), -1
+                )
+
+        if deltas:
+            with session.no_autoflush:
+                ReminderRollupService.apply_deltas(session, deltas)
+
+    @staticmethod
+    def load_rollup_owners(db: Session, reminder_ids: Iterable[int]) -> Dict[int, Tuple[Optional[int], Optional[int]]]:
+        """
+        (adulto mayor resuelto, medicina) de cada reminder, con a lo más dos queries.
+        Los reminders ya cargados en la sesión usan sus valores en memoria, que pueden traer cambios sin flush.
+        """
+        reminder_ids = set(reminder_ids)
+        columns: Dict[int, Tuple[Optional[int], Optional[int], Optional[int]]] = {}
+        missing = []
+        for reminder_id in reminder_ids:
+            reminder = db.identity_map.get(identity_key(Reminder, reminder_id))
+            if reminder is not None:
+                columns[reminder_id] = (reminder.elderly_profile_id, reminder.appointment_id, reminder.medicine)
+            else:
+                missing.append(reminder_id)
+        if missing:
+            for reminder_id, elderly_profile_id, appointment_id, medicine in db.query(
+                Reminder.id, Reminder.elderly_profile_id, Reminder.appointment_id, Reminder.medicine
+            ).filter(Reminder.id.in_(missing)).all():
+                columns[reminder_id] = (elderly_profile_id, appointment_id, medicine)
+
+        appointment_elderly = appointment_elderly_ids(db, (appointment_id for _, appointment_id, _ in columns.values()))
+        owners = {reminder_id: (None, None) for reminder_id in reminder_ids}
+        for reminder_id, (elderly_profile_id, appointment_id, medicine) in columns.items():
+            owners[reminder_id] = (resolve_elderly_id(elderly_profile_id, appointment_id, medicine, appointment_elderly), medicine)
+        return owners
+
+    @staticmethod
+    def apply_deltas(db: Session, deltas: Dict[RollupKey, List[float]]) -> None:
+        """
+        Upsert de los deltas: count = count + delta en la fila (reminder, día, estado).
+        Todas las filas van en un solo executemany, así materializar muchas instancias no cuesta un upsert por día.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta[0] or delta[1] or delta[3]}
+        owners = ReminderRollupService.load_rollup_owners(db, (reminder_id for reminder_id, _, _ in deltas))
+        params = []
+        for (reminder_id, day, status), (count, latency_count, latency_seconds_sum, on_time_count) in deltas.items():
+            elderly_id, medicine_id = owners[reminder_id]
+            params.append({
+                "reminder_id": reminder_id,
+                "elderly_profile_id": elderly_id,
+                "medicine_id": medicine_id,
+                "day": day,
+                "status": status,
+                "count": count,
+                "latency_count": latency_count,
+                "latency_seconds_sum": latency_seconds_sum,
+                "on_time_count": on_time_count
+            })
+        AdherenceService.upsert_rollups(db, params, accumulate=True)
+
+    @staticmethod
+    def backfill(db: Session, start_day: date, end_day: date, chunk_days: int = 31) -> Iterable[Tuple[date, date, int]]:
+        """Reconstruir los rollups de [start_day, end_day) desde reminder_instances, por tramos de `chunk_days`"""
+        chunk_start = start_day
+        while chunk_start < end_day:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days), end_day)
+            yield chunk_start, chunk_end, AdherenceService.refresh_rollups(db, chunk_start, chunk_end)
+            chunk_start = chunk_end
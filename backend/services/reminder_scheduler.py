@@ -5,12 +5,15 @@ from typing import Optional, List, Dict
 from models import Reminder, ReminderInstance, Appointment, Medicine, ElderlyProfile, NotificationLog, User
 from services.reminder_instances import ReminderInstanceService
 from services.notification_logs import NotificationLogService
+from services.message_correlations import MessageCorrelationService
 from dtos.reminder_instances import ReminderInstanceCreate, ReminderInstanceUpdate
 from dtos.notification_logs import NotificationLogUpdate
 from enums import ReminderInstanceStatus
 from integrations.kapso import send_whatsapp_message
 from integrations.telegram import send_telegram_message
 from integrations.gemini import generate_content
+from services.structured_logging import log_context
+from services.delivery_metrics import observe_backlog, observe_dispatch
 import logging
 from models import User
 
@@ -230,7 +233,11 @@ Solo devuelve el mensaje, sin comillas ni formato adicional."""
         """
         Procesa un reminder: crea reminder_instance, envía WhatsApp y actualiza estados
         """
-        print('en process reminder')
+        with log_context(reminder_id=reminder.id):
+            return await ReminderSchedulerService._process_reminder(db, reminder, scheduled_datetime)
+
+    @staticmethod
+    async def _process_reminder(db: Session, reminder: Reminder, scheduled_datetime: datetime) -> Dict:
         result = {
             "reminder_id": reminder.id,
             "success": False,
@@ -260,7 +267,6 @@ Solo devuelve el mensaje, sin comillas ni formato adicional."""
                 logger.info(f"Usando ReminderInstance existente {reminder_instance.id} para reminder {reminder.id}")
             else:
                 # Crear nueva instancia
-                print('crear nueva instancia')
                 instance_data = ReminderInstanceCreate(
                     reminder_id=reminder.id,
                     scheduled_datetime=scheduled_datetime,
@@ -302,8 +308,9 @@ Solo devuelve el mensaje, sin comillas ni formato adicional."""
                     body_text=message,
                     buttons=buttons
                 )
+                observe_dispatch("whatsapp", scheduled_datetime)
 
-                print('response', response)
+                logger.debug("Respuesta de Kapso: %s", response)
 
                 # response = await send_telegram_message(
                 #     chat_id=emergency_contact,
@@ -319,8 +326,13 @@ Solo devuelve el mensaje, sin comillas ni formato adicional."""
                 message_id = None
                 if "messages" in response and len(response["messages"]) > 0:
                     message_id = response["messages"][0].get("id")
-                print(f"Mensaje de WhatsApp enviado - message_id: {message_id}, to: {emergency_contact}")
-                print(f"reminder instance id: {reminder_instance.id}")
+                logger.debug(
+                    "Mensaje de WhatsApp enviado - message_id: %s, to: %s", message_id, emergency_contact,
+                    extra={"reminder_instance_id": reminder_instance.id}
+                )
+                if message_id:
+                    # Indexar el message_id para que el webhook resuelva la respuesta en O(1)
+                    MessageCorrelationService.register(db, "whatsapp", str(message_id), reminder_instance.id)
                 instance_update = ReminderInstanceUpdate(
                     status=ReminderInstanceStatus.WAITING.value,
                     message_id=str(message_id)
@@ -369,6 +381,7 @@ Solo devuelve el mensaje, sin comillas ni formato adicional."""
         Retorna estadísticas del procesamiento
         """
         reminders_to_process = ReminderSchedulerService.get_reminders_to_process(db)
+        observe_backlog("whatsapp", (scheduled_datetime for _, scheduled_datetime in reminders_to_process))
         
         results = {
             "processed": 0,
@@ -378,7 +391,6 @@ Solo devuelve el mensaje, sin comillas ni formato adicional."""
         }
         
         for reminder, scheduled_datetime in reminders_to_process:
-            print('processing reminder', reminder)
             result = await ReminderSchedulerService.process_reminder(db, reminder, scheduled_datetime)
             results["processed"] += 1
             
@@ -1,20 +1,41 @@
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy.exc import IntegrityError
-from sqlalchemy import text, and_
-from typing import List, Optional, Dict, Any
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy import text, and_, insert
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta, date
 from models import Reminder, Appointment, ElderlyProfile, Medicine, ReminderInstance  # Importar todas las tablas referenciadas
-from dtos.reminders import ReminderCreate, ReminderUpdate, ReminderWithMedicineResponse
+from dtos.reminders import ReminderCreate, ReminderUpdate, ReminderBulkUpdate, ReminderWithMedicineResponse
+from dtos.bulk import BulkItemError
 from dtos.medicines import MedicineResponse
 from dtos.reminder_instances import ReminderInstanceCreate
+from services.pagination import keyset_paginate, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.elderly_resolution import belongs_to_elderly
 from enums import ReminderInstanceStatus
+from services.stock_forecast import StockForecastService
+from services.response_cache import response_cache, REMINDERS_TAG
+from services.bulk import validate_items, bulk_targets, existing_ids, write_rows, sorted_items, refresh_all
+
+# Campos de MedicineResponse, en su orden, para armar medicineData desde una proyección
+MEDICINE_RESPONSE_FIELDS = tuple(MedicineResponse.model_fields)
 
 
 class ReminderService:
+    @staticmethod
+    def query_all(db: Session, skip: int = 0, limit: int = 100):
+        """Query de recordatorios con paginación"""
+        return db.query(Reminder).offset(skip).limit(limit)
+
     @staticmethod
     def get_all(db: Session, skip: int = 0, limit: int = 100) -> List[Reminder]:
         """Obtener todos los recordatorios con paginación"""
-        return db.query(Reminder).offset(skip).limit(limit).all()
+        return ReminderService.query_all(db, skip=skip, limit=limit).all()
+
+    @staticmethod
+    def get_page(
+        db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List[Reminder], Optional[str]]:
+        """Obtener recordatorios paginados por cursor (id)"""
+        return keyset_paginate(db.query(Reminder), [Reminder.id], cursor=cursor, limit=limit)
 
     @staticmethod
     def get_by_id(db: Session, reminder_id: int) -> Optional[Reminder]:
@@ -22,14 +43,30 @@ class ReminderService:
         return db.query(Reminder).filter(Reminder.id == reminder_id).first()
 
     @staticmethod
-    def get_active(db: Session) -> List[Reminder]:
-        """Obtener todos los recordatorios activos"""
-        return db.query(Reminder).filter(Reminder.is_active == True).all()
+    def query_active(db: Session):
+        """Query de recordatorios activos ordenada por id"""
+        return db.query(Reminder).filter(Reminder.is_active == True).order_by(Reminder.id.asc())
+
+    @staticmethod
+    def get_active(
+        db: Session, cursor: Optional[str] = None, limit: int = MAX_PAGE_SIZE
+    ) -> Tuple[List[Reminder], Optional[str]]:
+        """Obtener recordatorios activos paginados por cursor"""
+        query = db.query(Reminder).filter(Reminder.is_active == True)
+        return keyset_paginate(query, [Reminder.id], cursor=cursor, limit=limit)
 
     @staticmethod
-    def get_by_type(db: Session, reminder_type: str) -> List[Reminder]:
-        """Obtener todos los recordatorios por tipo"""
-        return db.query(Reminder).filter(Reminder.reminder_type == reminder_type).all()
+    def query_by_type(db: Session, reminder_type: str):
+        """Query de recordatorios por tipo ordenada por id"""
+        return db.query(Reminder).filter(Reminder.reminder_type == reminder_type).order_by(Reminder.id.asc())
+
+    @staticmethod
+    def get_by_type(
+        db: Session, reminder_type: str, cursor: Optional[str] = None, limit: int = MAX_PAGE_SIZE
+    ) -> Tuple[List[Reminder], Optional[str]]:
+        """Obtener recordatorios por tipo paginados por cursor"""
+        query = db.query(Reminder).filter(Reminder.reminder_type == reminder_type)
+        return keyset_paginate(query, [Reminder.id], cursor=cursor, limit=limit)
 
     @staticmethod
     def create(db: Session, reminder_data: ReminderCreate) -> Reminder:
@@ -39,6 +76,8 @@ class ReminderService:
         try:
             db.commit()
             db.refresh(reminder)
+            StockForecastService.invalidate(reminder.medicine)
+            response_cache.invalidate(REMINDERS_TAG)
             return reminder
         except IntegrityError as e:
             db.rollback()
@@ -61,33 +100,16 @@ class ReminderService:
             raise ValueError(f"Error inesperado al crear el recordatorio: {str(e)}")
 
     @staticmethod
-    def regenerate_future_instances(
-        db: Session, reminder: Reminder
-    ) -> int:
+    def _future_schedule(reminder: Reminder, now: datetime) -> List[datetime]:
         """
-        Regenera las instancias futuras de un reminder.
-        Elimina todas las instancias futuras y crea nuevas basadas en:
+        Fechas futuras (> now) de un reminder basadas en:
         - start_date
         - periodicity
         - end_date (o máximo 30 iteraciones si no hay end_date)
         """
-        now = datetime.now() - timedelta(hours=3)
-        
-        # Eliminar todas las instancias futuras (scheduled_datetime > now)
-        future_instances = db.query(ReminderInstance).filter(
-            and_(
-                ReminderInstance.reminder_id == reminder.id,
-                ReminderInstance.scheduled_datetime > now
-            )
-        ).all()
-        
-        deleted_count = len(future_instances)
-        for instance in future_instances:
-            db.delete(instance)
-        
-        # Si el reminder no está activo o no tiene periodicity, no crear nuevas instancias
+        # Si el reminder no está activo o no tiene periodicity, no hay instancias que crear
         if not reminder.is_active or not reminder.periodicity or reminder.periodicity == 0:
-            return deleted_count
+            return []
         
         # Calcular cuántas instancias crear
         max_iterations = 30
@@ -100,8 +122,7 @@ class ReminderService:
         else:
             max_iterations = 30
         
-        # Crear nuevas instancias
-        created_count = 0
+        schedule = []
         current_datetime = reminder.start_date
         
         # Si start_date está en el pasado, comenzar desde ahora
@@ -124,20 +145,57 @@ class ReminderService:
                 current_datetime = current_datetime + timedelta(minutes=reminder.periodicity)
                 continue
             
-            # Crear la instancia
-            instance_data = ReminderInstanceCreate(
-                reminder_id=reminder.id,
-                scheduled_datetime=current_datetime,
-                status=ReminderInstanceStatus.PENDING.value
-            )
-            instance = ReminderInstance(**instance_data.model_dump())
-            db.add(instance)
-            created_count += 1
+            schedule.append(current_datetime)
             
             # Avanzar al siguiente datetime
             current_datetime = current_datetime + timedelta(minutes=reminder.periodicity)
         
-        return deleted_count
+        return schedule
+
+    @staticmethod
+    def regenerate_future_instances(
+        db: Session, reminder: Reminder
+    ) -> int:
+        """
+        Regenera las instancias futuras de un reminder.
+        Elimina todas las instancias futuras y crea nuevas según _future_schedule.
+        """
+        return ReminderService.regenerate_future_instances_bulk(db, [reminder])
+
+    @staticmethod
+    def regenerate_future_instances_bulk(db: Session, reminders: List[Reminder]) -> int:
+        """
+        Regenera las instancias futuras de varios reminders con una sola query de lectura
+        y un solo flush para todas las instancias nuevas. Retorna cuántas instancias se eliminaron.
+        """
+        if not reminders:
+            return 0
+        now = datetime.now() - timedelta(hours=3)
+        
+        # Eliminar todas las instancias futuras (scheduled_datetime > now).
+        # Se eliminan por ORM (no con un DELETE masivo) para que los rollups diarios descuenten cada una.
+        future_instances = db.query(ReminderInstance).filter(
+            and_(
+                ReminderInstance.reminder_id.in_([reminder.id for reminder in reminders]),
+                ReminderInstance.scheduled_datetime > now
+            )
+        ).all()
+        
+        for instance in future_instances:
+            db.delete(instance)
+        
+        # Crear las instancias nuevas
+        db.add_all([
+            ReminderInstance(**ReminderInstanceCreate(
+                reminder_id=reminder.id,
+                scheduled_datetime=scheduled_datetime,
+                status=ReminderInstanceStatus.PENDING.value
+            ).model_dump())
+            for reminder in reminders
+            for scheduled_datetime in ReminderService._future_schedule(reminder, now)
+        ])
+        
+        return len(future_instances)
 
     @staticmethod
     def update(
@@ -152,6 +210,7 @@ class ReminderService:
         old_periodicity = reminder.periodicity
         old_start_date = reminder.start_date
         old_end_date = reminder.end_date
+        old_medicine = reminder.medicine
 
         update_data = reminder_data.model_dump(exclude_unset=True)
         for field, value in update_data.items():
@@ -172,6 +231,8 @@ class ReminderService:
             
             db.commit()
             db.refresh(reminder)
+            StockForecastService.invalidate(old_medicine, reminder.medicine)
+            response_cache.invalidate(REMINDERS_TAG)
             return reminder
         except IntegrityError as e:
             db.rollback()
@@ -181,6 +242,120 @@ class ReminderService:
             db.rollback()
             raise ValueError(f"Error inesperado al actualizar el recordatorio: {str(e)}")
 
+    @staticmethod
+    def _missing_references(db: Session, rows: List[Tuple[int, Any]], errors: List[BulkItemError]) -> List[Tuple[int, Any]]:
+        """Descartar (con error) las filas cuyas FKs no existen, con una query por tabla referenciada"""
+        references = {
+            "medicine": ("Medicine", Medicine.id),
+            "appointment_id": ("Appointment", Appointment.id),
+            "elderly_profile_id": ("ElderlyProfile", ElderlyProfile.id),
+        }
+        fields = list(references)
+        found = {field: existing_ids(db, references[field][1], (getattr(row, field) for _, row in rows)) for field in fields}
+
+        valid = []
+        for index, row in rows:
+            missing = next(
+                (field for field in fields if getattr(row, field) is not None and getattr(row, field) not in found[field]),
+                None
+            )
+            if missing:
+                errors.append(BulkItemError(
+                    index=index,
+                    id=getattr(row, "id", None),
+                    error=f"Error: {references[missing][0]} con ID {getattr(row, missing)} no existe"
+                ))
+            else:
+                valid.append((index, row))
+        return valid
+
+    @staticmethod
+    def _insert_many(db: Session, rows: List[ReminderCreate]) -> List[Reminder]:
+        """INSERT ... RETURNING de todos los recordatorios (executemany) y sus instancias futuras en un flush"""
+        reminders = list(db.scalars(
+            insert(Reminder).returning(Reminder, sort_by_parameter_order=True),
+            [row.model_dump() for row in rows]
+        ))
+        ReminderService.regenerate_future_instances_bulk(db, reminders)
+        db.flush()
+        return reminders
+
+    @staticmethod
+    def bulk_create(db: Session, items: List[Dict[str, Any]]) -> Tuple[List[Reminder], List[BulkItemError]]:
+        """
+        Crear varios recordatorios en una sola transacción y materializar sus instancias futuras.
+        Los elementos inválidos se reportan por índice sin abortar al resto.
+        """
+        errors: List[BulkItemError] = []
+        rows = validate_items(ReminderCreate, items, errors)
+        rows = ReminderService._missing_references(db, rows, errors)
+        written = write_rows(db, rows, lambda batch: ReminderService._insert_many(db, batch), errors)
+        try:
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise ValueError(f"Error al crear los recordatorios: {str(e)}")
+
+        reminders = sorted_items(written)
+        if reminders:
+            refresh_all(db, Reminder, reminders)
+            StockForecastService.invalidate(*(reminder.medicine for reminder in reminders))
+            response_cache.invalidate(REMINDERS_TAG)
+        return reminders, sorted(errors, key=lambda error: error.index)
+
+    @staticmethod
+    def _update_many(db: Session, rows: List[ReminderBulkUpdate]) -> List[Reminder]:
+        """Aplicar los cambios de cada fila, un flush para todos y regenerar instancias de los que cambiaron de horario"""
+        reminders = {
+            reminder.id: reminder
+            for reminder in db.query(Reminder).filter(Reminder.id.in_([row.id for row in rows])).all()
+        }
+        to_regenerate = []
+        for row in rows:
+            reminder = reminders[row.id]
+            old_schedule = (reminder.periodicity, reminder.start_date, reminder.end_date)
+            for field, value in row.model_dump(exclude_unset=True, exclude={"id"}).items():
+                setattr(reminder, field, value)
+            if old_schedule != (reminder.periodicity, reminder.start_date, reminder.end_date):
+                to_regenerate.append(reminder)
+        db.flush()
+        ReminderService.regenerate_future_instances_bulk(db, to_regenerate)
+        db.flush()
+        return [reminders[row.id] for row in rows]
+
+    @staticmethod
+    def bulk_update(db: Session, items: List[Dict[str, Any]]) -> Tuple[List[Reminder], List[BulkItemError]]:
+        """
+        Actualizar varios recordatorios (cada elemento lleva su id) en una sola transacción.
+        Los elementos inválidos o inexistentes se reportan por índice sin abortar al resto.
+        """
+        errors: List[BulkItemError] = []
+        rows = validate_items(ReminderBulkUpdate, items, errors)
+        rows = bulk_targets(db, Reminder, rows, errors, "Recordatorio")
+        rows = ReminderService._missing_references(db, rows, errors)
+
+        old_medicines = dict(
+            db.query(Reminder.id, Reminder.medicine).filter(Reminder.id.in_([row.id for _, row in rows])).all()
+        ) if rows else {}
+        written = write_rows(
+            db, rows, lambda batch: ReminderService._update_many(db, batch), errors, describe=lambda row: row.id
+        )
+        try:
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            raise ValueError(f"Error al actualizar los recordatorios: {str(e)}")
+
+        reminders = sorted_items(written)
+        if reminders:
+            refresh_all(db, Reminder, reminders)
+            StockForecastService.invalidate(
+                *(old_medicines.get(reminder.id) for reminder in reminders),
+                *(reminder.medicine for reminder in reminders)
+            )
+            response_cache.invalidate(REMINDERS_TAG)
+        return reminders, sorted(errors, key=lambda error: error.index)
+
     @staticmethod
     def delete(db: Session, reminder_id: int) -> bool:
         """Eliminar un recordatorio"""
@@ -188,10 +363,45 @@ class ReminderService:
         if not reminder:
             return False
 
+        medicine_id = reminder.medicine
         db.delete(reminder)
         db.commit()
+        StockForecastService.invalidate(medicine_id)
+        response_cache.invalidate(REMINDERS_TAG)
         return True
 
+    @staticmethod
+    def to_with_medicine_response(reminder: Reminder, medicine: Optional[Medicine]) -> ReminderWithMedicineResponse:
+        """Construir la respuesta de un recordatorio con los datos de su medicina"""
+        medicine_data = None
+        if medicine:
+            medicine_data = MedicineResponse(
+                id=medicine.id,
+                name=medicine.name,
+                dosage=medicine.dosage,
+                total_tablets=medicine.total_tablets,
+                tablets_left=medicine.tablets_left,
+                tablets_per_dose=medicine.tablets_per_dose,
+                notes=medicine.notes,
+                created_at=medicine.created_at,
+                updated_at=medicine.updated_at,
+            )
+
+        return ReminderWithMedicineResponse(
+            id=reminder.id,
+            reminder_type=reminder.reminder_type,
+            periodicity=reminder.periodicity,
+            start_date=reminder.start_date,
+            end_date=reminder.end_date,
+            medicine=reminder.medicine,
+            appointment_id=reminder.appointment_id,
+            elderly_profile_id=reminder.elderly_profile_id,
+            is_active=reminder.is_active,
+            created_at=reminder.created_at,
+            updated_at=reminder.updated_at,
+            medicineData=medicine_data
+        )
+
     @staticmethod
     def get_all_with_medicine(db: Session, skip: int = 0, limit: int = 100) -> List[ReminderWithMedicineResponse]:
         """Obtener todos los recordatorios con datos de medicina usando join"""
@@ -202,82 +412,79 @@ class ReminderService:
             .limit(limit)
             .all()
         )
-        
-        result = []
-        for reminder, medicine in reminders:
-            medicine_data = None
-            if medicine:
-                medicine_data = MedicineResponse(
-                    id=medicine.id,
-                    name=medicine.name,
-                    dosage=medicine.dosage,
-                    total_tablets=medicine.total_tablets,
-                    tablets_left=medicine.tablets_left,
-                    tablets_per_dose=medicine.tablets_per_dose,
-                    notes=medicine.notes,
-                    created_at=medicine.created_at,
-                    updated_at=medicine.updated_at,
-                )
-            
-            reminder_response = ReminderWithMedicineResponse(
-                id=reminder.id,
-                reminder_type=reminder.reminder_type,
-                periodicity=reminder.periodicity,
-                start_date=reminder.start_date,
-                end_date=reminder.end_date,
-                medicine=reminder.medicine,
-                appointment_id=reminder.appointment_id,
-                elderly_profile_id=reminder.elderly_profile_id,
-                is_active=reminder.is_active,
-                created_at=reminder.created_at,
-                updated_at=reminder.updated_at,
-                medicineData=medicine_data
+
+        return [ReminderService.to_with_medicine_response(reminder, medicine) for reminder, medicine in reminders]
+
+    @staticmethod
+    def _query_with_medicine_columns(db: Session):
+        """Proyección de columnas recordatorio + medicina (prefijo medicine__) para serializar sin ORM ni Pydantic"""
+        return (
+            db.query(
+                Reminder.id,
+                Reminder.reminder_type,
+                Reminder.periodicity,
+                Reminder.start_date,
+                Reminder.end_date,
+                Reminder.medicine,
+                Reminder.appointment_id,
+                Reminder.elderly_profile_id,
+                Reminder.is_active,
+                Reminder.created_at,
+                Reminder.updated_at,
+                *(getattr(Medicine, field).label(f"medicine__{field}") for field in MEDICINE_RESPONSE_FIELDS)
             )
-            result.append(reminder_response)
-        
-        return result
+            .outerjoin(Medicine, Reminder.medicine == Medicine.id)
+        )
+
+    @staticmethod
+    def _with_medicine_row(row) -> Dict[str, Any]:
+        """Fila proyectada -> dict con la forma de ReminderWithMedicineResponse"""
+        data = row._asdict()
+        medicine_data = {field: data.pop(f"medicine__{field}") for field in MEDICINE_RESPONSE_FIELDS}
+        data["medicineData"] = medicine_data if medicine_data["id"] is not None else None
+        return data
 
     @staticmethod
-    def get_active_with_medicine(db: Session) -> List[ReminderWithMedicineResponse]:
-        """Obtener todos los recordatorios activos con datos de medicina usando join"""
+    def get_all_with_medicine_rows(db: Session, skip: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        """Filas de todos los recordatorios con datos de medicina, listas para serializar a JSON"""
+        rows = ReminderService._query_with_medicine_columns(db).offset(skip).limit(limit).all()
+        return [ReminderService._with_medicine_row(row) for row in rows]
+
+    @staticmethod
+    def get_by_elderly_id_with_medicine(db: Session, elderly_id: int) -> List[ReminderWithMedicineResponse]:
+        """Obtener los recordatorios de un adulto mayor con datos de medicina usando join"""
         reminders = (
             db.query(Reminder, Medicine)
             .outerjoin(Medicine, Reminder.medicine == Medicine.id)
-            .filter(Reminder.is_active == True)
+            # Por elderly_profile_id, cita o medicina (medicine.id es FK a elderly_profiles.id)
+            .filter(belongs_to_elderly(elderly_id))
+            .order_by(Reminder.id.asc())
             .all()
         )
-        
-        result = []
-        for reminder, medicine in reminders:
-            medicine_data = None
-            if medicine:
-                medicine_data = MedicineResponse(
-                    id=medicine.id,
-                    name=medicine.name,
-                    dosage=medicine.dosage,
-                    total_tablets=medicine.total_tablets,
-                    tablets_left=medicine.tablets_left,
-                    tablets_per_dose=medicine.tablets_per_dose,
-                    notes=medicine.notes,
-                    created_at=medicine.created_at,
-                    updated_at=medicine.updated_at,
-                )
-            
-            reminder_response = ReminderWithMedicineResponse(
-                id=reminder.id,
-                reminder_type=reminder.reminder_type,
-                periodicity=reminder.periodicity,
-                start_date=reminder.start_date,
-                end_date=reminder.end_date,
-                medicine=reminder.medicine,
-                appointment_id=reminder.appointment_id,
-                elderly_profile_id=reminder.elderly_profile_id,
-                is_active=reminder.is_active,
-                created_at=reminder.created_at,
-                updated_at=reminder.updated_at,
-                medicineData=medicine_data
-            )
-            result.append(reminder_response)
-        
-        return result
 
+        return [ReminderService.to_with_medicine_response(reminder, medicine) for reminder, medicine in reminders]
+
+    @staticmethod
+    def query_active_with_medicine(db: Session):
+        """Query de recordatorios activos con su medicina (join) ordenada por id"""
+        return (
+            db.query(Reminder, Medicine)
+            .outerjoin(Medicine, Reminder.medicine == Medicine.id)
+            .filter(Reminder.is_active == True)
+            .order_by(Reminder.id.asc())
+        )
+
+    @staticmethod
+    def get_active_with_medicine(
+        db: Session, cursor: Optional[str] = None, limit: int = MAX_PAGE_SIZE
+    ) -> Tuple[List[ReminderWithMedicineResponse], Optional[str]]:
+        """Obtener recordatorios activos con datos de medicina paginados por cursor"""
+        query = (
+            db.query(Reminder, Medicine)
+            .outerjoin(Medicine, Reminder.medicine == Medicine.id)
+            .filter(Reminder.is_active == True)
+        )
+        rows, next_cursor = keyset_paginate(
+            query, [Reminder.id], cursor=cursor, limit=limit, entity=lambda row: row[0]
+        )
+        return [ReminderService.to_with_medicine_response(reminder, medicine) for reminder, medicine in rows], next_cursor
@@ -0,0 +1,61 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from services.metrics import registry
+import time
+
+REQUEST_LATENCY = registry.histogram(
+    "http_request_duration_seconds",
+    "Latencia de los requests HTTP por ruta",
+    ("method", "route", "status")
+)
+RESPONSE_SIZE = registry.histogram(
+    "http_response_size_bytes",
+    "Tamaño del cuerpo de las respuestas HTTP por ruta",
+    ("method", "route"),
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+)
+IN_FLIGHT = registry.gauge(
+    "http_requests_in_flight",
+    "Requests HTTP en curso",
+    ("method",)
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Middleware ASGI que mide latencia, tamaño de respuesta y requests en curso.
+    La ruta se etiqueta con su plantilla (/reminders/{reminder_id}), no con la URL concreta,
+    para que la cantidad de series no crezca con los IDs.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        IN_FLIGHT.inc(method=method)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_FLIGHT.dec(method=method)
+            # FastAPI deja la ruta que hizo match en el scope
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            REQUEST_LATENCY.observe(elapsed, method=method, route=route_path, status=status_code)
+            RESPONSE_SIZE.observe(size, method=method, route=route_path)
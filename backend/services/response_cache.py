@@ -0,0 +1,194 @@
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from services.session_hooks import call_after_commit
+import hashlib
+import os
+import time
+
+
+class CacheBackend(ABC):
+    """
+    Interfaz de almacenamiento del cache de respuestas.
+    Las entradas expiran por TTL; las versiones de tags no expiran (invalidarlas es incrementarlas).
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def get_version(self, tag: str) -> int:
+        ...
+
+    @abstractmethod
+    def bump_version(self, tag: str) -> int:
+        ...
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """LRU con TTL en memoria del proceso"""
+
+    def __init__(self, capacity: int = 1000):
+        self.capacity = capacity
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def get_version(self, tag: str) -> int:
+        with self._lock:
+            return self._versions.get(tag, 0)
+
+    def bump_version(self, tag: str) -> int:
+        with self._lock:
+            self._versions[tag] = self._versions.get(tag, 0) + 1
+            return self._versions[tag]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Backend compartido entre workers (RESPONSE_CACHE_URL=redis://...)"""
+
+    def __init__(self, url: str, prefix: str = "response_cache:"):
+        # Se importa solo si se configura Redis, para no sumarlo al arranque de la app
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(self.prefix + key)
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def get_version(self, tag: str) -> int:
+        return int(self.client.get(f"{self.prefix}tag:{tag}") or 0)
+
+    def bump_version(self, tag: str) -> int:
+        return int(self.client.incr(f"{self.prefix}tag:{tag}"))
+
+
+def _build_backend() -> CacheBackend:
+    url = os.getenv('RESPONSE_CACHE_URL')
+    if url and url.startswith(("redis://", "rediss://")):
+        return RedisCacheBackend(url)
+    return InMemoryCacheBackend(capacity=int(os.getenv('RESPONSE_CACHE_SIZE', '1000')))
+
+
+class ResponseCache:
+    """
+    Cache de respuestas JSON por ruta + query params, con invalidación por tags.
+    Cada entrada se guarda bajo las versiones actuales de sus tags: invalidar un tag
+    incrementa su versión y deja huérfanas las entradas anteriores, que expiran por LRU/TTL.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 30):
+        self.backend = backend
+        self.ttl = ttl
+        self._adapters: Dict[Any, TypeAdapter] = {}
+
+    def _key(self, request: Request, tags: Iterable[str]) -> str:
+        versions = ",".join(f"{tag}={self.backend.get_version(tag)}" for tag in tags)
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        return f"{request.url.path}?{query}|{versions}"
+
+    def _serialize(self, response_model: Any, data: Any) -> bytes:
+        adapter = self._adapters.get(response_model)
+        if adapter is None:
+            adapter = self._adapters[response_model] = TypeAdapter(response_model)
+        return adapter.dump_json(adapter.validate_python(data, from_attributes=True))
+
+    def respond(
+        self,
+        request: Request,
+        response_model: Any,
+        tags: Iterable[str],
+        build: Optional[Callable[[], Any]] = None,
+        render: Optional[Callable[[], bytes]] = None
+    ) -> Response:
+        """
+        Responder desde el cache o construir la respuesta con `build` (objetos que se validan contra
+        `response_model`) o con `render` (bytes JSON ya serializados, p. ej. una proyección directa).
+        Si el cliente manda If-None-Match con el ETag vigente se responde 304 sin cuerpo.
+        """
+        tags = list(tags)
+        key = self._key(request, tags)
+        cached = self.backend.get(key)
+        if cached is not None:
+            etag, body = cached.split(b"\n", 1)
+            etag = etag.decode()
+        else:
+            body = render() if render is not None else self._serialize(response_model, build())
+            etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+            self.backend.set(key, etag.encode() + b"\n" + body, self.ttl)
+
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = [value.strip() for value in request.headers.get("if-none-match", "").split(",")]
+        if etag in if_none_match or "*" in if_none_match:
+            return Response(status_code=304, headers=headers)
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def invalidate(self, *tags: Optional[str]) -> None:
+        for tag in tags:
+            if tag is not None:
+                self.backend.bump_version(tag)
+
+    def invalidate_on_commit(self, db: Session, *tags: Optional[str]) -> None:
+        """Invalidar cuando la transacción en curso haga commit (para cambios que aún no se confirman)"""
+        call_after_commit(db, "response_cache_invalidate", self.invalidate, *tags)
+
+
+# Tags de invalidación: globales por entidad, o por adulto mayor para los listados /elderly/{id}
+REMINDERS_TAG = "reminders"
+MEDICINES_TAG = "medicines"
+
+
+def medicines_tag(elderly_id: Optional[int]) -> Optional[str]:
+    return f"medicines:elderly:{elderly_id}" if elderly_id is not None else None
+
+
+def appointments_tag(elderly_id: Optional[int]) -> Optional[str]:
+    return f"appointments:elderly:{elderly_id}" if elderly_id is not None else None
+
+
+def family_relationships_tag(elderly_id: Optional[int]) -> Optional[str]:
+    return f"family-elderly-relationships:elderly:{elderly_id}" if elderly_id is not None else None
+
+
+# Cache compartido por los endpoints de lectura del dashboard
+response_cache = ResponseCache(
+    backend=_build_backend(),
+    ttl=float(os.getenv('RESPONSE_CACHE_TTL_SECONDS', '30'))
+)
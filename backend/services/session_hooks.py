@@ -0,0 +1,16 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from typing import Any, Callable
+
+
+def call_after_commit(db: Session, key: str, callback: Callable[..., None], *values: Any) -> None:
+    """
+    Acumular `values` (sin None) bajo `key` en la sesión y llamar callback(*valores) una sola vez,
+    cuando la transacción en curso haga commit (para invalidar caches por cambios que aún no se confirman).
+    """
+    pending = db.info.setdefault(key, set())
+    if not pending:
+        def _after_commit(session):
+            callback(*session.info.pop(key, set()))
+        event.listen(db, "after_commit", _after_commit, once=True)
+    pending.update(value for value in values if value is not None)
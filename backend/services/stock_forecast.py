@@ -0,0 +1,155 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, or_, func, literal
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Iterable
+from threading import Lock
+from bisect import bisect_right
+from models import Medicine, Reminder
+from dtos.medicines import MedicineStockForecastResponse
+from services.session_hooks import call_after_commit
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class StockForecastService:
+    """
+    Pronóstico de fecha de quiebre de stock por medicamento.
+    Se calcula para todos los medicamentos con una sola query agregada sobre los reminders activos,
+    se cachea por medicamento y se invalida cuando cambian el medicamento, sus reminders o hay una toma.
+    """
+
+    _lock = Lock()
+    _forecasts: Dict[int, MedicineStockForecastResponse] = {}
+    _dirty: set = set()
+    _loaded = False
+    # Índice ordenado por days_left para servir el listado de bajo stock sin recorrer todo
+    _sorted: List[MedicineStockForecastResponse] = []
+    _sorted_keys: List[float] = []
+
+    @staticmethod
+    def _forecast_query(db: Session, medicine_ids: Optional[Iterable[int]] = None):
+        """Consumo diario por medicamento: SUM(1440 / periodicity) sobre los reminders activos"""
+        doses_per_day = func.coalesce(func.sum(literal(1440.0) / Reminder.periodicity), 0)
+        query = (
+            db.query(
+                Medicine.id,
+                Medicine.name,
+                Medicine.tablets_left,
+                func.coalesce(Medicine.tablets_per_dose, 1).label("tablets_per_dose"),
+                doses_per_day.label("doses_per_day")
+            )
+            .outerjoin(
+                Reminder,
+                and_(
+                    Reminder.medicine == Medicine.id,
+                    Reminder.is_active.is_(True),
+                    Reminder.periodicity > 0,
+                    or_(Reminder.end_date.is_(None), Reminder.end_date >= func.current_date())
+                )
+            )
+            .group_by(Medicine.id, Medicine.name, Medicine.tablets_left, Medicine.tablets_per_dose)
+        )
+        if medicine_ids is not None:
+            query = query.filter(Medicine.id.in_(list(medicine_ids)))
+        return query
+
+    @staticmethod
+    def _build_forecast(row, now: datetime) -> MedicineStockForecastResponse:
+        doses_per_day = float(row.doses_per_day or 0)
+        days_left = None
+        runout_date = None
+        if row.tablets_left is not None and doses_per_day > 0:
+            days_left = row.tablets_left / (doses_per_day * row.tablets_per_dose)
+            runout_date = now + timedelta(days=days_left)
+        return MedicineStockForecastResponse(
+            medicine_id=row.id,
+            name=row.name,
+            tablets_left=row.tablets_left,
+            tablets_per_dose=row.tablets_per_dose,
+            doses_per_day=doses_per_day,
+            days_left=days_left,
+            runout_date=runout_date,
+            computed_at=now
+        )
+
+    @staticmethod
+    def _rebuild_index() -> None:
+        """Reordenar el índice por days_left (llamar con _lock tomado)"""
+        forecasts = sorted(
+            (f for f in StockForecastService._forecasts.values() if f.days_left is not None),
+            key=lambda f: f.days_left
+        )
+        StockForecastService._sorted = forecasts
+        StockForecastService._sorted_keys = [f.days_left for f in forecasts]
+
+    @staticmethod
+    def refresh(db: Session, medicine_ids: Optional[Iterable[int]] = None) -> int:
+        """Recalcular el pronóstico de todos los medicamentos (o solo de los indicados)"""
+        ids = set(medicine_ids) if medicine_ids is not None else None
+        # Sacar de _dirty lo que se va a recalcular antes de la query: lo que se invalide mientras
+        # corre vuelve a quedar marcado y se recalcula en la próxima lectura
+        with StockForecastService._lock:
+            if ids is None:
+                taken = set(StockForecastService._dirty)
+                StockForecastService._dirty.clear()
+            else:
+                taken = StockForecastService._dirty & ids
+                StockForecastService._dirty.difference_update(ids)
+
+        now = datetime.now()
+        try:
+            rows = StockForecastService._forecast_query(db, ids).all()
+        except Exception:
+            with StockForecastService._lock:
+                StockForecastService._dirty.update(taken)
+            raise
+
+        with StockForecastService._lock:
+            if ids is None:
+                StockForecastService._forecasts = {}
+                StockForecastService._loaded = True
+            else:
+                for medicine_id in ids:
+                    StockForecastService._forecasts.pop(medicine_id, None)
+            for row in rows:
+                StockForecastService._forecasts[row.id] = StockForecastService._build_forecast(row, now)
+            StockForecastService._rebuild_index()
+
+        return len(rows)
+
+    @staticmethod
+    def invalidate(*medicine_ids: Optional[int]) -> None:
+        """Marcar medicamentos para recalcular en la próxima lectura"""
+        with StockForecastService._lock:
+            StockForecastService._dirty.update(m for m in medicine_ids if m is not None)
+
+    @staticmethod
+    def invalidate_on_commit(db: Session, *medicine_ids: Optional[int]) -> None:
+        """Invalidar cuando la transacción en curso haga commit (para cambios que aún no se confirman)"""
+        call_after_commit(db, "stock_forecast_invalidate", StockForecastService.invalidate, *medicine_ids)
+
+    @staticmethod
+    def _ensure_fresh(db: Session) -> None:
+        # Copiar bajo el lock: el scheduler y los requests invalidan desde otros threads
+        with StockForecastService._lock:
+            loaded = StockForecastService._loaded
+            dirty = set(StockForecastService._dirty)
+        if not loaded:
+            StockForecastService.refresh(db)
+        elif dirty:
+            StockForecastService.refresh(db, dirty)
+
+    @staticmethod
+    def get_forecast(db: Session, medicine_id: int) -> Optional[MedicineStockForecastResponse]:
+        """Obtener el pronóstico de un medicamento desde el cache"""
+        StockForecastService._ensure_fresh(db)
+        return StockForecastService._forecasts.get(medicine_id)
+
+    @staticmethod
+    def get_low_stock(db: Session, days: float = 7) -> List[MedicineStockForecastResponse]:
+        """Medicamentos que se quedan sin stock dentro de `days` días, ordenados por urgencia"""
+        StockForecastService._ensure_fresh(db)
+        with StockForecastService._lock:
+            end = bisect_right(StockForecastService._sorted_keys, days)
+            return StockForecastService._sorted[:end]
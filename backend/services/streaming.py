@@ -0,0 +1,55 @@
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Iterator, List
+from pydantic import BaseModel
+from database import SessionLocal
+import csv
+import io
+
+# Filas por fetch del cursor del servidor
+STREAM_BATCH_SIZE = 500
+
+
+def _iter_rows(build_query: Callable[[Session], Any], batch_size: int) -> Iterator[Any]:
+    """
+    Recorre una query con un cursor del lado del servidor (yield_per).
+    Usa su propia sesión porque la de get_db se cierra antes de que termine de enviarse la respuesta.
+    """
+    db = SessionLocal()
+    try:
+        yield from build_query(db).yield_per(batch_size)
+    finally:
+        db.close()
+
+
+def stream_ndjson(
+    build_query: Callable[[Session], Any],
+    serialize: Callable[[Any], BaseModel],
+    batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[str]:
+    """Emite una línea JSON por fila de la query"""
+    for row in _iter_rows(build_query, batch_size):
+        yield serialize(row).model_dump_json() + "\n"
+
+
+def stream_csv(
+    build_query: Callable[[Session], Any],
+    serialize: Callable[[Any], BaseModel],
+    fields: List[str],
+    batch_size: int = STREAM_BATCH_SIZE
+) -> Iterator[str]:
+    """Emite un CSV con encabezado, un chunk por cada `batch_size` filas"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+
+    count = 0
+    for row in _iter_rows(build_query, batch_size):
+        data = serialize(row).model_dump(mode="json")
+        writer.writerow(["" if data[field] is None else data[field] for field in fields])
+        count += 1
+        if count % batch_size == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    yield buffer.getvalue()
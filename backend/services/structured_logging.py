@@ -0,0 +1,204 @@
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Iterator, Optional
+from services.metrics import registry
+import atexit
+import logging
+import orjson
+import os
+import queue
+import sys
+import uuid
+import zlib
+
+# "json" (una línea JSON por registro) o "text" (legible, para desarrollo local)
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').lower()
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+# Fracción de las líneas DEBUG que se escriben (las de INFO o más siempre se escriben)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv('LOG_DEBUG_SAMPLE_RATE', '0.1'))
+# Registros en espera de escribirse; si la cola se llena se descartan en vez de bloquear
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+# Ids de correlación que se agregan a cada registro: request_id, tick_id, reminder_instance_id, ...
+_context: ContextVar[Dict[str, Any]] = ContextVar("log_context", default={})
+
+# Campos que la stdlib pone en todo LogRecord; el resto viene de extra=... y va al JSON
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+# Ids que definen qué líneas DEBUG se muestrean juntas (toda la traza de una instancia o se escribe o no)
+_SAMPLE_KEYS = ("reminder_instance_id", "reminder_id", "webhook_event_id", "request_id", "tick_id")
+
+LOG_RECORDS_DROPPED = registry.counter(
+    "log_records_dropped",
+    "Registros de log descartados porque la cola estaba llena"
+)
+LOG_QUEUE_DEPTH = registry.gauge("log_queue_depth", "Registros de log en espera de escribirse")
+
+_listener: Optional[QueueListener] = None
+
+
+def current_context() -> Dict[str, Any]:
+    return _context.get()
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """Agregar ids de correlación a todos los registros emitidos dentro del bloque"""
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def with_tick(job: str):
+    """Decorador para jobs del scheduler: cada ejecución tiene su propio tick_id"""
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with log_context(job=job, tick_id=new_id()):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copia los ids de correlación al registro y muestrea las líneas DEBUG.
+    Corre en el thread que emite (antes de encolar), que es donde vive el ContextVar.
+    El muestreo es determinista por id, así una traza se escribe completa o no se escribe.
+    """
+
+    def __init__(self, sample_rate: float = LOG_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.sample_rate = sample_rate
+
+    def _sampled(self, record: logging.LogRecord) -> bool:
+        if self.sample_rate >= 1:
+            return True
+        if self.sample_rate <= 0:
+            return False
+        key = next((getattr(record, name) for name in _SAMPLE_KEYS if getattr(record, name, None) is not None), None)
+        if key is None:
+            key = f"{record.pathname}:{record.lineno}:{record.relativeCreated}"
+        return zlib.crc32(str(key).encode()) % 10000 < self.sample_rate * 10000
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for name, value in _context.get().items():
+            if not hasattr(record, name):
+                setattr(record, name, value)
+        return record.levelno > logging.DEBUG or self._sampled(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro, con los ids de correlación y los campos de extra=..."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage()
+        }
+        for name, value in vars(record).items():
+            if name not in _RECORD_FIELDS and not name.startswith("_"):
+                entry[name] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """QueueHandler que descarta (y cuenta) los registros si la cola está llena en vez de bloquear"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolver mensaje y traceback acá: args y exc_info no siempre se pueden pasar a otro thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+def configure_logging() -> None:
+    """
+    Configura el logger raíz: los registros se encolan en el thread que loguea
+    y un thread aparte los formatea y escribe en stdout (idempotente).
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    records: "queue.Queue[logging.LogRecord]" = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    LOG_QUEUE_DEPTH.set_function(lambda: {(): records.qsize()})
+
+    output = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "json":
+        output.setFormatter(JsonFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    handler = NonBlockingQueueHandler(records)
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(LOG_LEVEL)
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging() -> None:
+    """Escribe los registros pendientes y detiene el thread de escritura"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class RequestContextMiddleware:
+    """
+    Middleware ASGI que asigna un request_id a cada request (o usa el X-Request-ID entrante)
+    para correlacionar sus logs, y lo devuelve en el header X-Request-ID.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope.get("headers") or []).get(b"x-request-id", b"").decode("latin-1")
+        request_id = incoming[:64] or new_id()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)["X-Request-ID"] = request_id
+            await send(message)
+
+        with log_context(request_id=request_id):
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,247 @@
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import deque
+from threading import Lock
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from services.metrics import registry
+import logging
+import math
+import orjson
+import os
+import secrets
+import time
+
+logger = logging.getLogger(__name__)
+
+# "memory" (últimos spans en memoria), "file" (JSON lines en TRACING_FILE), "otel" (SDK de OpenTelemetry) o "none"
+TRACING_EXPORTER = os.getenv('TRACING_EXPORTER', 'memory').lower()
+TRACING_FILE = os.getenv('TRACING_FILE', 'traces.jsonl')
+TRACING_MEMORY_SPANS = int(os.getenv('TRACING_MEMORY_SPANS', '5000'))
+
+STAGE_LATENCY = registry.histogram(
+    "reminder_call_stage_seconds",
+    "Duración de cada etapa del envío de un recordatorio",
+    ("stage",)
+)
+
+
+class Span:
+    """
+    Span mínimo con los campos de OpenTelemetry (trace_id/span_id en hex, tiempos en ns desde epoch),
+    para trazar sin depender del SDK.
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.status = "UNSET"
+        self.events: List[Dict[str, Any]] = []
+        self.start_time = time.time_ns()
+        self.end_time: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException) -> None:
+        self.status = "ERROR"
+        self.events.append({
+            "name": "exception",
+            "time_unix_nano": time.time_ns(),
+            "attributes": {"exception.type": type(exception).__name__, "exception.message": str(exception)}
+        })
+
+    @property
+    def duration(self) -> float:
+        return ((self.end_time or time.time_ns()) - self.start_time) / 1e9
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_time,
+            "end_time_unix_nano": self.end_time,
+            "attributes": self.attributes,
+            "status": self.status,
+            "events": self.events
+        }
+
+
+class SpanExporter(ABC):
+    """Interfaz de exportación: recibe cada span al terminar"""
+
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        ...
+
+
+class InMemorySpanExporter(SpanExporter):
+    """Guarda los últimos `capacity` spans (para inspeccionar offline o desde scripts)"""
+
+    def __init__(self, capacity: int = 5000):
+        self._spans: Deque[Span] = deque(maxlen=capacity)
+        self._lock = Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self._spans.append(span)
+
+    def get_finished_spans(self) -> List[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """Agrega cada span como una línea JSON a un archivo"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = Lock()
+
+    def export(self, span: Span) -> None:
+        line = orjson.dumps(span.to_dict(), default=str) + b"\n"
+        with self._lock, open(self.path, "ab") as file:
+            file.write(line)
+
+
+class _OtelTracer:
+    """Delegar en el SDK de OpenTelemetry (opcional) cuando TRACING_EXPORTER=otel"""
+
+    def __init__(self):
+        from opentelemetry import trace
+
+        self._tracer = trace.get_tracer(__name__)
+
+    @contextmanager
+    def start_as_current_span(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        with self._tracer.start_as_current_span(name, attributes=attributes) as span:
+            yield span
+
+
+class Tracer:
+    """Tracer en proceso con la misma forma de uso que el de OpenTelemetry (start_as_current_span)"""
+
+    def __init__(self, exporter: Optional[SpanExporter]):
+        self.exporter = exporter
+        self._current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+    @contextmanager
+    def start_as_current_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Span]:
+        parent = self._current.get()
+        span = Span(name, parent.trace_id if parent else secrets.token_hex(16), parent.span_id if parent else None, attributes)
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            self._current.reset(token)
+            span.end_time = time.time_ns()
+            if span.status == "UNSET":
+                span.status = "OK"
+            if self.exporter is not None:
+                self.exporter.export(span)
+
+
+def _build_tracer():
+    if TRACING_EXPORTER == "otel":
+        try:
+            return _OtelTracer()
+        except ImportError:
+            logger.warning("TRACING_EXPORTER=otel pero opentelemetry no está instalado; usando el exporter en memoria")
+    if TRACING_EXPORTER == "file":
+        return Tracer(FileSpanExporter(TRACING_FILE))
+    if TRACING_EXPORTER == "none":
+        return Tracer(None)
+    return Tracer(InMemorySpanExporter(TRACING_MEMORY_SPANS))
+
+
+tracer = _build_tracer()
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Percentil por rango más cercano (0 si no hay valores)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class TickStages:
+    """Duraciones por etapa dentro de un tick del scheduler, para reportar p50/p95"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.durations: Dict[str, List[float]] = {}
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.durations.setdefault(stage, []).append(seconds)
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        """{etapa: {count, p50_ms, p95_ms, total_ms}}"""
+        return {
+            stage: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 0.5) * 1000, 2),
+                "p95_ms": round(percentile(values, 0.95) * 1000, 2),
+                "total_ms": round(sum(values) * 1000, 2)
+            }
+            for stage, values in self.durations.items()
+        }
+
+
+_tick: ContextVar[Optional[TickStages]] = ContextVar("tick_stages", default=None)
+
+
+@contextmanager
+def stage(name: str, **attributes: Any) -> Iterator[Any]:
+    """
+    Span de una etapa: se exporta con el tracer configurado, se observa en
+    reminder_call_stage_seconds y se suma al reporte del tick en curso.
+    """
+    start = time.perf_counter()
+    try:
+        with tracer.start_as_current_span(name, attributes=attributes) as span:
+            yield span
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_LATENCY.observe(elapsed, stage=name)
+        tick = _tick.get()
+        if tick is not None:
+            tick.add(name, elapsed)
+
+
+@contextmanager
+def trace_tick(name: str) -> Iterator[TickStages]:
+    """Span raíz de un tick; al terminar loguea p50/p95 por etapa"""
+    tick = TickStages(name)
+    token = _tick.set(tick)
+    try:
+        with stage(name):
+            yield tick
+    finally:
+        _tick.reset(token)
+        report = tick.report()
+        if len(report) > 1:
+            logger.info(f"Etapas de {name}", extra={"stages": report})
+
+
+def stage_summary(spans: List[Span]) -> Dict[str, Tuple[int, float, float]]:
+    """(cantidad, p50, p95) en segundos por nombre de span, p. ej. sobre InMemorySpanExporter.get_finished_spans()"""
+    durations: Dict[str, List[float]] = {}
+    for span in spans:
+        durations.setdefault(span.name, []).append(span.duration)
+    return {
+        name: (len(values), percentile(values, 0.5), percentile(values, 0.95))
+        for name, values in durations.items()
+    }
@@ -1,22 +1,11 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from passlib.context import CryptContext
-from typing import List, Optional
+from typing import List, Optional, Tuple
 from models import User
 from dtos.users import UserCreate, UserUpdate
-
-# Configurar el contexto de hashing de contraseñas
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
-def hash_password(password: str) -> str:
-    """Hashear una contraseña"""
-    return pwd_context.hash(password)
-
-
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verificar una contraseña"""
-    return pwd_context.verify(plain_password, hashed_password)
+from services.pagination import keyset_paginate, DEFAULT_PAGE_SIZE
+from services.passwords import hash_password_async, verify_and_update_password
+from services.principals import principal_cache
 
 
 class UserService:
@@ -25,6 +14,13 @@ class UserService:
         """Obtener todos los usuarios con paginación"""
         return db.query(User).offset(skip).limit(limit).all()
 
+    @staticmethod
+    def get_page(
+        db: Session, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_SIZE
+    ) -> Tuple[List[User], Optional[str]]:
+        """Obtener usuarios paginados por cursor (id)"""
+        return keyset_paginate(db.query(User), [User.id], cursor=cursor, limit=limit)
+
     @staticmethod
     def get_by_id(db: Session, user_id: int) -> Optional[User]:
         """Obtener un usuario por su ID"""
@@ -36,10 +32,10 @@ class UserService:
         return db.query(User).filter(User.email == email).first()
 
     @staticmethod
-    def create(db: Session, user_data: UserCreate) -> User:
+    async def create(db: Session, user_data: UserCreate) -> User:
         """Crear un nuevo usuario"""
-        # Hashear la contraseña antes de guardarla
-        hashed_password = hash_password(user_data.password)
+        # Hashear la contraseña antes de guardarla (en el pool de bcrypt, fuera del event loop)
+        hashed_password = await hash_password_async(user_data.password)
         
         user_dict = user_data.model_dump()
         user_dict['password'] = hashed_password
@@ -61,7 +57,7 @@ class UserService:
             raise ValueError(f"Error inesperado al crear el usuario: {str(e)}")
 
     @staticmethod
-    def update(
+    async def update(
         db: Session, user_id: int, user_data: UserUpdate
     ) -> Optional[User]:
         """Actualizar un usuario existente"""
@@ -73,7 +69,7 @@ class UserService:
         
         # Si se está actualizando la contraseña, hashearla
         if 'password' in update_data and update_data['password']:
-            update_data['password'] = hash_password(update_data['password'])
+            update_data['password'] = await hash_password_async(update_data['password'])
         
         for field, value in update_data.items():
             setattr(user, field, value)
@@ -81,6 +77,7 @@ class UserService:
         try:
             db.commit()
             db.refresh(user)
+            principal_cache.invalidate(user_id)
             return user
         except IntegrityError as e:
             db.rollback()
@@ -101,17 +98,26 @@ class UserService:
 
         db.delete(user)
         db.commit()
+        principal_cache.invalidate(user_id)
         return True
 
     @staticmethod
-    def authenticate(db: Session, email: str, password: str) -> Optional[User]:
-        """Autenticar un usuario con email y contraseña"""
+    async def authenticate(db: Session, email: str, password: str) -> Optional[User]:
+        """
+        Autenticar un usuario con email y contraseña.
+        Si el hash guardado usa un costo de bcrypt distinto al configurado, se reemplaza por uno nuevo.
+        """
         user = UserService.get_by_email(db, email)
         if not user:
             return None
         
-        if not verify_password(password, user.password):
+        valid, new_hash = await verify_and_update_password(password, user.password)
+        if not valid:
             return None
         
+        if new_hash:
+            user.password = new_hash
+            db.commit()
+        
         return user
 
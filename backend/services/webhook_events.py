@@ -0,0 +1,270 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from datetime import datetime
+from typing import Dict, Optional, Any, Set
+from models import WebhookEvent, NotificationLog
+from services.message_correlations import MessageCorrelationService
+from services.idempotency import webhook_idempotency
+from services.medicines import MedicineService
+from services.structured_logging import log_context
+from services.delivery_metrics import observe_reply
+from enums import ReminderInstanceStatus, WebhookEventStatus
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Reintentos antes de dejar un evento en "failed"
+MAX_ATTEMPTS = 5
+
+
+class WebhookEventService:
+    @staticmethod
+    def whatsapp_event_key(body: Dict[str, Any]) -> str:
+        """Llave de idempotencia de Kapso: id del mensaje entrante (wamid), o hash del body si no viene"""
+        message_id = body.get("message", {}).get("id")
+        if message_id:
+            return str(message_id)
+        return hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()
+
+    @staticmethod
+    def telegram_event_key(body: Dict[str, Any]) -> str:
+        """Llave de idempotencia de Telegram: update_id (o el id del callback_query)"""
+        if "update_id" in body:
+            return str(body["update_id"])
+        return f"cb:{body['callback_query']['id']}"
+
+    @staticmethod
+    def enqueue(db: Session, provider: str, event_key: str, body: Dict[str, Any]) -> Optional[WebhookEvent]:
+        """
+        Guarda el evento crudo en el inbox durable.
+        Retorna None si el evento ya estaba encolado (reintento del proveedor).
+        Los duplicados recientes se descartan desde el LRU sin tocar la BD.
+        """
+        if webhook_idempotency.seen(provider, event_key):
+            logger.info(f"Evento duplicado ignorado (cache): {provider}/{event_key}")
+            return None
+
+        event = WebhookEvent(
+            provider=provider,
+            event_key=event_key,
+            payload=json.dumps(body),
+            status=WebhookEventStatus.PENDING.value,
+            attempts=0
+        )
+        db.add(event)
+        try:
+            db.commit()
+            webhook_idempotency.mark(provider, event_key)
+            return event
+        except IntegrityError:
+            db.rollback()
+            webhook_idempotency.mark(provider, event_key)
+            logger.info(f"Evento duplicado ignorado: {provider}/{event_key}")
+            return None
+
+    @staticmethod
+    def claim_batch(db: Session, batch_size: int = 50, exclude_ids: Optional[Set[int]] = None):
+        """
+        Toma un lote de eventos pendientes, saltando los que otro consumidor ya tiene bloqueados
+        y los de `exclude_ids` (los que ya fallaron en esta corrida).
+        """
+        query = db.query(WebhookEvent).filter(WebhookEvent.status == WebhookEventStatus.PENDING.value)
+        if exclude_ids:
+            query = query.filter(WebhookEvent.id.notin_(exclude_ids))
+        return (
+            query
+            .order_by(WebhookEvent.id.asc())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+
+    @staticmethod
+    def process_batch(db: Session, batch_size: int = 50, failed_ids: Optional[Set[int]] = None) -> Dict:
+        """
+        Aplica las transiciones de estado de un lote de eventos en una sola transacción.
+        Cada evento corre en su propio savepoint para que un error no aborte el lote.
+        Los eventos que fallan se agregan a `failed_ids` y no se vuelven a tomar con ese mismo
+        conjunto: el reintento queda para la próxima corrida del job, no en seguida.
+        """
+        results = {
+            "processed": 0,
+            "ignored": 0,
+            "failed": 0
+        }
+
+        events = WebhookEventService.claim_batch(db, batch_size, exclude_ids=failed_ids)
+        for event in events:
+            with log_context(webhook_event_id=event.id, provider=event.provider):
+                WebhookEventService._process_event(db, event, results)
+            if failed_ids is not None and event.status == WebhookEventStatus.PENDING.value:
+                failed_ids.add(event.id)
+
+        if events:
+            db.commit()
+            logger.info(
+                f"Inbox de webhooks: {results['processed']} procesados, "
+                f"{results['ignored']} ignorados, {results['failed']} fallidos"
+            )
+        return results
+
+    @staticmethod
+    def _process_event(db: Session, event: WebhookEvent, results: Dict) -> None:
+        """Aplicar un evento en su propio savepoint y anotar el resultado en `results`"""
+        event.attempts = (event.attempts or 0) + 1
+        received_at = event.received_at or datetime.now()
+        try:
+            with db.begin_nested():
+                body = json.loads(event.payload)
+                if event.provider == "whatsapp":
+                    error = WebhookEventService._apply_whatsapp(db, body, received_at)
+                elif event.provider == "telegram":
+                    error = WebhookEventService._apply_telegram(db, body, received_at)
+                else:
+                    error = f"Proveedor desconocido: {event.provider}"
+            if error:
+                event.status = WebhookEventStatus.IGNORED.value
+                event.error_message = error
+                results["ignored"] += 1
+            else:
+                event.status = WebhookEventStatus.PROCESSED.value
+                results["processed"] += 1
+            event.processed_at = datetime.now()
+        except Exception as e:
+            logger.error(f"Error procesando webhook_event {event.id}: {str(e)}", exc_info=True)
+            event.error_message = str(e)
+            if event.attempts >= MAX_ATTEMPTS:
+                event.status = WebhookEventStatus.FAILED.value
+            results["failed"] += 1
+
+    @staticmethod
+    def _apply_whatsapp(db: Session, body: Dict[str, Any], received_at: Optional[datetime] = None) -> Optional[str]:
+        """Aplica una respuesta de botón de Kapso. Retorna un motivo si el evento no aplica."""
+        message = body.get("message", {})
+        phone_number = message.get("from") or body.get("conversation", {}).get("phone_number")
+        message_id = message.get("context", {}).get("id")
+
+        button_id = None
+        button_title = None
+        user_response = None
+        interactive = message.get("interactive", {})
+        if interactive.get("type") == "button_reply" and "button_reply" in interactive:
+            button_reply = interactive["button_reply"]
+            button_id = button_reply.get("id")
+            button_title = button_reply.get("title")
+            user_response = f"{button_id}: {button_title}" if button_id and button_title else button_id or button_title
+
+        # Resolver instancia, reminder y medicina en una sola query indexada
+        resolved = MessageCorrelationService.resolve(db, "whatsapp", message_id)
+        if not resolved:
+            return f"No se encontró reminder_instance para el message_id {message_id}"
+
+        reminder_instance, reminder, medicine, notification_log = resolved
+        # Solo la primera respuesta: las siguientes encuentran el log de la respuesta anterior (ya entregado)
+        if notification_log and notification_log.delivered_at is None:
+            observe_reply("whatsapp", notification_log.sent_at, received_at or datetime.now())
+
+        # "taken" o "btn_yes" o "Si" = respuesta positiva
+        # "skip" o "btn_no" o "No" = respuesta negativa
+        is_positive_response = bool(
+            button_id in ["taken", "btn_yes"] or
+            button_title and button_title.lower() in ["sí", "si", "yes", "ya lo tomé"]
+        )
+        log_status = "sent" if is_positive_response else "rejected"
+        instance_status = ReminderInstanceStatus.SUCCESS.value if is_positive_response else ReminderInstanceStatus.REJECTED.value
+
+        # Una segunda confirmación de la misma instancia no debe volver a descontar stock
+        already_taken = reminder_instance.status == ReminderInstanceStatus.SUCCESS.value and reminder_instance.taken_at is not None
+
+        now = datetime.now()
+        db.add(NotificationLog(
+            reminder_instance_id=reminder_instance.id,
+            notification_type="whatsapp",
+            recepient_phone=phone_number,
+            status=log_status,
+            sent_at=now,
+            delivered_at=now,
+            response=user_response or f"Respuesta recibida: {button_id or button_title}"
+        ))
+
+        if already_taken:
+            logger.info(f"Reminder instance {reminder_instance.id} ya estaba confirmada, no se descuenta stock")
+            db.flush()
+            return None
+
+        reminder_instance.status = instance_status
+        if is_positive_response:
+            reminder_instance.taken_at = now
+            # Si la respuesta fue positiva, descontar una dosis de forma atómica
+            if medicine:
+                tablets_left = MedicineService.consume_dose(db, medicine.id, reminder_instance.id)
+                if tablets_left is None:
+                    logger.info(f"Medicina {medicine.id} ({medicine.name}): stock insuficiente, no se puede restar")
+            else:
+                logger.info(f"Reminder {reminder.id} no tiene medicine asociada")
+
+        db.flush()
+        logger.info(f"Reminder instance {reminder_instance.id} actualizado a {instance_status}. Respuesta: {user_response}")
+        return None
+
+    @staticmethod
+    def _apply_telegram(db: Session, body: Dict[str, Any], received_at: Optional[datetime] = None) -> Optional[str]:
+        """Aplica un callback_query de Telegram. Retorna un motivo si el evento no aplica."""
+        callback_query = body.get("callback_query") or {}
+        message = callback_query.get("message") or {}
+        if "message_id" not in message:
+            return "callback_query sin message.message_id"
+        chat_id = (callback_query.get("from") or {}).get("id")
+        message_chat_id = (message.get("chat") or {}).get("id", chat_id)
+        if message_chat_id is None:
+            return "callback_query sin chat ni from.id"
+        callback_data = callback_query.get("data")
+        message_id = str(message["message_id"])
+        message_chat_id = str(message_chat_id)
+
+        resolved = MessageCorrelationService.resolve(
+            db,
+            "telegram",
+            MessageCorrelationService.telegram_key(message_chat_id, message_id),
+            legacy_message_id=message_id
+        )
+        if not resolved:
+            return f"No se encontró reminder_instance para el message_id {message_id}"
+
+        reminder_instance, _, _, notification_log = resolved
+
+        # Determinar el estado según el callback_data
+        if callback_data == "taken":
+            instance_status = ReminderInstanceStatus.SUCCESS.value
+            user_response = "taken: Ya lo tomé"
+        elif callback_data == "skip":
+            instance_status = ReminderInstanceStatus.REJECTED.value
+            user_response = "skip: Omitir"
+        elif callback_data == "confirm":
+            instance_status = ReminderInstanceStatus.SUCCESS.value
+            user_response = "confirm: Confirmado"
+        elif callback_data == "cancel":
+            instance_status = ReminderInstanceStatus.REJECTED.value
+            user_response = "cancel: Cancelado"
+        else:
+            instance_status = ReminderInstanceStatus.SUCCESS.value
+            user_response = f"{callback_data}: Respuesta recibida"
+
+        now = datetime.now()
+        if notification_log:
+            if notification_log.delivered_at is None:
+                observe_reply("telegram", notification_log.sent_at, received_at or now)
+            notification_log.response = user_response
+            notification_log.delivered_at = now
+            notification_log.status = "delivered"
+        else:
+            logger.warning(f"No se encontró notification_log para reminder_instance_id {reminder_instance.id}")
+
+        reminder_instance.status = instance_status
+        reminder_instance.taken_at = now if callback_data == "taken" else None
+
+        db.flush()
+        logger.info(f"Reminder instance {reminder_instance.id} actualizado a {instance_status}. Respuesta: {user_response}")
+        return None
@@ -0,0 +1,47 @@
+"""Filas mínimas para los tests (los ids de usuario, perfil y medicina coinciden, como en la app)"""
+from datetime import datetime
+from models import User, ElderlyProfile, HealthWorker, Medicine, Appointment, Reminder, ReminderInstance
+
+
+def elderly(db, elderly_id: int, with_medicine: bool = True) -> ElderlyProfile:
+    db.add(User(id=elderly_id, email=f"elderly{elderly_id}@test.local", password="x", full_name=f"Persona {elderly_id}", role="elderly"))
+    db.flush()
+    profile = ElderlyProfile(id=elderly_id, emergency_contact=f"+569{elderly_id:08d}")
+    db.add(profile)
+    if with_medicine:
+        db.add(Medicine(id=elderly_id, name=f"Medicina {elderly_id}", tablets_left=30, tablets_per_dose=1))
+    db.flush()
+    return profile
+
+
+def health_worker(db, user_id: int) -> HealthWorker:
+    db.add(User(id=user_id, email=f"worker{user_id}@test.local", password="x", full_name=f"Doctor {user_id}", role="health_worker"))
+    db.flush()
+    row = HealthWorker(id=user_id)
+    db.add(row)
+    db.flush()
+    return row
+
+
+def appointment(db, elderly_id: int, health_worker_id: int) -> Appointment:
+    row = Appointment(elderly_id=elderly_id, health_worker_id=health_worker_id, scheduled_datetime=datetime.now(), address="Consultorio")
+    db.add(row)
+    db.flush()
+    return row
+
+
+def reminder(db, **fields) -> Reminder:
+    fields.setdefault("reminder_type", "medicine")
+    fields.setdefault("periodicity", 60)
+    fields.setdefault("start_date", datetime.now())
+    row = Reminder(**fields)
+    db.add(row)
+    db.flush()
+    return row
+
+
+def instance(db, reminder_row: Reminder, scheduled_datetime: datetime, **fields) -> ReminderInstance:
+    row = ReminderInstance(reminder_id=reminder_row.id, scheduled_datetime=scheduled_datetime, **fields)
+    db.add(row)
+    db.flush()
+    return row
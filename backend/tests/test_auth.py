@@ -0,0 +1,37 @@
+from types import SimpleNamespace
+import pytest
+from services.auth import AuthService, get_jwt_secret
+
+
+@pytest.fixture(autouse=True)
+def _reset_secret(monkeypatch):
+    monkeypatch.delenv("JWT_SECRET_KEY", raising=False)
+    monkeypatch.delenv("APP_ENV", raising=False)
+    get_jwt_secret.cache_clear()
+    yield
+    get_jwt_secret.cache_clear()
+
+
+def test_missing_secret_fails_outside_development():
+    with pytest.raises(RuntimeError, match="JWT_SECRET_KEY"):
+        get_jwt_secret()
+
+
+def test_missing_secret_uses_random_secret_in_development(monkeypatch, caplog):
+    monkeypatch.setenv("APP_ENV", "development")
+
+    assert get_jwt_secret() == get_jwt_secret()
+    assert "JWT_SECRET_KEY no está configurado" in caplog.text
+
+
+def test_secret_is_read_on_first_use(monkeypatch):
+    monkeypatch.setenv("JWT_SECRET_KEY", "secreto-de-prueba")
+    user = SimpleNamespace(
+        id=7, email="ana@test.local", full_name="Ana", role="family", phone=None,
+        created_at=None, updated_at=None
+    )
+
+    token = AuthService.create_access_token(user).access_token
+
+    assert get_jwt_secret() == "secreto-de-prueba"
+    assert AuthService.decode_access_token(token).id == 7
@@ -0,0 +1,90 @@
+"""
+Los escenarios de benchmarks/ como tests: cada uno corre una vez sobre el dataset sintético y falla
+si ejecuta más queries SQL (o más sentencias repetidas N+1) que su presupuesto. El tiempo no se
+compara aquí (eso es `python -m benchmarks.run --compare`); las queries no dependen de la máquina.
+
+Las queries crecen con la cantidad de recordatorios, así que los presupuestos valen para BENCH_SCALE.
+Si un cambio las baja a propósito, actualizar el presupuesto con lo que reporta el test.
+
+    python -m pytest -m benchmark
+"""
+from datetime import date, timedelta
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from database import Base
+from services.adherence import AdherenceService
+from services.query_metrics import install as install_query_metrics
+from services.reminder_rollups import ReminderRollupService
+from benchmarks import bench_listings, bench_scheduler, bench_webhooks, dataset, harness
+import services.reminder_scheduler as reminder_scheduler
+
+BENCH_SCALE = 1000
+BENCHMARKS = bench_scheduler.BENCHMARKS + bench_listings.BENCHMARKS + bench_webhooks.BENCHMARKS
+# (queries, sentencias N+1) por ronda a BENCH_SCALE
+QUERY_BUDGETS = {
+    "scheduler.get_reminders_to_process": (23, 1),
+    "scheduler.process_pending_reminders": (74, 2),
+    "reminders.regenerate_future_instances": (33, 1),
+    "reminders.regenerate_future_instances_bulk[100]": (603, 1),
+    "reminders.get_all_with_medicine[100]": (1, 0),
+    "reminders.get_all_with_medicine_rows[100]": (1, 0),
+    "instances.get_all_with_medicine[100]": (2, 0),
+    "instances.get_today_with_medicine": (2, 0),
+    "instances.get_today_with_medicine_rows": (2, 0),
+    "instances.get_by_month_with_medicine": (2, 0),
+    "instances.get_by_month_with_medicine_rows": (2, 0),
+    "instances.get_by_reminder_id_with_medicine": (2, 0),
+    "webhooks.enqueue[50]": (50, 1),
+    "webhooks.process_batch[50]": (383, 9),
+}
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def bench_db(tmp_path_factory):
+    """Como benchmarks/run.py: BD SQLite sembrada, métricas de queries, rollups y proveedores en proceso"""
+    install_query_metrics()
+    ReminderRollupService.install()
+    engine = create_engine(f"sqlite:///{tmp_path_factory.mktemp('bench')}/bench.db")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    with pytest.MonkeyPatch.context() as patch:
+        # Registrar los originales para que se restauren al terminar el módulo
+        for name in ("send_whatsapp_message", "generate_content"):
+            patch.setattr(reminder_scheduler, name, getattr(reminder_scheduler, name))
+        bench_scheduler.use_offline_providers()
+        dataset.seed(db, BENCH_SCALE)
+        yield db
+    db.close()
+    engine.dispose()
+
+
+def test_every_benchmark_has_a_budget():
+    assert sorted(QUERY_BUDGETS) == sorted(benchmark.name for benchmark in BENCHMARKS)
+
+
+@pytest.mark.parametrize("benchmark", BENCHMARKS, ids=[benchmark.name for benchmark in BENCHMARKS])
+def test_query_budget(bench_db, benchmark):
+    result = harness.run_benchmark(bench_db, benchmark, BENCH_SCALE, rounds=1, warmup=1)
+    max_queries, max_n_plus_one = QUERY_BUDGETS[benchmark.name]
+
+    assert result.queries <= max_queries, f"{benchmark.name}: {result.queries} queries (presupuesto {max_queries})"
+    assert result.n_plus_one <= max_n_plus_one, f"{benchmark.name}: {result.n_plus_one} sentencias N+1 (presupuesto {max_n_plus_one})"
+
+
+def test_rollups_still_match_the_instances(bench_db):
+    """Después de todos los escenarios (y sus teardowns) los rollups deben seguir cuadrando con las instancias"""
+    def by_key(rows):
+        return {(row.reminder_id, row.day, row.status): row for row in rows if row.count}
+
+    start, end = date.today() - timedelta(days=40), date.today() + timedelta(days=40)
+    expected = by_key(AdherenceService.aggregate_raw(bench_db, start, end))
+    actual = by_key(AdherenceService.get_rows(bench_db, start, end))
+
+    assert actual.keys() == expected.keys()
+    for key, row in expected.items():
+        assert actual[key]._replace(latency_seconds_sum=0) == row._replace(latency_seconds_sum=0)
+        # SQLite agrega la latencia en segundos enteros; el listener la suma con microsegundos
+        assert actual[key].latency_seconds_sum == pytest.approx(row.latency_seconds_sum, abs=row.latency_count)
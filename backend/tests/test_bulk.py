@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+import pytest
+from dtos.bulk import BulkItemError
+from dtos.users import UserCreate
+from models import User, Reminder, ReminderInstance
+from services.appointments import AppointmentService
+from services.bulk import MAX_BULK_ITEMS, write_rows
+from services.reminders import ReminderService
+from tests import factories
+
+
+def _reminder_item(**fields):
+    item = {"reminder_type": "medicine", "periodicity": 720, "start_date": (datetime.now() + timedelta(hours=1)).isoformat()}
+    item.update(fields)
+    return item
+
+
+def _future_instances(db, reminder_id: int):
+    return (
+        db.query(ReminderInstance.scheduled_datetime)
+        .filter(ReminderInstance.reminder_id == reminder_id, ReminderInstance.scheduled_datetime > datetime.now())
+        .order_by(ReminderInstance.scheduled_datetime)
+        .all()
+    )
+
+
+@pytest.fixture
+def elderly(db):
+    factories.elderly(db, 1)
+    factories.elderly(db, 2)
+    db.commit()
+
+
+def test_bulk_create_reports_errors_by_index_and_keeps_input_order(db, elderly):
+    items = [
+        _reminder_item(medicine=2),
+        {"reminder_type": "medicine"},  # sin start_date
+        _reminder_item(medicine=99),  # FK a una medicina que no existe
+        _reminder_item(elderly_profile_id=1, reminder_type="other"),
+    ]
+
+    reminders, errors = ReminderService.bulk_create(db, items)
+
+    assert [(reminder.medicine, reminder.elderly_profile_id) for reminder in reminders] == [(2, None), (None, 1)]
+    assert [error.index for error in errors] == [1, 2]
+    assert "start_date" in errors[0].error
+    assert errors[1].error == "Error: Medicine con ID 99 no existe"
+    assert db.query(Reminder).count() == 2
+    assert all(_future_instances(db, reminder.id) for reminder in reminders)
+
+
+def test_bulk_update_rejects_duplicate_and_unknown_ids(db, elderly):
+    first = factories.reminder(db, medicine=1, periodicity=720)
+    second = factories.reminder(db, medicine=2, periodicity=720)
+    third = factories.reminder(db, medicine=1, periodicity=720)
+    db.commit()
+
+    reminders, errors = ReminderService.bulk_update(db, [
+        {"id": second.id, "is_active": False},
+        {"id": first.id, "medicine": 2},
+        {"id": second.id, "is_active": True},
+        {"id": 999, "is_active": False},
+        {"id": third.id, "elderly_profile_id": 42},
+    ])
+
+    assert [reminder.id for reminder in reminders] == [second.id, first.id]
+    assert [(error.index, error.id) for error in errors] == [(2, second.id), (3, 999), (4, third.id)]
+    assert "más de una vez" in errors[0].error
+    assert "no encontrado" in errors[1].error
+    assert "ElderlyProfile con ID 42" in errors[2].error
+    assert db.get(Reminder, second.id).is_active is False
+    assert db.get(Reminder, first.id).medicine == 2
+
+
+def test_bulk_update_regenerates_future_instances_only_when_the_schedule_changes(db, elderly):
+    start = datetime.now().replace(microsecond=0) + timedelta(hours=1)
+    rescheduled = factories.reminder(db, medicine=1, periodicity=720, start_date=start)
+    untouched = factories.reminder(db, medicine=2, periodicity=720, start_date=start)
+    ReminderService.regenerate_future_instances_bulk(db, [rescheduled, untouched])
+    db.commit()
+    before = _future_instances(db, untouched.id)
+
+    ReminderService.bulk_update(db, [
+        {"id": rescheduled.id, "periodicity": 60},
+        {"id": untouched.id, "medicine": 1},
+    ])
+
+    times = [scheduled for (scheduled,) in _future_instances(db, rescheduled.id)]
+    assert times[1] - times[0] == timedelta(minutes=60)
+    assert _future_instances(db, untouched.id) == before
+
+
+def test_bulk_operations_are_capped(db):
+    with pytest.raises(ValueError, match=str(MAX_BULK_ITEMS)):
+        ReminderService.bulk_create(db, [{}] * (MAX_BULK_ITEMS + 1))
+
+    reminders, errors = ReminderService.bulk_create(db, [{}] * MAX_BULK_ITEMS)
+    assert reminders == []
+    assert len(errors) == MAX_BULK_ITEMS
+
+
+def test_appointments_bulk_create_and_update(db, elderly):
+    worker = factories.health_worker(db, 100)
+    existing = factories.appointment(db, 1, worker.id)
+    db.commit()
+    when = (datetime.now() + timedelta(days=2)).isoformat()
+
+    created, create_errors = AppointmentService.bulk_create(db, [
+        {"scheduled_datetime": when, "address": "Consultorio", "elderly_id": 2, "health_worker_id": worker.id},
+        {"scheduled_datetime": when, "address": "Consultorio", "elderly_id": 2, "health_worker_id": 555},
+        {"scheduled_datetime": when, "address": "Hospital", "elderly_id": 1, "health_worker_id": worker.id},
+    ])
+    updated, update_errors = AppointmentService.bulk_update(db, [
+        {"id": existing.id, "elderly_id": 2},
+        {"id": existing.id, "status": "done"},
+        {"id": existing.id + 100, "status": "done"},
+    ])
+
+    assert [appointment.address for appointment in created] == ["Consultorio", "Hospital"]
+    assert [(error.index, error.error) for error in create_errors] == [(1, "Error: HealthWorker con ID 555 no existe")]
+    assert [appointment.elderly_id for appointment in updated] == [2]
+    assert [error.index for error in update_errors] == [1, 2]
+
+
+def test_write_rows_falls_back_row_by_row_when_the_batch_fails(db):
+    rows = [
+        (0, UserCreate(email="ana@example.com", password="x", full_name="Ana", role="family")),
+        (1, UserCreate(email="ana@example.com", password="x", full_name="Otra Ana", role="family")),
+        (2, UserCreate(email="luis@example.com", password="x", full_name="Luis", role="family")),
+    ]
+    errors = []
+
+    def write(batch):
+        return list(db.scalars(insert(User).returning(User, sort_by_parameter_order=True), [row.model_dump() for row in batch]))
+
+    written = write_rows(db, rows, write, errors)
+    db.commit()
+
+    assert [(index, user.full_name) for index, user in written] == [(0, "Ana"), (2, "Luis")]
+    assert [error.index for error in errors] == [1]
+    assert isinstance(errors[0], BulkItemError) and "UNIQUE" in errors[0].error
+    assert db.query(User).count() == 2
@@ -0,0 +1,23 @@
+from datetime import datetime
+from services.reminders import ReminderService
+from services.reminder_instances import ReminderInstanceService
+from tests import factories
+
+
+def test_overview_sections_include_appointment_reminders(db):
+    factories.elderly(db, 1)
+    factories.elderly(db, 2)
+    worker = factories.health_worker(db, 100)
+    direct = factories.reminder(db, elderly_profile_id=1)
+    by_medicine = factories.reminder(db, medicine=1)
+    by_appointment = factories.reminder(db, reminder_type="appointment", appointment_id=factories.appointment(db, 1, worker.id).id)
+    other = factories.reminder(db, elderly_profile_id=2, medicine=2)
+    for reminder in (direct, by_medicine, by_appointment, other):
+        factories.instance(db, reminder, datetime.now().replace(hour=12, minute=0, second=0, microsecond=0))
+    db.commit()
+
+    reminders = ReminderService.get_by_elderly_id_with_medicine(db, 1)
+    today = ReminderInstanceService.get_today_with_medicine_rows(db, elderly_profile_id=1)
+
+    assert [reminder.id for reminder in reminders] == [direct.id, by_medicine.id, by_appointment.id]
+    assert {row["reminder_id"] for row in today} == {direct.id, by_medicine.id, by_appointment.id}
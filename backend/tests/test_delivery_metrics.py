@@ -0,0 +1,68 @@
+from datetime import datetime, timedelta
+import asyncio
+import pytest
+from services.delivery_metrics import (
+    DISPATCH_LAG, OLDEST_PENDING_AGE, PENDING_BACKLOG, REPLY_LATENCY,
+    observe_backlog, observe_dispatch, observe_reply
+)
+from services.reminder_call_service import ReminderCallService
+from tests import factories
+
+
+def _histogram(histogram, channel: str):
+    """(cantidad, suma) observadas para un canal"""
+    samples = {name: value for name, _, labels, value in histogram.samples() if labels == (channel,)}
+    return samples.get(f"{histogram.name}_count", 0), samples.get(f"{histogram.name}_sum", 0.0)
+
+
+def test_backlog_depth_and_age():
+    now = datetime(2025, 5, 1, 12, 0)
+    observe_backlog("test-backlog", [now - timedelta(minutes=5), None, now - timedelta(minutes=30)], now)
+
+    assert PENDING_BACKLOG.get(channel="test-backlog") == 2
+    assert OLDEST_PENDING_AGE.get(channel="test-backlog") == 1800
+
+    observe_backlog("test-backlog", iter([]), now)
+    assert PENDING_BACKLOG.get(channel="test-backlog") == 0
+    assert OLDEST_PENDING_AGE.get(channel="test-backlog") == 0
+
+
+def test_clock_skew_is_clamped_to_zero():
+    now = datetime(2025, 5, 1, 12, 0)
+    ahead = now + timedelta(seconds=90)
+
+    observe_dispatch("test-skew", ahead, accepted_at=now)
+    observe_reply("test-skew", ahead, now)
+    observe_backlog("test-skew", [ahead], now)
+
+    assert _histogram(DISPATCH_LAG, "test-skew") == (1, 0.0)
+    assert _histogram(REPLY_LATENCY, "test-skew") == (1, 0.0)
+    assert OLDEST_PENDING_AGE.get(channel="test-skew") == 0
+
+
+def test_missing_timestamps_are_not_observed():
+    now = datetime(2025, 5, 1, 12, 0)
+
+    observe_dispatch("test-none", None)
+    observe_reply("test-none", None, now)
+    observe_reply("test-none", now, None)
+
+    assert _histogram(DISPATCH_LAG, "test-none") == (0, 0.0)
+    assert _histogram(REPLY_LATENCY, "test-none") == (0, 0.0)
+
+
+def test_call_path_records_lag_from_scheduled_datetime(db, offline_calls):
+    factories.elderly(db, 1)
+    reminder = factories.reminder(db, elderly_profile_id=1, medicine=1)
+    factories.instance(db, reminder, datetime.now() - timedelta(minutes=10), status="pending")
+    db.commit()
+    count_before, sum_before = _histogram(DISPATCH_LAG, "call")
+
+    results = asyncio.run(ReminderCallService.process_pending_calls(db))
+
+    count_after, sum_after = _histogram(DISPATCH_LAG, "call")
+    assert results["successful"] == 1 and len(offline_calls) == 1
+    assert count_after - count_before == 1
+    assert sum_after - sum_before == pytest.approx(600, abs=30)
+    assert PENDING_BACKLOG.get(channel="call") == 1
+    assert OLDEST_PENDING_AGE.get(channel="call") == pytest.approx(600, abs=30)
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from models import NotificationLog
+from services.exports import ExportService
+from tests import factories
+
+
+def _seed(db):
+    """Tres reminders del adulto mayor 1 (directo, por medicina y por cita) y uno del 2"""
+    factories.elderly(db, 1)
+    factories.elderly(db, 2)
+    worker = factories.health_worker(db, 100)
+    direct = factories.reminder(db, elderly_profile_id=1)
+    by_medicine = factories.reminder(db, medicine=1)
+    by_appointment = factories.reminder(db, reminder_type="appointment", appointment_id=factories.appointment(db, 1, worker.id).id)
+    other = factories.reminder(db, elderly_profile_id=2, medicine=2)
+    now = datetime.now()
+    for offset, row in enumerate((direct, by_medicine, by_appointment, other)):
+        instance = factories.instance(db, row, now - timedelta(hours=offset + 1))
+        db.add(NotificationLog(
+            reminder_instance_id=instance.id, notification_type="whatsapp", recepient_phone="+56900000000",
+            status="sent", sent_at=now - timedelta(hours=offset + 1)
+        ))
+    db.commit()
+    return {direct.id, by_medicine.id, by_appointment.id}
+
+
+def test_reminder_history_includes_medicine_and_appointment_reminders(db):
+    expected = _seed(db)
+
+    rows = ExportService.query_reminder_history(db, elderly_profile_id=1).all()
+
+    assert {row.reminder_id for row in rows} == expected
+    assert {row.elderly_profile_id for row in rows} == {1}
+
+
+def test_notification_logs_include_medicine_and_appointment_reminders(db):
+    _seed(db)
+
+    rows = ExportService.query_notification_logs(db, elderly_profile_id=1).all()
+    everyone = ExportService.query_notification_logs(db).all()
+
+    assert len(rows) == 3
+    assert {row.elderly_profile_id for row in rows} == {1}
+    assert sorted(row.elderly_profile_id for row in everyone) == [1, 1, 1, 2]
@@ -0,0 +1,23 @@
+"""Arranque en frío: `import app` en un proceso nuevo, con el mismo presupuesto que scripts/check_import_time.py"""
+import statistics
+import pytest
+from scripts.check_import_time import IMPORT_TIME_BUDGET_MS, LAZY_MODULES
+from scripts.profile_startup import import_profile, total_ms
+
+RUNS = 3
+
+
+@pytest.fixture(scope="module")
+def profiles():
+    return [import_profile("app") for _ in range(RUNS)]
+
+
+def test_import_app_within_budget(profiles):
+    median_ms = statistics.median(total_ms(rows, "app") for rows in profiles)
+
+    assert median_ms <= IMPORT_TIME_BUDGET_MS, f"import app: mediana {median_ms:.0f} ms (presupuesto {IMPORT_TIME_BUDGET_MS:.0f} ms)"
+
+
+@pytest.mark.parametrize("module", LAZY_MODULES)
+def test_provider_sdks_load_on_first_use(profiles, module):
+    assert module not in {row.module for row in profiles[0]}, f"{module} se importa al arrancar"
@@ -0,0 +1,157 @@
+"""
+Los listados *_with_medicine proyectados directo a JSON (services/json_projection.py) deben responder
+exactamente lo mismo que el camino anterior: entidades ORM -> DTO -> serialización del response_model.
+"""
+from datetime import datetime, timedelta
+from typing import Any, List
+from pydantic import TypeAdapter
+from sqlalchemy import and_
+import json
+import pytest
+from dtos.reminders import ReminderWithMedicineResponse
+from dtos.reminder_instances import ReminderInstanceWithMedicineResponse
+from models import Reminder, ReminderInstance, Medicine, NotificationLog
+from services.json_projection import dump_rows
+from services.reminders import ReminderService
+from services.reminder_instances import ReminderInstanceService
+from tests import factories
+
+
+def _orm_instances(db, query, normalize_method: bool = True) -> List[ReminderInstanceWithMedicineResponse]:
+    """Lo que hacían los listados de instancias antes de la proyección: entidades ORM y un DTO por fila"""
+    result = []
+    for instance, reminder, medicine in query.all():
+        log = (
+            db.query(NotificationLog)
+            .filter(NotificationLog.reminder_instance_id == instance.id)
+            .order_by(NotificationLog.sent_at.desc())
+            .first()
+        )
+        method = log.notification_type if log else None
+        if normalize_method and method is not None:
+            method = method.lower() if method.lower() in ("whatsapp", "call") else None
+        result.append(ReminderInstanceWithMedicineResponse(
+            id=instance.id,
+            reminder_id=instance.reminder_id,
+            scheduled_datetime=instance.scheduled_datetime,
+            status=instance.status,
+            taken_at=instance.taken_at,
+            retry_count=instance.retry_count,
+            max_retries=instance.max_retries,
+            family_notified=instance.family_notified,
+            family_notified_at=instance.family_notified_at,
+            notes=instance.notes,
+            created_at=instance.created_at,
+            updated_at=instance.updated_at,
+            message_id=instance.message_id,
+            medicine_name=medicine.name if medicine else None,
+            dosage=medicine.dosage if medicine else None,
+            method=method
+        ))
+    return result
+
+
+def _orm_query(db):
+    return (
+        db.query(ReminderInstance, Reminder, Medicine)
+        .join(Reminder, ReminderInstance.reminder_id == Reminder.id)
+        .outerjoin(Medicine, Reminder.medicine == Medicine.id)
+    )
+
+
+def _between(start: datetime, end: datetime):
+    return and_(ReminderInstance.scheduled_datetime >= start, ReminderInstance.scheduled_datetime < end)
+
+
+def _response_json(model: Any, items: List[Any]) -> Any:
+    """Serialización de FastAPI con response_model=List[model]"""
+    adapter = TypeAdapter(List[model])
+    return json.loads(adapter.dump_json(adapter.validate_python(items, from_attributes=True)))
+
+
+@pytest.fixture
+def seeded(db):
+    """Recordatorios con y sin medicina, instancias de hoy, de este mes y de otro, y logs de varios tipos"""
+    factories.elderly(db, 1)
+    factories.elderly(db, 2, with_medicine=False)
+    db.get(Medicine, 1).dosage = "500 mg"
+    with_medicine = factories.reminder(db, elderly_profile_id=1, medicine=1)
+    without_medicine = factories.reminder(db, reminder_type="other", elderly_profile_id=2, end_date=datetime(2030, 1, 1))
+
+    now = datetime.now().replace(hour=9, minute=30, second=15, microsecond=123456)
+    last_month = now.replace(day=1) - timedelta(days=3)
+    rows = [
+        factories.instance(db, with_medicine, now, status="taken", taken_at=now + timedelta(minutes=4), notes="ok"),
+        factories.instance(db, with_medicine, now + timedelta(hours=2), message_id="wamid.1"),
+        factories.instance(db, with_medicine, last_month, status="missed", family_notified=True, family_notified_at=last_month),
+        factories.instance(db, without_medicine, now + timedelta(hours=1), status="taken"),
+        factories.instance(db, without_medicine, last_month, status="skipped"),
+    ]
+    for index, (row, notification_type) in enumerate(zip(rows, ("WhatsApp", "call", "sms", "whatsapp", None))):
+        if notification_type is None:
+            continue
+        db.add(NotificationLog(
+            reminder_instance_id=row.id, notification_type="sms", recepient_phone="+56900000000",
+            status="sent", sent_at=now - timedelta(days=1, minutes=index)
+        ))
+        db.add(NotificationLog(
+            reminder_instance_id=row.id, notification_type=notification_type, recepient_phone="+56900000000",
+            status="sent", sent_at=now - timedelta(minutes=index)
+        ))
+    db.commit()
+    return {"with_medicine": with_medicine.id, "without_medicine": without_medicine.id, "now": now, "last_month": last_month}
+
+
+def test_reminders_with_medicine(db, seeded):
+    expected = _response_json(ReminderWithMedicineResponse, ReminderService.get_all_with_medicine(db))
+    actual = json.loads(dump_rows(ReminderService.get_all_with_medicine_rows(db)))
+
+    assert len(actual) == 2
+    assert actual == expected
+
+
+def test_reminder_instances_with_medicine(db, seeded):
+    expected = _response_json(ReminderInstanceWithMedicineResponse, _orm_instances(db, _orm_query(db).offset(0).limit(100)))
+    actual = json.loads(dump_rows(ReminderInstanceService.get_all_with_medicine_rows(db)))
+
+    assert len(actual) == 5
+    assert actual == expected
+
+
+def test_reminder_instances_today_with_medicine(db, seeded):
+    start_of_day = datetime.combine(datetime.now().date(), datetime.min.time())
+    query = _orm_query(db).filter(_between(start_of_day, start_of_day + timedelta(days=1)))
+    expected = _response_json(
+        ReminderInstanceWithMedicineResponse,
+        _orm_instances(db, query.order_by(ReminderInstance.scheduled_datetime.asc()))
+    )
+    actual = json.loads(dump_rows(ReminderInstanceService.get_today_with_medicine_rows(db)))
+
+    assert len(actual) == 3
+    assert actual == expected
+
+
+@pytest.mark.parametrize("month", ["now", "last_month"])
+def test_reminder_instances_month_with_medicine(db, seeded, month):
+    day = seeded[month]
+    start = datetime(day.year, day.month, 1)
+    end = datetime(day.year + 1, 1, 1) if day.month == 12 else datetime(day.year, day.month + 1, 1)
+    expected = _response_json(ReminderInstanceWithMedicineResponse, _orm_instances(db, _orm_query(db).filter(_between(start, end))))
+    actual = json.loads(dump_rows(ReminderInstanceService.get_by_month_with_medicine_rows(db, day.year, day.month)))
+
+    assert actual
+    assert actual == expected
+
+
+def test_reminder_instances_by_reminder_with_medicine(db, seeded):
+    query = (
+        _orm_query(db)
+        .filter(and_(ReminderInstance.reminder_id == seeded["with_medicine"], ReminderInstance.status != "pending"))
+        .order_by(ReminderInstance.scheduled_datetime.desc())
+    )
+    # Este listado siempre devolvió el notification_type sin normalizar
+    expected = _response_json(ReminderInstanceWithMedicineResponse, _orm_instances(db, query, normalize_method=False))
+    actual = json.loads(dump_rows(ReminderInstanceService.get_by_reminder_id_with_medicine_rows(db, seeded["with_medicine"])))
+
+    assert [row["method"] for row in actual] == ["WhatsApp", "sms"]
+    assert actual == expected
@@ -0,0 +1,68 @@
+from datetime import datetime
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from database import get_db
+from models import Medicine, MedicineStockLedger
+from routers import medicines
+from services.medicines import MedicineService
+from services.pagination import MAX_PAGE_SIZE
+from tests import factories
+
+
+def _medicine(db, tablets_left, tablets_per_dose):
+    factories.elderly(db, 1)
+    medicine = db.get(Medicine, 1)
+    medicine.tablets_left = tablets_left
+    medicine.tablets_per_dose = tablets_per_dose
+    db.commit()
+    return medicine
+
+
+def _ledger(db):
+    return [
+        (entry.delta, entry.balance_after, entry.reason, entry.reminder_instance_id)
+        for entry in db.query(MedicineStockLedger).order_by(MedicineStockLedger.id)
+    ]
+
+
+def test_consume_dose_discounts_a_dose_and_records_it(db):
+    _medicine(db, tablets_left=5, tablets_per_dose=2)
+    instance = factories.instance(db, factories.reminder(db, medicine=1), datetime.now())
+
+    assert MedicineService.consume_dose(db, 1, instance.id) == 3
+    assert MedicineService.consume_dose(db, 1) == 1
+    db.commit()
+
+    assert db.get(Medicine, 1).tablets_left == 1
+    assert _ledger(db) == [(-2, 3, "dose_taken", instance.id), (-2, 1, "dose_taken", None)]
+
+
+def test_consume_dose_returns_none_without_enough_stock(db):
+    _medicine(db, tablets_left=1, tablets_per_dose=2)
+
+    assert MedicineService.consume_dose(db, 1) is None
+    db.commit()
+
+    assert db.get(Medicine, 1).tablets_left == 1
+    assert _ledger(db) == []
+
+
+def test_consume_dose_defaults_to_one_tablet(db):
+    _medicine(db, tablets_left=1, tablets_per_dose=None)
+
+    assert MedicineService.consume_dose(db, 1) == 0
+    assert MedicineService.consume_dose(db, 1) is None
+    db.commit()
+
+    assert _ledger(db) == [(-1, 0, "dose_taken", None)]
+
+
+def test_stock_ledger_limit_is_bounded(db):
+    app = FastAPI()
+    app.include_router(medicines.router)
+    app.dependency_overrides[get_db] = lambda: db
+    client = TestClient(app)
+
+    assert client.get("/medicines/1/stock-ledger", params={"limit": MAX_PAGE_SIZE}).status_code == 200
+    assert client.get("/medicines/1/stock-ledger", params={"limit": MAX_PAGE_SIZE + 1}).status_code == 422
+    assert client.get("/medicines/1/stock-ledger", params={"limit": 0}).status_code == 422
@@ -0,0 +1,82 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import pytest
+from services.metrics import MetricsRegistry
+from services.request_metrics import REQUEST_LATENCY, RESPONSE_SIZE, RequestMetricsMiddleware
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = registry.histogram("job_seconds", "Duración", ("job",), buckets=(0.1, 1))
+    for value in (0.05, 0.5, 0.7, 3):
+        histogram.observe(value, job="tick")
+
+    assert registry.render().splitlines() == [
+        "# HELP job_seconds Duración",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{job="tick",le="0.1"} 1',
+        'job_seconds_bucket{job="tick",le="1"} 3',
+        'job_seconds_bucket{job="tick",le="+Inf"} 4',
+        'job_seconds_sum{job="tick"} 4.25',
+        'job_seconds_count{job="tick"} 4',
+    ]
+
+
+def test_counter_total_suffix_and_label_escaping(registry):
+    counter = registry.counter("webhooks", "Webhooks recibidos", ("source",))
+    counter.inc(source='ka"pso\\\n')
+    counter.inc(2.5, source="telegram")
+
+    lines = registry.render().splitlines()
+    assert lines[1] == "# TYPE webhooks counter"
+    assert lines[2:] == [
+        'webhooks_total{source="ka\\"pso\\\\\\n"} 1',
+        'webhooks_total{source="telegram"} 2.5',
+    ]
+
+
+def test_labels_and_types_are_checked(registry):
+    counter = registry.counter("webhooks", "Webhooks recibidos", ("source",))
+    with pytest.raises(ValueError):
+        counter.inc(channel="kapso")
+    with pytest.raises(ValueError):
+        registry.gauge("webhooks", "Otro tipo")
+
+
+def test_gauge_function_is_evaluated_on_render(registry):
+    backlog = {"pending": 3}
+    gauge = registry.gauge("backlog", "Pendientes", ("status",))
+    gauge.set_function(lambda: {(status,): count for status, count in backlog.items()})
+
+    assert registry.render().splitlines()[2:] == ['backlog{status="pending"} 3']
+    backlog["pending"] = 0
+    backlog["failed"] = 1
+    assert registry.render().splitlines()[2:] == ['backlog{status="failed"} 1', 'backlog{status="pending"} 0']
+
+
+def test_request_metrics_use_the_route_template():
+    app = FastAPI()
+    app.add_middleware(RequestMetricsMiddleware)
+
+    @app.get("/reminders/{reminder_id}")
+    def get_reminder(reminder_id: int):
+        return {"id": reminder_id}
+
+    client = TestClient(app)
+    before = {sample[2]: sample[3] for sample in REQUEST_LATENCY.samples() if sample[0].endswith("_count")}
+    client.get("/reminders/1")
+    client.get("/reminders/2")
+    client.get("/no-existe")
+    after = {sample[2]: sample[3] for sample in REQUEST_LATENCY.samples() if sample[0].endswith("_count")}
+
+    def added(key):
+        return after.get(key, 0) - before.get(key, 0)
+
+    assert added(("GET", "/reminders/{reminder_id}", "200")) == 2
+    assert added(("GET", "unmatched", "404")) == 1
+    assert all(route != "/reminders/1" for _, route, _ in after)
+    assert any(sample[2] == ("GET", "/reminders/{reminder_id}") for sample in RESPONSE_SIZE.samples())
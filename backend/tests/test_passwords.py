@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+from services import passwords
+
+
+@pytest.fixture
+def rounds(monkeypatch):
+    """Fijar BCRYPT_ROUNDS a un costo bajo (el contexto se arma de nuevo con ese valor)"""
+    def use(value: int):
+        monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", value)
+        passwords.get_pwd_context.cache_clear()
+
+    yield use
+    passwords.get_pwd_context.cache_clear()
+
+
+@pytest.mark.parametrize("stored_rounds", [4, 6])
+def test_login_rehashes_hash_with_other_cost(rounds, stored_rounds):
+    rounds(stored_rounds)
+    stored = passwords.hash_password("secreta")
+
+    rounds(5)
+    valid, new_hash = asyncio.run(passwords.verify_and_update_password("secreta", stored))
+
+    assert valid
+    assert new_hash is not None and new_hash.startswith("$2b$05$")
+    assert asyncio.run(passwords.verify_and_update_password("secreta", new_hash)) == (True, None)
+
+
+def test_login_keeps_hash_with_current_cost(rounds):
+    rounds(5)
+    stored = passwords.hash_password("secreta")
+
+    assert asyncio.run(passwords.verify_and_update_password("secreta", stored)) == (True, None)
+    assert asyncio.run(passwords.verify_and_update_password("otra", stored)) == (False, None)
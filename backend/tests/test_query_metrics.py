@@ -0,0 +1,76 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+import pytest
+from models import User
+from services import query_metrics
+from services.query_metrics import N_PLUS_ONE_THRESHOLD, QueryMetricsMiddleware, query_scope
+
+
+@pytest.fixture(autouse=True)
+def _installed():
+    query_metrics.install()
+
+
+def test_repeated_statement_is_flagged_at_threshold(db):
+    with query_scope("test:n_plus_one") as stats:
+        for user_id in range(N_PLUS_ONE_THRESHOLD - 1):
+            db.execute(text("SELECT :id"), {"id": user_id})
+        db.execute(text("SELECT 1 + 1"))
+    assert stats.count == N_PLUS_ONE_THRESHOLD
+    assert stats.n_plus_one() == []
+
+    with query_scope("test:n_plus_one") as stats:
+        for user_id in range(N_PLUS_ONE_THRESHOLD):
+            db.execute(text("SELECT :id"), {"id": user_id})
+    assert stats.n_plus_one() == [("SELECT ?", N_PLUS_ONE_THRESHOLD)]
+
+
+def test_failed_statements_are_counted_and_not_left_on_the_connection(db):
+    db.add(User(id=1, email="ana@test.local", password="x", full_name="Ana", role="family"))
+    db.commit()
+    connection = db.connection()
+
+    with query_scope("test:failures") as stats:
+        for _ in range(3):
+            with pytest.raises(IntegrityError):
+                with db.begin_nested():
+                    db.add(User(id=1, email="ana@test.local", password="x", full_name="Ana", role="family"))
+        db.execute(text("SELECT 1"))
+
+    assert stats.failed == 3
+    assert stats.shapes["SELECT 1"] == 1
+    assert sum(count for statement, count in stats.shapes.items() if statement.startswith("INSERT INTO users")) == 3
+    assert not connection.info.get("query_start")
+
+
+def _app(engine) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(QueryMetricsMiddleware)
+
+    @app.get("/items/{count}")
+    def items(count: int):
+        with engine.connect() as connection:
+            for item_id in range(count):
+                connection.execute(text("SELECT :id"), {"id": item_id})
+        return {"count": count}
+
+    return app
+
+
+def test_debug_headers(engine, monkeypatch):
+    monkeypatch.setattr(query_metrics, "SQL_DEBUG_HEADERS", True)
+    response = TestClient(_app(engine)).get(f"/items/{N_PLUS_ONE_THRESHOLD}")
+
+    assert response.headers["X-DB-Query-Count"] == str(N_PLUS_ONE_THRESHOLD)
+    assert float(response.headers["X-DB-Query-Time-Ms"]) >= 0
+    assert response.headers["X-DB-N-Plus-One"] == "1"
+
+
+def test_no_debug_headers_by_default(engine, monkeypatch):
+    monkeypatch.setattr(query_metrics, "SQL_DEBUG_HEADERS", False)
+    response = TestClient(_app(engine)).get("/items/2")
+
+    assert response.status_code == 200
+    assert "X-DB-Query-Count" not in response.headers
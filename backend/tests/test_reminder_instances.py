@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta
+from models import User, ElderlyProfile, Medicine, Reminder, ReminderInstance
+from services.pagination import MAX_PAGE_SIZE
+from services.reminder_instances import ReminderInstanceService
+from enums import ReminderInstanceStatus
+
+
+def test_by_reminder_with_medicine_is_bounded(db):
+    db.add(User(id=1, email="a@b.c", password="x", full_name="A", role="elderly"))
+    db.flush()
+    db.add(ElderlyProfile(id=1))
+    db.add(Medicine(id=1, name="Paracetamol", tablets_left=5, tablets_per_dose=1))
+    db.flush()
+    reminder = Reminder(reminder_type="medicine", periodicity=60, start_date=datetime.now(), medicine=1)
+    db.add(reminder)
+    db.flush()
+    start = datetime.now() - timedelta(days=60)
+    db.add_all([
+        ReminderInstance(
+            reminder_id=reminder.id,
+            scheduled_datetime=start + timedelta(hours=index),
+            status=ReminderInstanceStatus.SUCCESS.value
+        )
+        for index in range(MAX_PAGE_SIZE + 5)
+    ])
+    db.commit()
+
+    assert len(ReminderInstanceService.get_by_reminder_id_with_medicine_rows(db, reminder.id, limit=None)) == MAX_PAGE_SIZE
+    assert len(ReminderInstanceService.get_by_reminder_id_with_medicine_rows(db, reminder.id, limit=10_000)) == MAX_PAGE_SIZE
+    assert len(ReminderInstanceService.get_by_reminder_id_with_medicine_rows(db, reminder.id, limit=3)) == 3
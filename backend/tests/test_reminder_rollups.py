@@ -0,0 +1,85 @@
+from datetime import date, datetime, timedelta
+from models import ReminderInstance, ReminderDailyRollup
+from services.adherence import AdherenceService
+from services.query_metrics import install as install_query_metrics, query_scope
+from services.reminder_rollups import ReminderRollupService
+from enums import ReminderInstanceStatus
+from tests import factories
+import pytest
+
+DAY = datetime.combine(date.today() - timedelta(days=1), datetime.min.time()) + timedelta(hours=9)
+
+
+@pytest.fixture(autouse=True)
+def _listener():
+    ReminderRollupService.install()
+    install_query_metrics()
+
+
+def _reminders_of_elderly_1(db):
+    """Un reminder directo, uno solo por medicina y uno solo por cita; más uno de otro adulto mayor"""
+    factories.elderly(db, 1)
+    factories.elderly(db, 2)
+    worker = factories.health_worker(db, 100)
+    return [
+        factories.reminder(db, elderly_profile_id=1),
+        factories.reminder(db, medicine=1),
+        factories.reminder(db, reminder_type="appointment", appointment_id=factories.appointment(db, 1, worker.id).id),
+        factories.reminder(db, elderly_profile_id=2, medicine=2),
+    ]
+
+
+def test_rollups_store_the_resolved_elderly(db):
+    for reminder in _reminders_of_elderly_1(db):
+        factories.instance(db, reminder, DAY)
+    db.commit()
+
+    rows = AdherenceService.get_rows(db, DAY.date(), DAY.date() + timedelta(days=1), elderly_profile_id=1)
+
+    assert len(rows) == 3
+    assert sum(row.count for row in rows) == 3
+    assert {row.elderly_profile_id for row in db.query(ReminderDailyRollup)} == {1, 2}
+
+
+def test_status_change_moves_the_count(db):
+    reminder = _reminders_of_elderly_1(db)[1]
+    instance = factories.instance(db, reminder, DAY)
+    db.commit()
+
+    instance.status = ReminderInstanceStatus.SUCCESS.value
+    instance.taken_at = DAY + timedelta(minutes=10)
+    db.commit()
+
+    counts = {row.status: (row.count, row.on_time_count, row.elderly_profile_id) for row in db.query(ReminderDailyRollup)}
+    assert counts == {
+        ReminderInstanceStatus.PENDING.value: (0, 0, 1),
+        ReminderInstanceStatus.SUCCESS.value: (1, 1, 1),
+    }
+
+
+def test_deltas_load_reminders_in_one_query(db):
+    reminders = _reminders_of_elderly_1(db)
+    for reminder in reminders:
+        factories.instance(db, reminder, DAY)
+    db.commit()
+    db.expunge_all()
+
+    with query_scope("test") as stats:
+        for instance in db.query(ReminderInstance).all():
+            instance.status = ReminderInstanceStatus.REJECTED.value
+        db.commit()
+
+    reminder_selects = [statement for statement in stats.shapes if "FROM reminders" in statement]
+    assert len(reminder_selects) == 1
+    assert stats.shapes[reminder_selects[0]] == 1
+
+
+def test_reminder_moved_to_another_elderly_rekeys_its_rollups(db):
+    reminder = _reminders_of_elderly_1(db)[1]
+    factories.instance(db, reminder, DAY)
+    db.commit()
+
+    reminder.elderly_profile_id = 2
+    db.commit()
+
+    assert {row.elderly_profile_id for row in db.query(ReminderDailyRollup)} == {2}
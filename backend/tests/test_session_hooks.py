@@ -0,0 +1,32 @@
+from services.session_hooks import call_after_commit
+from services.response_cache import CacheBackend, InMemoryCacheBackend, RedisCacheBackend, ResponseCache
+import pytest
+
+
+def test_callback_runs_once_after_commit_with_accumulated_values(db):
+    calls = []
+    call_after_commit(db, "test_invalidate", lambda *values: calls.append(set(values)), 1, None)
+    call_after_commit(db, "test_invalidate", lambda *values: calls.append(set(values)), 2)
+    assert calls == []
+
+    db.commit()
+    db.commit()
+
+    assert calls == [{1, 2}]
+
+
+def test_response_cache_invalidates_tags_on_commit(db):
+    cache = ResponseCache(InMemoryCacheBackend())
+    cache.invalidate_on_commit(db, "reminders", None)
+    assert cache.backend.get_version("reminders") == 0
+
+    db.commit()
+
+    assert cache.backend.get_version("reminders") == 1
+
+
+def test_cache_backends_implement_the_interface():
+    with pytest.raises(TypeError):
+        CacheBackend()
+    # Instanciable (implementa toda la interfaz) y sin conectarse hasta el primer comando
+    assert RedisCacheBackend("redis://localhost:6379/0").prefix == "response_cache:"
@@ -0,0 +1,81 @@
+import pytest
+from models import Medicine
+from services.stock_forecast import StockForecastService
+from tests import factories
+
+
+@pytest.fixture(autouse=True)
+def _empty_cache():
+    """El cache de pronósticos es de clase: empezar y terminar cada test vacío"""
+    def reset():
+        with StockForecastService._lock:
+            StockForecastService._forecasts = {}
+            StockForecastService._dirty.clear()
+            StockForecastService._loaded = False
+            StockForecastService._rebuild_index()
+
+    reset()
+    yield
+    reset()
+
+
+@pytest.fixture
+def medicines(db):
+    for elderly_id in (1, 2):
+        factories.elderly(db, elderly_id)
+        factories.reminder(db, elderly_profile_id=elderly_id, medicine=elderly_id, periodicity=720)
+    db.commit()
+    return db
+
+
+def _invalidate_while_querying(monkeypatch, medicine_id: int) -> None:
+    """Simular un request que invalida (y hace commit) mientras corre la query del refresh"""
+    original = StockForecastService._forecast_query
+
+    def forecast_query(db, medicine_ids=None):
+        query = original(db, medicine_ids)
+
+        class Query:
+            def all(self):
+                rows = query.all()
+                StockForecastService.invalidate(medicine_id)
+                return rows
+        return Query()
+
+    monkeypatch.setattr(StockForecastService, "_forecast_query", staticmethod(forecast_query))
+
+
+@pytest.mark.parametrize("partial", [False, True])
+def test_invalidation_during_refresh_is_kept(medicines, monkeypatch, partial):
+    db = medicines
+    StockForecastService.refresh(db)
+    StockForecastService.invalidate(1)
+    db.get(Medicine, 1).tablets_left = 10
+    db.commit()
+
+    with monkeypatch.context() as patch:
+        _invalidate_while_querying(patch, 2)
+        StockForecastService.refresh(db, {1} if partial else None)
+    assert StockForecastService._dirty == {2}
+
+    db.get(Medicine, 2).tablets_left = 4
+    db.commit()
+    assert StockForecastService.get_forecast(db, 1).tablets_left == 10
+    assert StockForecastService.get_forecast(db, 2).tablets_left == 4
+    assert not StockForecastService._dirty
+
+
+def test_failed_refresh_keeps_pending_invalidations(medicines, monkeypatch):
+    db = medicines
+    StockForecastService.refresh(db)
+    StockForecastService.invalidate(1, 2)
+
+    def failing_query(db, medicine_ids=None):
+        raise RuntimeError("se cayó la conexión")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(StockForecastService, "_forecast_query", staticmethod(failing_query))
+        with pytest.raises(RuntimeError):
+            StockForecastService.refresh(db)
+
+    assert StockForecastService._dirty == {1, 2}
@@ -0,0 +1,77 @@
+from datetime import datetime, timedelta
+import asyncio
+import pytest
+from services import tracing
+from services.reminder_call_service import ReminderCallService
+from services.tracing import InMemorySpanExporter, TickStages, Tracer, percentile, stage, stage_summary
+from tests import factories
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(tracing, "tracer", Tracer(exporter))
+    return exporter
+
+
+def test_percentile_is_nearest_rank():
+    values = [float(value) for value in range(10, 0, -1)]
+
+    assert percentile(values, 0.5) == 5
+    assert percentile(values, 0.95) == 10
+    assert percentile(values, 0.1) == 1
+    assert percentile([0.3], 0.95) == 0.3
+    assert percentile([], 0.5) == 0.0
+
+
+def test_tick_report():
+    tick = TickStages("tick")
+    for seconds in (0.001, 0.002, 0.003, 0.004):
+        tick.add("load_reminder", seconds)
+    tick.add("twilio_call", 0.5)
+
+    assert tick.report() == {
+        "load_reminder": {"count": 4, "p50_ms": 2.0, "p95_ms": 4.0, "total_ms": 10.0},
+        "twilio_call": {"count": 1, "p50_ms": 500.0, "p95_ms": 500.0, "total_ms": 500.0},
+    }
+
+
+def test_failed_stage_exports_an_error_span(exporter):
+    with pytest.raises(RuntimeError):
+        with stage("tick"):
+            with stage("ok_stage", reminder_instance_id=7):
+                pass
+            with stage("twilio_call"):
+                raise RuntimeError("Twilio no responde")
+
+    spans = {span.name: span for span in exporter.get_finished_spans()}
+    assert spans["ok_stage"].status == "OK"
+    assert spans["ok_stage"].attributes == {"reminder_instance_id": 7}
+    assert spans["twilio_call"].status == "ERROR"
+    assert spans["twilio_call"].events[0]["attributes"] == {
+        "exception.type": "RuntimeError", "exception.message": "Twilio no responde"
+    }
+    assert spans["tick"].status == "ERROR"
+    assert {span.trace_id for span in spans.values()} == {spans["tick"].trace_id}
+    assert spans["twilio_call"].parent_id == spans["tick"].span_id
+    assert stage_summary(list(spans.values()))["twilio_call"][0] == 1
+
+
+def test_process_pending_calls_reports_stages_per_tick(db, exporter, offline_calls):
+    factories.elderly(db, 1)
+    reminder = factories.reminder(db, elderly_profile_id=1, medicine=1)
+    for minutes in (5, 10):
+        factories.instance(db, reminder, datetime.now() - timedelta(minutes=minutes), status="pending")
+    db.commit()
+
+    results = asyncio.run(ReminderCallService.process_pending_calls(db))
+
+    assert results["successful"] == 2
+    stages = results["stages"]
+    assert stages["process_pending_calls"]["count"] == 1
+    assert stages["load_pending"]["count"] == 1
+    for name in ("process_reminder_call", "load_reminder", "resolve_phone", "generate_message", "twilio_call", "update_status"):
+        assert stages[name]["count"] == 2
+        assert stages[name]["p50_ms"] <= stages[name]["p95_ms"]
+    root = next(span for span in exporter.get_finished_spans() if span.name == "process_pending_calls")
+    assert root.parent_id is None and root.status == "OK"
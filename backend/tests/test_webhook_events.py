@@ -0,0 +1,72 @@
+from datetime import datetime
+from models import User, ElderlyProfile, Medicine, Reminder, ReminderInstance, WebhookEvent
+from services.message_correlations import MessageCorrelationService
+from services.webhook_events import WebhookEventService
+from services.idempotency import webhook_idempotency
+from enums import ReminderInstanceStatus, WebhookEventStatus
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def _forget_seen_events():
+    # El LRU de duplicados es global al proceso: cada test parte de cero
+    webhook_idempotency.clear()
+
+
+def _telegram_reminder(db, chat_id=9, message_id=77):
+    db.add(User(id=1, email="a@b.c", password="x", full_name="A", role="elderly"))
+    db.flush()
+    db.add(ElderlyProfile(id=1))
+    db.add(Medicine(id=1, name="Paracetamol", tablets_left=5, tablets_per_dose=1))
+    db.flush()
+    reminder = Reminder(reminder_type="medicine", periodicity=60, start_date=datetime.now(), medicine=1)
+    db.add(reminder)
+    db.flush()
+    instance = ReminderInstance(reminder_id=reminder.id, scheduled_datetime=datetime.now())
+    db.add(instance)
+    db.flush()
+    MessageCorrelationService.register(db, "telegram", MessageCorrelationService.telegram_key(chat_id, message_id), instance.id)
+    db.commit()
+    return instance
+
+
+def _enqueue_telegram(db, update_id, callback_query):
+    body = {"update_id": update_id, "callback_query": callback_query}
+    return WebhookEventService.enqueue(db, "telegram", WebhookEventService.telegram_event_key(body), body)
+
+
+def test_telegram_callback_is_applied(db):
+    instance = _telegram_reminder(db)
+    _enqueue_telegram(db, 1, {"id": "c1", "from": {"id": 9}, "message": {"message_id": 77, "chat": {"id": 9}}, "data": "skip"})
+
+    results = WebhookEventService.process_batch(db)
+
+    assert results == {"processed": 1, "ignored": 0, "failed": 0}
+    assert db.get(ReminderInstance, instance.id).status == ReminderInstanceStatus.REJECTED.value
+
+
+def test_malformed_telegram_callback_is_ignored_not_retried(db):
+    _telegram_reminder(db)
+    _enqueue_telegram(db, 1, {"id": "c1", "data": "taken", "message": {"chat": {"id": 9}}})
+    _enqueue_telegram(db, 2, {"id": "c2", "data": "taken", "message": {"message_id": 77}})
+
+    results = WebhookEventService.process_batch(db)
+
+    assert results == {"processed": 0, "ignored": 2, "failed": 0}
+    assert {event.attempts for event in db.query(WebhookEvent)} == {1}
+
+
+def test_failed_events_are_not_reclaimed_in_the_same_run(db):
+    db.add(WebhookEvent(provider="whatsapp", event_key="broken", payload="{no es json"))
+    db.commit()
+    failed_ids = set()
+
+    first = WebhookEventService.process_batch(db, failed_ids=failed_ids)
+    second = WebhookEventService.process_batch(db, failed_ids=failed_ids)
+
+    event = db.query(WebhookEvent).one()
+    assert first["failed"] == 1
+    assert second == {"processed": 0, "ignored": 0, "failed": 0}
+    assert event.status == WebhookEventStatus.PENDING.value
+    assert event.attempts == 1
+    assert failed_ids == {event.id}